@@ -0,0 +1,240 @@
+# Mide cuanto tardan las operaciones de GestorDeContactos segun el tamaño de la tabla.
+# Uso:
+#     python benchmark.py correr --tamanos 1000 100000 1000000 --salida actual.json
+#     python benchmark.py comparar base.json actual.json
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterator, List, Optional
+
+from main import Contacto, GestorDeContactos, crear_tabla_contactos
+
+# |||| Configuración ||||
+
+# Tamaños de tabla por defecto.
+TAMANOS = (1_000, 100_000, 1_000_000)
+# Semilla por defecto para que los datos sean siempre los mismos.
+SEMILLA = 42
+# Cantidad de veces que se mide cada operación rapida.
+REPETICIONES = 500
+# Las operaciones que leen toda la tabla se miden menos veces.
+REPETICIONES_COMPLETAS = 3
+# Diferencia relativa a partir de la cual se considera una regresion.
+TOLERANCIA = 0.10
+
+NOMBRES = ["Ana", "Juan", "María", "Pedro", "Lucía", "Matías", "Clara", "Agustina", "Yanina", "Diego",
+           "Sofía", "Martín", "Valentina", "Joaquín", "Camila", "Tomás", "Julieta", "Lucas", "Paula", "Bruno"]
+APELLIDOS = ["Pérez", "Gómez", "Rodríguez", "Fernández", "López", "Díaz", "Martínez", "Sánchez", "Romero",
+             "Sosa", "Torres", "Álvarez", "Ruiz", "Ramírez", "Flores", "Benítez", "Acosta", "Medina"]
+
+# |||| Datos sinteticos ||||
+
+# Genera contactos validos y sin duplicados, siempre iguales para la misma semilla.
+# desde permite seguir numerando sin chocar con contactos ya generados.
+def generar_contactos(cantidad: int, semilla: int = SEMILLA, desde: int = 0) -> Iterator[Contacto]:
+    rnd = random.Random(semilla + desde)
+    for i in range(desde, desde + cantidad):
+        nombre = rnd.choice(NOMBRES)
+        apellido = rnd.choice(APELLIDOS)
+        yield Contacto(
+            nombre=nombre,
+            apellido=apellido,
+            # El numero de orden hace unico al telefono y al email.
+            telefono=str(3_510_000_000 + i),
+            email=f"c{i}.{rnd.randrange(10_000)}@ejemplo.com",
+        )
+
+# |||| Medicion ||||
+
+# Percentil sobre una lista ya ordenada.
+def _percentil(ordenados: List[float], p: float) -> float:
+    if not ordenados:
+        return 0.0
+    pos = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[pos]
+
+# Ejecuta operacion(i) repeticiones veces y devuelve ops/seg, latencias y memoria pico.
+def medir(operacion: Callable[[int], object], repeticiones: int) -> Dict[str, float]:
+    latencias = []
+    inicio = time.perf_counter()
+    for i in range(repeticiones):
+        t0 = time.perf_counter_ns()
+        operacion(i)
+        latencias.append((time.perf_counter_ns() - t0) / 1e6)
+    total = time.perf_counter() - inicio
+    latencias.sort()
+
+    # La memoria se mide aparte porque tracemalloc hace todo mas lento.
+    tracemalloc.start()
+    try:
+        operacion(repeticiones)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "repeticiones": repeticiones,
+        "ops_por_seg": repeticiones / total if total else 0.0,
+        "p50_ms": _percentil(latencias, 50),
+        "p99_ms": _percentil(latencias, 99),
+        "memoria_pico_kb": pico / 1024,
+    }
+
+# Mide todas las operaciones sobre una tabla de `tamano` contactos en una BBDD temporal.
+def medir_tamano(
+    tamano: int,
+    semilla: int = SEMILLA,
+    repeticiones: int = REPETICIONES,
+    opciones_gestor: Optional[dict] = None
+) -> Dict[str, Dict[str, float]]:
+    carpeta = tempfile.mkdtemp(prefix="bench_contactos_")
+    db_path = os.path.join(carpeta, "contactos.db")
+    resultados: Dict[str, Dict[str, float]] = {}
+    try:
+        crear_tabla_contactos(db_path)
+        gestor = GestorDeContactos(db_path, **(opciones_gestor or {}))
+        try:
+            # La carga inicial tambien se informa, en filas por segundo.
+            t0 = time.perf_counter()
+            gestor.agregar_contactos(generar_contactos(tamano, semilla))
+            segundos = time.perf_counter() - t0
+            resultados["agregar_contactos"] = {
+                "repeticiones": tamano,
+                "ops_por_seg": tamano / segundos if segundos else 0.0,
+            }
+
+            rnd = random.Random(semilla)
+            ids = [rnd.randint(1, tamano) for _ in range(repeticiones * 2 + 2)]
+            # Contactos nuevos que no chocan con los cargados.
+            nuevos = list(generar_contactos(repeticiones + 1, semilla, desde=tamano))
+            reemplazos = list(generar_contactos(repeticiones + 1, semilla, desde=tamano * 2 + repeticiones))
+
+            resultados["_existe_duplicado"] = medir(
+                lambda i: gestor._existe_duplicado(
+                    nuevos[i].nombre, nuevos[i].apellido, nuevos[i].telefono, nuevos[i].email
+                ),
+                repeticiones,
+            )
+            resultados["agregar_contacto"] = medir(lambda i: gestor.agregar_contacto(nuevos[i]), repeticiones)
+            resultados["obtener_todos_los_contactos"] = medir(
+                lambda i: gestor.obtener_todos_los_contactos(), min(repeticiones, REPETICIONES_COMPLETAS)
+            )
+            resultados["actualizar_contacto"] = medir(
+                lambda i: gestor.actualizar_contacto(ids[i], reemplazos[i]), repeticiones
+            )
+            # Para borrar se usan otros IDs, asi no se repiten.
+            borrar = list(dict.fromkeys(ids[repeticiones + 1:]))
+            resultados["eliminar_contacto"] = medir(
+                lambda i: gestor.eliminar_contacto(borrar[i % len(borrar)]), repeticiones
+            )
+        finally:
+            gestor.cerrar_conexion()
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+    return resultados
+
+# Corre todos los tamaños y arma el reporte completo.
+def correr(
+    tamanos=TAMANOS,
+    semilla: int = SEMILLA,
+    repeticiones: int = REPETICIONES,
+    opciones_gestor: Optional[dict] = None,
+    progreso: Optional[Callable[[str], None]] = None
+) -> dict:
+    reporte = {
+        "meta": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "plataforma": platform.platform(),
+            "semilla": semilla,
+            "repeticiones": repeticiones,
+            "opciones_gestor": opciones_gestor or {},
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "resultados": {},
+    }
+    for tamano in tamanos:
+        if progreso:
+            progreso(f"Midiendo con {tamano} contactos...")
+        reporte["resultados"][str(tamano)] = medir_tamano(tamano, semilla, repeticiones, opciones_gestor)
+    return reporte
+
+# |||| Comparacion ||||
+
+# Compara dos reportes y devuelve las regresiones encontradas.
+# Una regresion es bajar ops/seg o subir p99 mas que la tolerancia.
+def comparar(base: dict, actual: dict, tolerancia: float = TOLERANCIA) -> List[dict]:
+    regresiones = []
+    for tamano, operaciones in actual.get("resultados", {}).items():
+        for operacion, datos in operaciones.items():
+            previo = base.get("resultados", {}).get(tamano, {}).get(operacion)
+            if not previo:
+                continue
+            if previo.get("ops_por_seg") and datos.get("ops_por_seg") is not None:
+                cambio = datos["ops_por_seg"] / previo["ops_por_seg"] - 1
+                if cambio < -tolerancia:
+                    regresiones.append({"tamano": tamano, "operacion": operacion,
+                                        "metrica": "ops_por_seg", "cambio": cambio})
+            if previo.get("p99_ms") and datos.get("p99_ms") is not None:
+                cambio = datos["p99_ms"] / previo["p99_ms"] - 1
+                if cambio > tolerancia:
+                    regresiones.append({"tamano": tamano, "operacion": operacion,
+                                        "metrica": "p99_ms", "cambio": cambio})
+    return regresiones
+
+# |||| Linea de comandos ||||
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de GestorDeContactos.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_correr = sub.add_parser("correr", help="Mide las operaciones y guarda un reporte JSON.")
+    p_correr.add_argument("--tamanos", type=int, nargs="+", default=list(TAMANOS))
+    p_correr.add_argument("--semilla", type=int, default=SEMILLA)
+    p_correr.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    p_correr.add_argument("--perfil", default=None, help="Perfil de conexión (safe, fast, readonly).")
+    p_correr.add_argument("--indice", action="store_true", help="Usa el indice de duplicados en memoria.")
+    p_correr.add_argument("--salida", default=None, help="Archivo JSON de salida (por defecto stdout).")
+
+    p_comparar = sub.add_parser("comparar", help="Compara dos reportes y falla si hay regresiones.")
+    p_comparar.add_argument("base")
+    p_comparar.add_argument("actual")
+    p_comparar.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+
+    args = parser.parse_args(argv)
+
+    if args.comando == "correr":
+        opciones = {}
+        if args.perfil:
+            opciones["perfil"] = args.perfil
+        if args.indice:
+            opciones["indice_en_memoria"] = True
+        reporte = correr(args.tamanos, args.semilla, args.repeticiones, opciones,
+                         progreso=lambda m: print(m, file=sys.stderr))
+        texto = json.dumps(reporte, indent=2, ensure_ascii=False)
+        if args.salida:
+            with open(args.salida, "w", encoding="utf-8") as f:
+                f.write(texto)
+        else:
+            print(texto)
+        return 0
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.actual, encoding="utf-8") as f:
+        actual = json.load(f)
+    regresiones = comparar(base, actual, args.tolerancia)
+    print(json.dumps({"regresiones": regresiones}, indent=2, ensure_ascii=False))
+    # Codigo de salida distinto de cero para que falle un pipeline.
+    return 1 if regresiones else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
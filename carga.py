@@ -0,0 +1,240 @@
+# Prueba de carga del servicio HTTP (servicio.py) contra localhost.
+# Abre varias conexiones keep-alive y manda solicitudes sin parar durante un tiempo.
+# Uso:
+#     python carga.py --levantar --sembrar 10000 --conexiones 32 --segundos 10
+#     python carga.py --url http://127.0.0.1:8765 --mezcla leer=8,buscar=1,agregar=1 --lote 20
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+from benchmark import generar_contactos
+
+# |||| Configuración ||||
+
+URL = "http://127.0.0.1:8765"
+CONEXIONES = 16
+SEGUNDOS = 10.0
+# Peso de cada tipo de solicitud.
+MEZCLA = "leer=8,buscar=1,agregar=1"
+TEXTOS_BUSQUEDA = ("ana", "juan pe", "gómez", "lucía", "351")
+
+# |||| Cliente HTTP minimo ||||
+
+# Una conexión keep-alive que manda una solicitud y espera la respuesta.
+class Conexion:
+    def __init__(self, host: str, puerto: int):
+        self.host = host
+        self.puerto = puerto
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def pedir(self, metodo: str, ruta: str, cuerpo: Optional[bytes] = None) -> Tuple[int, bytes]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.puerto)
+        cuerpo = cuerpo or b""
+        self._writer.write(
+            f"{metodo} {ruta} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(cuerpo)}\r\n\r\n".encode("latin-1")
+            + cuerpo
+        )
+        cabecera = (await self._reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        estado = int(cabecera[0].split(" ")[1])
+        largo, cerrar = 0, False
+        for linea in cabecera[1:]:
+            nombre, _, valor = linea.partition(":")
+            if nombre.lower() == "content-length":
+                largo = int(valor)
+            elif nombre.lower() == "connection" and valor.strip().lower() == "close":
+                cerrar = True
+        datos = await self._reader.readexactly(largo)
+        if cerrar:
+            self.cerrar()
+        return estado, datos
+
+    def cerrar(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+# |||| Carga ||||
+
+def _percentil(ordenados: List[float], p: float) -> float:
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+def leer_mezcla(texto: str) -> Dict[str, int]:
+    mezcla = {}
+    for parte in texto.split(","):
+        nombre, _, peso = parte.partition("=")
+        if nombre not in ("leer", "buscar", "agregar"):
+            raise ValueError(f"Tipo de solicitud desconocido: {nombre}.")
+        mezcla[nombre] = int(peso or 1)
+    return mezcla
+
+# Arma una operacion (metodo, ruta, cuerpo) al azar segun la mezcla.
+def armar_operacion(rnd: random.Random, mezcla: Dict[str, int], ids: List[int], contador: List[int]) -> dict:
+    tipo = rnd.choices(list(mezcla), weights=list(mezcla.values()))[0]
+    if tipo == "leer" and ids:
+        return {"metodo": "GET", "ruta": f"/contactos/{rnd.choice(ids)}"}
+    if tipo == "buscar" or not ids:
+        return {"metodo": "GET", "ruta": f"/buscar?q={quote(rnd.choice(TEXTOS_BUSQUEDA))}&limite=20"}
+    contador[0] += 1
+    return {"metodo": "POST", "ruta": "/contactos", "cuerpo": {
+        "nombre": "Carga", "apellido": str(contador[0]),
+        "telefono": str(9_000_000_000 + contador[0]), "email": f"carga{contador[0]}.{os.getpid()}@ejemplo.com",
+    }}
+
+# Cada conexión manda solicitudes hasta que se termina el tiempo; con lote > 1 manda /lote.
+async def trabajar(
+    conexion: Conexion,
+    fin: float,
+    mezcla: Dict[str, int],
+    ids: List[int],
+    lote: int,
+    semilla: int,
+    latencias: List[float],
+    estados: Dict[int, int],
+    contador: List[int]
+) -> int:
+    rnd = random.Random(semilla)
+    operaciones = 0
+    while time.perf_counter() < fin:
+        ops = [armar_operacion(rnd, mezcla, ids, contador) for _ in range(lote)]
+        t0 = time.perf_counter()
+        if lote == 1:
+            op = ops[0]
+            cuerpo = json.dumps(op["cuerpo"]).encode("utf-8") if "cuerpo" in op else None
+            estado, _ = await conexion.pedir(op["metodo"], op["ruta"], cuerpo)
+            estados[estado] = estados.get(estado, 0) + 1
+        else:
+            estado, datos = await conexion.pedir("POST", "/lote", json.dumps(ops).encode("utf-8"))
+            for respuesta in json.loads(datos)["respuestas"] if estado == 200 else [{"estado": estado}]:
+                estados[respuesta["estado"]] = estados.get(respuesta["estado"], 0) + 1
+        latencias.append((time.perf_counter() - t0) * 1000)
+        operaciones += len(ops)
+    conexion.cerrar()
+    return operaciones
+
+async def correr(
+    url: str,
+    conexiones: int,
+    segundos: float,
+    mezcla: Dict[str, int],
+    lote: int = 1,
+    sembrar: int = 0
+) -> dict:
+    partes = urlsplit(url)
+    host, puerto = partes.hostname or "127.0.0.1", partes.port or 80
+
+    # Carga datos iniciales con /importar si se pidio.
+    if sembrar:
+        lineas = "".join(
+            json.dumps({"nombre": c.nombre, "apellido": c.apellido, "telefono": c.telefono, "email": c.email},
+                       ensure_ascii=False) + "\n"
+            for c in generar_contactos(sembrar)
+        )
+        conexion = Conexion(host, puerto)
+        estado, datos = await conexion.pedir("POST", "/importar", lineas.encode("utf-8"))
+        conexion.cerrar()
+        if estado != 200:
+            raise RuntimeError(f"No se pudo sembrar: {estado} {datos[:200]!r}")
+
+    # IDs existentes para las lecturas.
+    conexion = Conexion(host, puerto)
+    _estado, datos = await conexion.pedir("GET", "/contactos?limite=1000")
+    conexion.cerrar()
+    ids = [c["id"] for c in json.loads(datos).get("contactos", [])]
+
+    latencias: List[float] = []
+    estados: Dict[int, int] = {}
+    contador = [0]
+    inicio = time.perf_counter()
+    fin = inicio + segundos
+    totales = await asyncio.gather(*(
+        trabajar(Conexion(host, puerto), fin, mezcla, ids, lote, i, latencias, estados, contador)
+        for i in range(conexiones)
+    ))
+    duracion = time.perf_counter() - inicio
+    latencias.sort()
+    return {
+        "url": url,
+        "conexiones": conexiones,
+        "lote": lote,
+        "segundos": round(duracion, 2),
+        "solicitudes_http": len(latencias),
+        "operaciones": sum(totales),
+        "operaciones_por_seg": round(sum(totales) / duracion, 1),
+        "estados": {str(k): v for k, v in sorted(estados.items())},
+        "latencia_ms": {
+            "p50": round(_percentil(latencias, 50), 3),
+            "p95": round(_percentil(latencias, 95), 3),
+            "p99": round(_percentil(latencias, 99), 3),
+            "max": round(latencias[-1], 3) if latencias else 0.0,
+        },
+    }
+
+# Levanta servicio.py en otro proceso con una BBDD temporal y espera a que acepte conexiones.
+def levantar_servicio(puerto: int, hilos: int, commit_ms: Optional[float] = None) -> Tuple[subprocess.Popen, str]:
+    carpeta = tempfile.mkdtemp(prefix="carga-")
+    comando = [sys.executable, "-m", "servicio", "--db", os.path.join(carpeta, "contactos.db"),
+               "--puerto", str(puerto), "--hilos", str(hilos), "--perfil", "fast"]
+    if commit_ms is not None:
+        comando += ["--commit-ms", str(commit_ms)]
+    proceso = subprocess.Popen(comando, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    async def esperar():
+        for _ in range(100):
+            try:
+                _reader, writer = await asyncio.open_connection("127.0.0.1", puerto)
+                writer.close()
+                return
+            except OSError:
+                await asyncio.sleep(0.1)
+        raise RuntimeError("El servicio no arranco.")
+    asyncio.run(esperar())
+    return proceso, carpeta
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio HTTP de contactos.")
+    parser.add_argument("--url", default=URL)
+    parser.add_argument("--conexiones", type=int, default=CONEXIONES)
+    parser.add_argument("--segundos", type=float, default=SEGUNDOS)
+    parser.add_argument("--mezcla", default=MEZCLA, help="Pesos de leer, buscar y agregar.")
+    parser.add_argument("--lote", type=int, default=1, help="Operaciones por solicitud (usa /lote si es mayor a 1).")
+    parser.add_argument("--sembrar", type=int, default=0, help="Importa N contactos antes de empezar.")
+    parser.add_argument("--levantar", action="store_true", help="Levanta el servicio con una BBDD temporal.")
+    parser.add_argument("--hilos", type=int, default=4, help="Hilos del servicio que se levanta.")
+    parser.add_argument("--commit-ms", type=float, default=None, help="Commit agrupado del servicio que se levanta.")
+    args = parser.parse_args(argv)
+
+    proceso = carpeta = None
+    if args.levantar:
+        proceso, carpeta = levantar_servicio(urlsplit(args.url).port or 8765, args.hilos, args.commit_ms)
+    try:
+        reporte = asyncio.run(correr(
+            args.url, args.conexiones, args.segundos, leer_mezcla(args.mezcla), args.lote, args.sembrar
+        ))
+    finally:
+        if proceso is not None:
+            # Con Ctrl+C el servicio cierra la BBDD prolijamente.
+            proceso.send_signal(signal.SIGINT)
+            try:
+                proceso.wait(10)
+            except subprocess.TimeoutExpired:
+                proceso.kill()
+            shutil.rmtree(carpeta, ignore_errors=True)
+    print(json.dumps(reporte, indent=2, ensure_ascii=False))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
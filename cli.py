@@ -0,0 +1,342 @@
+# Linea de comandos para usar el gestor sin interfaz grafica (nunca importa tkinter).
+# Cada resultado se imprime como una linea JSON.
+# Uso:
+#     python -m cli add --nombre Ana --telefono 351000
+#     python -m cli list --limite 20
+#     python -m cli search "ana per"
+#     python -m cli update 7 --email ana@mail.com
+#     python -m cli delete 7
+#     python -m cli import contactos.csv
+#     python -m cli export contactos.jsonl.gz
+#     python -m cli dups --umbral 0.9
+#     python -m cli merge 7 12
+#     python -m cli changes --desde 120
+#     python -m cli backup copia.db
+#     python -m cli vacuum --completo
+#     python -m cli check --rapido
+#     python -m cli bench --arranque 10
+#     python -m cli batch < comandos.txt
+import argparse
+import json
+import os
+import sys
+from typing import Callable, List, Optional
+
+import duplicados
+from main import (
+    CAMBIOS_A_CONSERVAR, DB_NAME, PAGINAS_POR_PASO, Contacto, GestorDeContactos, crear_tabla_contactos,
+    fila_a_dict
+)
+
+# |||| Salida ||||
+
+# Imprime un objeto como una linea JSON.
+def emitir(objeto, salida=None):
+    (salida or sys.stdout).write(json.dumps(objeto, ensure_ascii=False) + "\n")
+
+# |||| Comandos ||||
+
+def cmd_add(gestor: GestorDeContactos, args) -> dict:
+    nuevo_id = gestor.agregar_contacto(Contacto(args.nombre, args.apellido, args.telefono, args.email))
+    return {"ok": True, "id": nuevo_id}
+
+def cmd_list(gestor: GestorDeContactos, args) -> None:
+    # Con --todos recorre la tabla de a bloques, si no devuelve una pagina.
+    filas = gestor.iterar_contactos() if args.todos else gestor.obtener_pagina(args.antes_de, args.limite)
+    for fila in filas:
+        emitir(fila_a_dict(fila))
+
+def cmd_search(gestor: GestorDeContactos, args) -> None:
+    for fila in gestor.buscar(args.texto, args.limite):
+        emitir(fila_a_dict(fila))
+
+def cmd_update(gestor: GestorDeContactos, args) -> dict:
+    actual = gestor.obtener_por_id(args.id)
+    if actual is None:
+        return {"ok": False, "error": "No se encontró el contacto para actualizar."}
+    # Los campos que no se pasan mantienen su valor.
+    _id, nombre, apellido, telefono, email = actual
+    contacto = Contacto(
+        args.nombre if args.nombre is not None else nombre,
+        args.apellido if args.apellido is not None else (apellido or ""),
+        args.telefono if args.telefono is not None else (telefono or ""),
+        args.email if args.email is not None else (email or ""),
+    )
+    return {"ok": gestor.actualizar_contacto(args.id, contacto), "id": args.id}
+
+def cmd_delete(gestor: GestorDeContactos, args) -> dict:
+    return {"ok": gestor.eliminar_contacto(args.id), "id": args.id}
+
+def cmd_import(gestor: GestorDeContactos, args) -> dict:
+    resultados = gestor.importar_archivo(args.ruta, args.lote)
+    rechazados = [{"fila": i, "motivo": motivo} for i, ok, motivo in resultados if not ok]
+    return {
+        "ok": True,
+        "aceptados": len(resultados) - len(rechazados),
+        "rechazados": len(rechazados),
+        "errores": rechazados,
+    }
+
+def cmd_export(gestor: GestorDeContactos, args) -> Optional[dict]:
+    cantidad = gestor.exportar(args.destino, formato=args.formato, comprimir=args.gzip, busqueda=args.buscar)
+    resultado = {"ok": True, "exportados": cantidad}
+    # Si los datos salen por stdout el resumen va a stderr para no mezclarlos.
+    if args.destino == "-":
+        emitir(resultado, sys.stderr)
+        return None
+    return resultado
+
+def cmd_dups(gestor: GestorDeContactos, args) -> None:
+    for id_a, id_b, puntaje, clave in gestor.buscar_duplicados_probables(args.umbral, args.max_bloque):
+        emitir({"id_a": id_a, "id_b": id_b, "puntaje": puntaje, "clave": clave})
+
+def cmd_merge(gestor: GestorDeContactos, args) -> dict:
+    fila = gestor.fusionar_contactos(args.conservar, args.eliminar)
+    if fila is None:
+        return {"ok": False, "error": "No se encontró alguno de los contactos."}
+    return dict(fila_a_dict(fila), ok=True)
+
+def cmd_changes(gestor: GestorDeContactos, args) -> Optional[dict]:
+    cambios, version = gestor.cambios_desde(args.desde, args.limite, con_filas=True)
+    if cambios is None:
+        return {"ok": False, "error": "Esos cambios ya se depuraron, hay que volver a leer todo.", "version": version}
+    for numero, op, contacto_id, momento, fila in cambios:
+        emitir({"version": numero, "op": op, "id": contacto_id, "momento": momento,
+                "contacto": fila_a_dict(fila) if fila is not None else None})
+    return None
+
+# |||| Mantenimiento ||||
+
+def cmd_backup(gestor: GestorDeContactos, args) -> dict:
+    return dict(gestor.respaldar(args.destino, args.paginas), ok=True)
+
+def cmd_optimize(gestor: GestorDeContactos, args) -> dict:
+    return dict(gestor.optimizar(args.analizar), ok=True)
+
+def cmd_vacuum(gestor: GestorDeContactos, args) -> dict:
+    return dict(gestor.compactar(args.paginas, args.completo), ok=True)
+
+def cmd_check(gestor: GestorDeContactos, args) -> dict:
+    return gestor.verificar_integridad(args.rapido)
+
+def cmd_maintain(gestor: GestorDeContactos, args) -> None:
+    for informe in gestor.mantenimiento(args.conservar):
+        emitir(informe)
+
+# Mide el tiempo de arranque en frio de la CLI lanzando procesos nuevos.
+def medir_arranque(veces: int, db_path: str) -> dict:
+    import subprocess
+    import time
+    tiempos = []
+    for _ in range(veces):
+        t0 = time.perf_counter()
+        # Se corre desde la carpeta del proyecto, asi "-m cli" funciona desde cualquier lado.
+        subprocess.run(
+            [sys.executable, "-m", "cli", "--db", os.path.abspath(db_path), "list", "--limite", "0"],
+            check=True, stdout=subprocess.DEVNULL, cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    tiempos.sort()
+    return {
+        "ok": True,
+        "arranque_p50_ms": tiempos[len(tiempos) // 2],
+        "arranque_min_ms": tiempos[0],
+        "arranque_max_ms": tiempos[-1],
+    }
+
+def cmd_bench(gestor: Optional[GestorDeContactos], args) -> dict:
+    if args.arranque:
+        return medir_arranque(args.arranque, args.db)
+    # El benchmark usa sus propias BBDD temporales.
+    import benchmark
+    return benchmark.correr(args.tamanos, args.semilla, args.repeticiones)
+
+# |||| Parser ||||
+
+def armar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Gestor de contactos sin interfaz.")
+    parser.add_argument("--db", default=DB_NAME, help="Ruta de la BBDD.")
+    parser.add_argument("--perfil", default=None, help="Perfil de conexión (safe, fast, readonly).")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("add", help="Agrega un contacto.")
+    p.add_argument("--nombre", required=True)
+    p.add_argument("--apellido", default="")
+    p.add_argument("--telefono", default="")
+    p.add_argument("--email", default="")
+    p.set_defaults(funcion=cmd_add)
+
+    p = sub.add_parser("list", help="Lista contactos del mas nuevo al mas viejo.")
+    p.add_argument("--antes-de", type=int, default=None, dest="antes_de",
+                   help="ID de la ultima fila de la pagina anterior.")
+    p.add_argument("--limite", type=int, default=100)
+    p.add_argument("--todos", action="store_true", help="Lista toda la tabla.")
+    p.set_defaults(funcion=cmd_list)
+
+    p = sub.add_parser("search", help="Busca contactos por texto.")
+    p.add_argument("texto")
+    p.add_argument("--limite", type=int, default=100)
+    p.set_defaults(funcion=cmd_search)
+
+    p = sub.add_parser("update", help="Actualiza un contacto, los campos omitidos no cambian.")
+    p.add_argument("id", type=int)
+    p.add_argument("--nombre", default=None)
+    p.add_argument("--apellido", default=None)
+    p.add_argument("--telefono", default=None)
+    p.add_argument("--email", default=None)
+    p.set_defaults(funcion=cmd_update)
+
+    p = sub.add_parser("delete", help="Elimina un contacto.")
+    p.add_argument("id", type=int)
+    p.set_defaults(funcion=cmd_delete)
+
+    p = sub.add_parser("import", help="Importa un CSV o JSON Lines.")
+    p.add_argument("ruta")
+    p.add_argument("--lote", type=int, default=500)
+    p.set_defaults(funcion=cmd_import)
+
+    p = sub.add_parser("export", help="Exporta a CSV, JSON Lines o vCard.")
+    p.add_argument("destino")
+    p.add_argument("--formato", default=None)
+    p.add_argument("--gzip", action="store_true", default=None)
+    p.add_argument("--buscar", default=None)
+    p.set_defaults(funcion=cmd_export)
+
+    p = sub.add_parser("dups", help="Lista pares de contactos que probablemente esten repetidos.")
+    p.add_argument("--umbral", type=float, default=duplicados.UMBRAL_SIMILITUD,
+                   help="Puntaje minimo entre 0 y 1.")
+    p.add_argument("--max-bloque", type=int, default=duplicados.MAX_BLOQUE, dest="max_bloque",
+                   help="Los grupos con mas contactos que esto no se comparan.")
+    p.set_defaults(funcion=cmd_dups)
+
+    p = sub.add_parser("merge", help="Fusiona dos contactos y borra el segundo.")
+    p.add_argument("conservar", type=int)
+    p.add_argument("eliminar", type=int)
+    p.set_defaults(funcion=cmd_merge)
+
+    p = sub.add_parser("changes", help="Lista los cambios posteriores a una version.")
+    p.add_argument("--desde", type=int, default=0, help="Ultima version ya vista.")
+    p.add_argument("--limite", type=int, default=1000)
+    p.set_defaults(funcion=cmd_changes)
+
+    p = sub.add_parser("backup", help="Copia la BBDD a otro archivo sin frenar a los que escriben.")
+    p.add_argument("destino")
+    p.add_argument("--paginas", type=int, default=PAGINAS_POR_PASO, help="Paginas que se copian por paso.")
+    p.set_defaults(funcion=cmd_backup)
+
+    p = sub.add_parser("optimize", help="Actualiza las estadisticas que usa SQLite para elegir indices.")
+    p.add_argument("--analizar", action="store_true", help="Corre ANALYZE sobre todo en lugar de PRAGMA optimize.")
+    p.set_defaults(funcion=cmd_optimize)
+
+    p = sub.add_parser("vacuum", help="Devuelve al sistema las paginas libres.")
+    p.add_argument("--paginas", type=int, default=None, help="Paginas a liberar (por defecto todas).")
+    p.add_argument("--completo", action="store_true",
+                   help="VACUUM completo, activa el modo incremental en BBDD viejas.")
+    p.set_defaults(funcion=cmd_vacuum)
+
+    p = sub.add_parser("check", help="Revisa la integridad de la BBDD y del indice de busqueda.")
+    p.add_argument("--rapido", action="store_true", help="quick_check en lugar de integrity_check.")
+    p.set_defaults(funcion=cmd_check)
+
+    p = sub.add_parser("maintain", help="Depura cambios viejos, libera paginas y actualiza estadisticas.")
+    p.add_argument("--conservar", type=int, default=CAMBIOS_A_CONSERVAR, help="Cambios que quedan en el registro.")
+    p.set_defaults(funcion=cmd_maintain)
+
+    p = sub.add_parser("bench", help="Corre el benchmark o mide el arranque en frio.")
+    p.add_argument("--tamanos", type=int, nargs="+", default=[1000])
+    p.add_argument("--semilla", type=int, default=42)
+    p.add_argument("--repeticiones", type=int, default=200)
+    p.add_argument("--arranque", type=int, default=0, metavar="N",
+                   help="Lanza la CLI N veces y mide el tiempo de arranque.")
+    p.set_defaults(funcion=cmd_bench, sin_gestor=True)
+
+    p = sub.add_parser("batch", help="Lee un comando por linea desde stdin y usa una sola conexión.")
+    p.add_argument("--transaccion", action="store_true", help="Todo o nada: confirma solo si no hubo errores.")
+    p.add_argument("--detener", action="store_true", help="Se detiene en el primer error.")
+    p.set_defaults(funcion=None)
+    return parser
+
+# |||| Ejecucion ||||
+
+# Ejecuta un comando ya parseado y emite su resultado, devuelve False si fallo.
+def ejecutar(gestor: Optional[GestorDeContactos], args) -> bool:
+    try:
+        resultado = args.funcion(gestor, args)
+    except (ValueError, OSError) as e:
+        emitir({"ok": False, "error": str(e)})
+        return False
+    except Exception as e:
+        emitir({"ok": False, "error": f"{type(e).__name__}: {e}"})
+        return False
+    if resultado is not None:
+        emitir(resultado)
+        return bool(resultado.get("ok", True))
+    return True
+
+# Modo lote: cada linea de stdin es un comando (sin las opciones globales), todo sobre la misma conexión.
+def ejecutar_lote(gestor: GestorDeContactos, parser: argparse.ArgumentParser, args, entrada) -> bool:
+    import shlex
+    todo_ok = True
+
+    def correr_lineas(al_fallar: Callable[[], None]):
+        nonlocal todo_ok
+        for linea in entrada:
+            linea = linea.strip()
+            # Saltea lineas vacias y comentarios.
+            if not linea or linea.startswith("#"):
+                continue
+            try:
+                sub_args = parser.parse_args(["--db", args.db] + shlex.split(linea))
+            # ValueError es de shlex (por ejemplo una comilla sin cerrar).
+            except (SystemExit, ValueError):
+                emitir({"ok": False, "error": f"Comando invalido: {linea}"})
+                sub_args = None
+            if sub_args is not None and sub_args.funcion is None:
+                emitir({"ok": False, "error": "batch no se puede anidar."})
+                sub_args = None
+            ok = sub_args is not None and ejecutar(gestor, sub_args)
+            if not ok:
+                todo_ok = False
+                al_fallar()
+                if args.detener:
+                    return
+
+    if not args.transaccion:
+        correr_lineas(lambda: None)
+        return todo_ok
+
+    # En modo transaccion cualquier error deshace todo lo hecho.
+    class _Cancelar(Exception):
+        pass
+
+    def cancelar():
+        raise _Cancelar()
+
+    try:
+        with gestor.transaccion():
+            correr_lineas(cancelar)
+    except _Cancelar:
+        emitir({"ok": False, "error": "Se deshicieron los cambios del lote."})
+    return todo_ok
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = armar_parser()
+    args = parser.parse_args(argv)
+
+    # El benchmark no necesita la BBDD del usuario.
+    if getattr(args, "sin_gestor", False):
+        return 0 if ejecutar(None, args) else 1
+
+    crear_tabla_contactos(args.db, perfil=args.perfil)
+    gestor = GestorDeContactos(args.db, perfil=args.perfil)
+    try:
+        if args.funcion is None:
+            ok = ejecutar_lote(gestor, parser, args, sys.stdin)
+        else:
+            ok = ejecutar(gestor, args)
+    finally:
+        gestor.cerrar_conexion()
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+# Deteccion de duplicados probables ("Juan Pérez" y "juan perez " con el mismo teléfono en otro formato).
+# Cada contacto guarda claves normalizadas; solo se comparan los pares que comparten alguna clave
+# (bloques), asi no hace falta comparar todos contra todos.
+import re
+import unicodedata
+from functools import lru_cache
+from itertools import combinations
+from typing import Iterable, Iterator, List, Set, Tuple
+
+# |||| Configuración ||||
+
+# Digitos finales del teléfono que forman su clave (asi "+54 351 555-1234" y "3515551234" coinciden).
+DIGITOS_TELEFONO = 8
+# Puntaje minimo para informar un par como duplicado probable.
+UMBRAL_SIMILITUD = 0.85
+# Los bloques mas grandes se saltean para no volver a comparar todos contra todos.
+MAX_BLOQUE = 200
+# Peso de cada campo en el puntaje; los campos vacios en alguno de los dos no cuentan.
+PESOS = {"nombre": 0.5, "telefono": 0.25, "email": 0.25}
+# Dominios donde los puntos de la parte local no cuentan.
+DOMINIOS_SIN_PUNTOS = {"gmail.com": "gmail.com", "googlemail.com": "gmail.com"}
+
+# Columnas de claves, en el orden en que las devuelve claves().
+COLUMNAS_CLAVE = ("nombre_clave", "telefono_clave", "email_clave", "fonetica")
+
+# Claves de un contacto: (nombre, teléfono, email, fonetica).
+Claves = Tuple[str, str, str, str]
+
+_NO_ALFANUMERICO = re.compile(r"[^0-9a-z]+")
+_NO_DIGITO = re.compile(r"\D")
+# Reglas foneticas simples para español, se aplican en orden.
+# "gue"/"gui" dejan una G de marca (el texto ya viene en minusculas) para que la regla siguiente no la
+# pase a "j"; al final vuelve a ser "g".
+_REGLAS_FONETICAS = (
+    (re.compile(r"ch"), "x"),
+    (re.compile(r"qu"), "k"),
+    (re.compile(r"ll"), "y"),
+    (re.compile(r"gu(?=[ei])"), "G"),
+    (re.compile(r"g(?=[ei])"), "j"),
+    (re.compile(r"c(?=[ei])"), "s"),
+    (re.compile(r"c"), "k"),
+    (re.compile(r"z"), "s"),
+    (re.compile(r"v"), "b"),
+    (re.compile(r"w"), "b"),
+    (re.compile(r"h"), ""),
+    (re.compile(r"y$"), "i"),
+)
+_VOCALES = re.compile(r"[aeiou]")
+_REPETIDAS = re.compile(r"(.)\1+")
+
+# |||| Claves normalizadas ||||
+
+# Cuantos resultados se recuerdan; los nombres se repiten mucho, asi se calculan una vez.
+TAMANO_CACHE = 65536
+
+# Saca acentos, pasa a minusculas y deja palabras separadas por un espacio.
+@lru_cache(maxsize=TAMANO_CACHE)
+def plegar(texto: str) -> str:
+    sin_acentos = "".join(
+        c for c in unicodedata.normalize("NFKD", texto or "") if not unicodedata.combining(c)
+    )
+    return _NO_ALFANUMERICO.sub(" ", sin_acentos.casefold()).strip()
+
+def clave_nombre(nombre: str, apellido: str) -> str:
+    return f"{plegar(nombre)} {plegar(apellido)}".strip()
+
+# Solo los ultimos DIGITOS_TELEFONO digitos.
+def clave_telefono(telefono: str) -> str:
+    return _NO_DIGITO.sub("", telefono or "")[-DIGITOS_TELEFONO:]
+
+# Email en minusculas, sin "+etiqueta" y sin los puntos que Gmail ignora.
+def clave_email(email: str) -> str:
+    email = (email or "").strip().casefold()
+    if "@" not in email:
+        return email
+    local, _, dominio = email.rpartition("@")
+    local = local.split("+", 1)[0]
+    if dominio in DOMINIOS_SIN_PUNTOS:
+        local = local.replace(".", "")
+        dominio = DOMINIOS_SIN_PUNTOS[dominio]
+    return f"{local}@{dominio}"
+
+# Codigo fonetico de una palabra: primera letra y el esqueleto de consonantes.
+@lru_cache(maxsize=TAMANO_CACHE)
+def _codigo_palabra(palabra: str) -> str:
+    for patron, reemplazo in _REGLAS_FONETICAS:
+        palabra = patron.sub(reemplazo, palabra)
+    palabra = palabra.replace("G", "g")
+    palabra = _REPETIDAS.sub(r"\1", palabra)
+    if not palabra:
+        return ""
+    return palabra[0] + _VOCALES.sub("", palabra[1:])
+
+# Codigo fonetico de un nombre ya plegado ("juan perez" y "juan peres" dan lo mismo).
+def _codigo_plegado(plegado: str) -> str:
+    codigos = (_codigo_palabra(p) for p in plegado.split())
+    return " ".join(c for c in codigos if c)
+
+def codigo_fonetico(nombre: str, apellido: str) -> str:
+    return _codigo_plegado(clave_nombre(nombre, apellido))
+
+# Todas las claves de un contacto, en el orden de COLUMNAS_CLAVE.
+def claves(nombre: str, apellido: str, telefono: str, email: str) -> Claves:
+    plegado = clave_nombre(nombre, apellido)
+    return plegado, clave_telefono(telefono), clave_email(email), _codigo_plegado(plegado)
+
+# |||| Puntaje ||||
+
+# Puntaje entre 0 y 1 de dos contactos a partir de sus claves.
+def similitud(a: Claves, b: Claves) -> float:
+    # difflib se importa recien aca para no sumar tiempo de arranque.
+    from difflib import SequenceMatcher
+    total = peso_usado = 0.0
+    if a[0] and b[0]:
+        total += PESOS["nombre"] * SequenceMatcher(None, a[0], b[0]).ratio()
+        peso_usado += PESOS["nombre"]
+    for campo, i in (("telefono", 1), ("email", 2)):
+        if a[i] and b[i]:
+            total += PESOS[campo] * (a[i] == b[i])
+            peso_usado += PESOS[campo]
+    return total / peso_usado if peso_usado else 0.0
+
+# |||| Bloques ||||
+
+# Compara los pares de cada bloque y devuelve (id_a, id_b, puntaje, clave del bloque) ordenados por puntaje.
+# bloques es un iterable de (nombre de la clave, [(id, claves), ...]); un par se compara una sola vez
+# aunque comparta varias claves.
+def pares_probables(
+    bloques: Iterable[Tuple[str, List[Tuple[int, Claves]]]],
+    umbral: float = UMBRAL_SIMILITUD,
+    max_bloque: int = MAX_BLOQUE
+) -> List[Tuple[int, int, float, str]]:
+    vistos: Set[Tuple[int, int]] = set()
+    pares: List[Tuple[int, int, float, str]] = []
+    for nombre_clave, bloque in bloques:
+        if len(bloque) < 2 or len(bloque) > max_bloque:
+            continue
+        for (id_a, claves_a), (id_b, claves_b) in combinations(bloque, 2):
+            par = (id_a, id_b) if id_a < id_b else (id_b, id_a)
+            if par in vistos:
+                continue
+            vistos.add(par)
+            puntaje = similitud(claves_a, claves_b)
+            if puntaje >= umbral:
+                pares.append((par[0], par[1], round(puntaje, 4), nombre_clave))
+    pares.sort(key=lambda p: (-p[2], p[0], p[1]))
+    return pares
+
+# Agrupa filas (valor de la clave, id, claves) que ya vienen ordenadas por la clave.
+def agrupar_bloques(nombre_clave: str, filas: Iterable[Tuple]) -> Iterator[Tuple[str, List[Tuple[int, Claves]]]]:
+    actual = None
+    bloque: List[Tuple[int, Claves]] = []
+    for valor, contacto_id, *resto in filas:
+        if valor != actual:
+            if bloque:
+                yield nombre_clave, bloque
+            actual, bloque = valor, []
+        bloque.append((contacto_id, tuple(resto)))
+    if bloque:
+        yield nombre_clave, bloque
+
+# Para fusionar: los campos vacios del que se conserva se completan con los del otro.
+def combinar(conservar: Tuple[str, str, str, str], otro: Tuple[str, str, str, str]) -> Tuple[str, str, str, str]:
+    return tuple(a if a else (b or "") for a, b in zip(conservar, otro))
@@ -0,0 +1,158 @@
+# Exporta los contactos a CSV, JSON Lines o vCard recorriendo la tabla de a bloques.
+# Uso:
+#     python exportar.py contactos.csv
+#     python exportar.py contactos.jsonl.gz --buscar "perez"
+#     python exportar.py - --formato vcf
+import argparse
+import csv
+import gzip
+import io
+import json
+import sys
+from typing import Callable, Iterable, Optional, TextIO, Tuple
+
+from main import COLUMNAS, DB_NAME, GestorDeContactos, crear_tabla_contactos, fila_a_dict
+
+# Formatos soportados y las extensiones que los identifican.
+FORMATOS = {
+    "csv": (".csv",),
+    "jsonl": (".jsonl", ".ndjson"),
+    "vcf": (".vcf", ".vcard"),
+}
+
+# Cada cuantas filas se llama al callback de progreso.
+CADA_PROGRESO = 1000
+
+# |||| Formatos ||||
+
+# Deduce el formato por la extension (se ignora un .gz final).
+def detectar_formato(destino: str) -> str:
+    nombre = destino.lower()
+    if nombre.endswith(".gz"):
+        nombre = nombre[:-3]
+    for formato, extensiones in FORMATOS.items():
+        if nombre.endswith(extensiones):
+            return formato
+    raise ValueError("No se reconoce el formato, use .csv, .jsonl o .vcf (o indique formato).")
+
+# Escapa un valor segun las reglas de vCard 3.0.
+def _escapar_vcard(valor) -> str:
+    texto = "" if valor is None else str(valor)
+    return (texto.replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n"))
+
+# Arma la tarjeta vCard de una fila.
+def fila_a_vcard(fila: Tuple) -> str:
+    _id, nombre, apellido, telefono, email = (_escapar_vcard(v) for v in fila)
+    lineas = [
+        "BEGIN:VCARD",
+        "VERSION:3.0",
+        f"N:{apellido};{nombre};;;",
+        f"FN:{(nombre + ' ' + apellido).strip()}",
+    ]
+    if telefono:
+        lineas.append(f"TEL;TYPE=CELL:{telefono}")
+    if email:
+        lineas.append(f"EMAIL;TYPE=INTERNET:{email}")
+    lineas.append(f"UID:contacto-{_id}")
+    lineas.append("END:VCARD")
+    # vCard usa CRLF como fin de linea.
+    return "\r\n".join(lineas) + "\r\n"
+
+# Escribe las filas en el formato pedido y devuelve cuantas se escribieron.
+def escribir(
+    filas: Iterable[Tuple],
+    salida: TextIO,
+    formato: str,
+    progreso: Optional[Callable[[int], None]] = None
+) -> int:
+    cantidad = 0
+    if formato == "csv":
+        escritor = csv.writer(salida)
+        escritor.writerow(COLUMNAS)
+        escribir_fila = escritor.writerow
+    elif formato == "jsonl":
+        escribir_fila = lambda fila: salida.write(
+            json.dumps(fila_a_dict(fila), ensure_ascii=False) + "\n"
+        )
+    elif formato == "vcf":
+        escribir_fila = lambda fila: salida.write(fila_a_vcard(fila))
+    else:
+        raise ValueError(f"Formato desconocido: {formato}.")
+
+    for fila in filas:
+        escribir_fila(fila)
+        cantidad += 1
+        if progreso and cantidad % CADA_PROGRESO == 0:
+            progreso(cantidad)
+    if progreso:
+        progreso(cantidad)
+    return cantidad
+
+# |||| Exportacion ||||
+
+# Exporta los contactos del gestor a destino ("-" es la salida estandar).
+# formato: "csv", "jsonl" o "vcf"; si no se indica se deduce de la extension.
+# comprimir: gzip; si no se indica se usa cuando destino termina en .gz.
+# busqueda: texto para exportar solo los que coinciden en la busqueda de texto completo.
+# filtro: funcion que recibe la fila (id, nombre, apellido, telefono, email) y decide si se exporta.
+# progreso: se llama cada CADA_PROGRESO filas con la cantidad escrita hasta el momento.
+def exportar(
+    gestor,
+    destino: str,
+    formato: Optional[str] = None,
+    comprimir: Optional[bool] = None,
+    busqueda: Optional[str] = None,
+    filtro: Optional[Callable[[Tuple], bool]] = None,
+    progreso: Optional[Callable[[int], None]] = None
+) -> int:
+    formato = formato or detectar_formato(destino)
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconocido: {formato}.")
+    if comprimir is None:
+        comprimir = destino.lower().endswith(".gz")
+
+    # Las filas salen de a bloques del cursor, nunca se carga la tabla completa.
+    filas = gestor.iterar_busqueda(busqueda) if busqueda else gestor.iterar_contactos()
+    if filtro is not None:
+        filas = (fila for fila in filas if filtro(fila))
+
+    if destino == "-":
+        if comprimir:
+            with gzip.GzipFile(fileobj=sys.stdout.buffer, mode="wb") as gz:
+                with io.TextIOWrapper(gz, encoding="utf-8", newline="") as salida:
+                    return escribir(filas, salida, formato, progreso)
+        return escribir(filas, sys.stdout, formato, progreso)
+    if comprimir:
+        with gzip.open(destino, "wt", encoding="utf-8", newline="") as salida:
+            return escribir(filas, salida, formato, progreso)
+    with open(destino, "w", encoding="utf-8", newline="") as salida:
+        return escribir(filas, salida, formato, progreso)
+
+# |||| Linea de comandos ||||
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Exporta los contactos a CSV, JSON Lines o vCard.")
+    parser.add_argument("destino", help='Archivo de salida, o "-" para la salida estandar.')
+    parser.add_argument("--formato", choices=sorted(FORMATOS), default=None)
+    parser.add_argument("--gzip", action="store_true", default=None, help="Comprime la salida.")
+    parser.add_argument("--buscar", default=None, help="Exporta solo los que coinciden con el texto.")
+    parser.add_argument("--db", default=None, help="Ruta de la BBDD.")
+    args = parser.parse_args(argv)
+
+    db_path = args.db or DB_NAME
+    # Se asegura que la tabla exista y este migrada (--buscar necesita la tabla de busqueda).
+    crear_tabla_contactos(db_path)
+    gestor = GestorDeContactos(db_path)
+    try:
+        cantidad = exportar(
+            gestor, args.destino, args.formato, args.gzip, args.buscar,
+            progreso=lambda n: print(f"\r{n} contactos", end="", file=sys.stderr),
+        )
+    finally:
+        gestor.cerrar_conexion()
+    print(f"\rExportados {cantidad} contactos.", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,580 @@
+# Reparte los contactos entre varias BBDD (fragmentos): contactos.db -> contactos.0.db, contactos.1.db, ...
+# GestorFragmentado tiene la misma interfaz que GestorDeContactos; cada fragmento es un GestorAsincrono
+# con su propio hilo, las consultas van a todos en paralelo y los resultados se mezclan en orden.
+import heapq
+import sqlite3
+import threading
+import zlib
+from array import array
+from itertools import islice
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import duplicados
+import validacion
+from main import (
+    CAMBIOS_A_CONSERVAR, COLUMNAS, COLUMNAS_BLOQUE, DB_NAME, LIMITE_CAMBIOS, TAMANO_LOTE, Contacto,
+    GestorAsincrono, _resolver_perfil, _sincronizado, armar_consulta_fts, conectar, crear_tabla_contactos,
+    fila_a_contacto, leer_contactos_archivo, separar_nuevas, validar_lote
+)
+
+# |||| Configuración ||||
+
+# Variable de entorno con la cantidad de fragmentos que usa main() (0 o 1 = una sola BBDD).
+VARIABLE_FRAGMENTOS = "CONTACTOS_FRAGMENTOS"
+
+# Veces que se reintenta guardar si otro proceso ya uso los IDs elegidos.
+REINTENTOS_ID = 3
+
+# obtener_rango recuerda el ID de cada tantas posiciones que recorre, para partir de ahi en el proximo pedido.
+PASO_ANCLAS = 10_000
+# Posiciones recordadas como maximo; al pasarse se olvidan todas.
+MAX_ANCLAS = 1024
+
+# Motivos de duplicado en el orden en que los controla agregar_contacto.
+MOTIVOS_DUPLICADO = (
+    "Existe un contacto con exactamente los mismos datos.",
+    "Ya existe un contacto con el mismo email.",
+    "Ya existe un contacto con el mismo teléfono.",
+)
+
+# |||| Archivos y reparto ||||
+
+# Ruta del fragmento i: contactos.db -> contactos.0.db, contactos.1.db, ...
+def ruta_fragmento(db_path: str, indice: int) -> str:
+    ruta = Path(db_path)
+    return str(ruta.with_name(f"{ruta.stem}.{indice}{ruta.suffix}"))
+
+# Fragmento donde se guarda un contacto nuevo: hash estable de su email normalizado
+# (o del teléfono o el nombre si no tiene email). Los duplicados exactos y por email caen juntos.
+def fragmento_de(fila: Tuple[str, str, str, str], fragmentos: int) -> int:
+    nombre, apellido, telefono, email = fila
+    clave = (
+        duplicados.clave_email(email)
+        or duplicados.clave_telefono(telefono)
+        or duplicados.clave_nombre(nombre, apellido)
+    )
+    return zlib.crc32(clave.encode("utf-8")) % fragmentos
+
+# Cantidad de fragmentos anotada en un fragmento, o None si el archivo no existe o no la tiene.
+def leer_cantidad_fragmentos(ruta: str) -> Optional[int]:
+    if not Path(ruta).exists():
+        return None
+    conn = conectar(ruta, "readonly")
+    try:
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'fragmento'").fetchone() is None:
+            return None
+        fila = conn.execute("SELECT fragmentos FROM fragmento").fetchone()
+        return fila[0] if fila else None
+    finally:
+        conn.close()
+
+# Anota en el fragmento su numero y la cantidad total, o controla que coincidan si ya estaban.
+# Un fragmento con contactos y sin anotar no se sabe como se repartio, asi que tampoco se abre.
+def anotar_fragmento(ruta: str, indice: int, fragmentos: int, perfil: Optional[str] = None):
+    if _resolver_perfil(perfil) == "readonly":
+        anotado = leer_cantidad_fragmentos(ruta)
+        if anotado is not None and anotado != fragmentos:
+            raise ValueError(f"{ruta} es parte de {anotado} fragmentos, no de {fragmentos}.")
+        return
+    conn = conectar(ruta, perfil)
+    try:
+        conn.execute("CREATE TABLE IF NOT EXISTS fragmento (indice INTEGER NOT NULL, fragmentos INTEGER NOT NULL)")
+        fila = conn.execute("SELECT indice, fragmentos FROM fragmento").fetchone()
+        if fila is None:
+            if conn.execute("SELECT COUNT(*) FROM contactos").fetchone()[0]:
+                raise ValueError(f"{ruta} ya tiene contactos y no dice en cuantos fragmentos se repartieron.")
+            conn.execute("INSERT INTO fragmento(indice, fragmentos) VALUES(?, ?)", (indice, fragmentos))
+            conn.commit()
+        elif fila != (indice, fragmentos):
+            raise ValueError(f"{ruta} es el fragmento {fila[0]} de {fila[1]}, no el {indice} de {fragmentos}.")
+    finally:
+        conn.close()
+
+# Junta los informes de mantenimiento de los fragmentos: suma los numeros y concatena las listas;
+# "ms" es el del fragmento mas lento porque corren en paralelo. El detalle queda en "fragmentos".
+def _sumar_informes(informes: List[dict]) -> dict:
+    total = dict(informes[0])
+    for informe in informes[1:]:
+        for clave, valor in informe.items():
+            if clave == "ms":
+                total[clave] = max(total[clave], valor)
+            elif isinstance(valor, bool):
+                total[clave] = total[clave] and valor
+            elif isinstance(valor, (int, float, list)):
+                total[clave] = total[clave] + valor
+    total["fragmentos"] = informes
+    return total
+
+# |||| Gestor ||||
+
+# Los IDs salen de una sola secuencia creciente, asi ORDER BY id DESC sigue siendo "del mas nuevo al
+# mas viejo"; cada ID se elige para que id % fragmentos sea el fragmento que lo guarda, y se guarda tal
+# cual en ese fragmento. Del ID se sabe donde esta el contacto, por eso un contacto no cambia de
+# fragmento al actualizarlo y la cantidad de fragmentos queda anotada en cada archivo y no se puede
+# cambiar despues.
+# Cada fragmento confirma por su cuenta: no hay transacciones entre fragmentos.
+# Las escrituras van de a una (un solo bloqueo) y cada alta se controla contra todos los fragmentos,
+# asi que repartir no escribe mas rapido: lo que se gana es en lecturas y en el tamaño de cada archivo.
+# Las opciones extra se pasan a cada GestorDeContactos.
+class GestorFragmentado:
+    def __init__(self, db_path: str = DB_NAME, fragmentos: int = 2, **opciones):
+        if fragmentos < 1:
+            raise ValueError("Se necesita al menos un fragmento.")
+        # Con otra cantidad de fragmentos cambiaria el lugar de cada ID.
+        anotado = leer_cantidad_fragmentos(ruta_fragmento(db_path, 0))
+        if anotado is not None and anotado != fragmentos:
+            raise ValueError(f"{db_path} esta repartida en {anotado} fragmentos, no en {fragmentos}.")
+        if Path(ruta_fragmento(db_path, fragmentos)).exists():
+            raise ValueError(f"{db_path} tiene mas de {fragmentos} fragmentos.")
+        self.fragmentos = fragmentos
+        self._estricto = opciones.get("validacion_estricta", False)
+        # Las escrituras van de a una, asi los controles de duplicados entre fragmentos siguen valiendo.
+        self._bloqueo = threading.RLock()
+        self._gestores: List[GestorAsincrono] = []
+        try:
+            for i in range(fragmentos):
+                ruta = ruta_fragmento(db_path, i)
+                crear_tabla_contactos(ruta, perfil=opciones.get("perfil"))
+                anotar_fragmento(ruta, i, fragmentos, opciones.get("perfil"))
+                self._gestores.append(GestorAsincrono(ruta, **opciones))
+            # Ultimo ID entregado por la secuencia.
+            self._ultimo_id = self._leer_ultimo_id()
+            # Posiciones ya recorridas por obtener_rango (posicion -> ID de esa fila) y las versiones
+            # de los fragmentos con las que valen.
+            self._anclas: Dict[int, int] = {}
+            self._version_anclas: Optional[Tuple[int, ...]] = None
+            self._bloqueo_anclas = threading.Lock()
+        except Exception:
+            self.cerrar_conexion()
+            raise
+
+    # |||| IDs y reparto ||||
+
+    def _fragmento_de_id(self, contacto_id: int) -> int:
+        return contacto_id % self.fragmentos
+
+    # El mayor ID que se uso en cualquier fragmento.
+    def _leer_ultimo_id(self) -> int:
+        return max(self._en_todos("_ultimo_id_asignado"))
+
+    # Un ID nuevo por cada fragmento pedido, en orden: cada uno es el menor mayor que el anterior
+    # cuyo resto por la cantidad de fragmentos es su fragmento.
+    def _reservar_ids(self, fragmentos: List[int]) -> List[int]:
+        ids = []
+        for fragmento in fragmentos:
+            siguiente = self._ultimo_id + 1
+            self._ultimo_id = siguiente + (fragmento - siguiente) % self.fragmentos
+            ids.append(self._ultimo_id)
+        return ids
+
+    # Guarda filas ya controladas con IDs nuevos, cada fragmento su parte en paralelo, y devuelve los IDs.
+    # Si otro proceso ya uso alguno de los IDs, esa parte se vuelve a guardar despues del ultimo ID.
+    def _guardar(self, filas: List[Tuple[str, str, str, str]]) -> List[int]:
+        destinos = [fragmento_de(fila, self.fragmentos) for fila in filas]
+        ids = self._reservar_ids(destinos)
+        partes: Dict[int, List[int]] = {}
+        for posicion, fragmento in enumerate(destinos):
+            partes.setdefault(fragmento, []).append(posicion)
+
+        def enviar(fragmento: int, posiciones: List[int]):
+            return self._gestores[fragmento].enviar(
+                "_agregar_filas", [filas[p] for p in posiciones], [ids[p] for p in posiciones]
+            )
+        futuros = {fragmento: enviar(fragmento, posiciones) for fragmento, posiciones in partes.items()}
+        for fragmento, futuro in futuros.items():
+            for intento in range(REINTENTOS_ID):
+                try:
+                    futuro.result()
+                    break
+                except sqlite3.IntegrityError as e:
+                    if "contactos.id" not in str(e) or intento == REINTENTOS_ID - 1:
+                        raise
+                    self._ultimo_id = max(self._ultimo_id, self._leer_ultimo_id())
+                    posiciones = partes[fragmento]
+                    for posicion, nuevo in zip(posiciones, self._reservar_ids([fragmento] * len(posiciones))):
+                        ids[posicion] = nuevo
+                    futuro = enviar(fragmento, posiciones)
+        return ids
+
+    @staticmethod
+    def _salida(filas: List[Tuple], como_contactos: bool) -> List[Tuple]:
+        return [fila_a_contacto(None, f) for f in filas] if como_contactos else filas
+
+    # Llama al mismo metodo en todos los fragmentos a la vez y devuelve los resultados en orden.
+    def _en_todos(self, metodo: str, *args, **kwargs) -> List:
+        futuros = [g.enviar(metodo, *args, **kwargs) for g in self._gestores]
+        return [f.result() for f in futuros]
+
+    # Llama a un metodo de un solo fragmento y espera el resultado.
+    def _en(self, fragmento: int, metodo: str, *args, **kwargs):
+        return self._gestores[fragmento].enviar(metodo, *args, **kwargs).result()
+
+    # Recorre paginas por ID de todos los fragmentos mezcladas del mas nuevo al mas viejo.
+    # metodo recibe (*args, antes_de_id, limite); la pagina siguiente se pide mientras se consume la actual.
+    def _iterar_mezclado(self, metodo: str, args: tuple, tamano_bloque: int) -> Iterator[Tuple]:
+        def paginas(fragmento: int, futuro) -> Iterator[Tuple]:
+            while True:
+                pagina = futuro.result()
+                completa = len(pagina) == tamano_bloque
+                if completa:
+                    futuro = self._gestores[fragmento].enviar(metodo, *args, pagina[-1][0], tamano_bloque)
+                yield from pagina
+                if not completa:
+                    return
+        # Las primeras paginas se piden todas juntas.
+        primeras = [g.enviar(metodo, *args, None, tamano_bloque) for g in self._gestores]
+        return heapq.merge(
+            *(paginas(i, f) for i, f in enumerate(primeras)), key=itemgetter(0), reverse=True
+        )
+
+    # |||| Validaciones ||||
+
+    def _validar(self, contacto: Contacto) -> Tuple[str, str, str, str]:
+        campos = (contacto.nombre, contacto.apellido, contacto.telefono, contacto.email)
+        validacion.exigir_valido(*campos, estricto=self._estricto)
+        return validacion.normalizar(*campos, estricto=self._estricto)
+
+    # Busca duplicados en los fragmentos indicados (todos por defecto).
+    # excluir son los IDs de los contactos que se estan modificando.
+    def _existe_duplicado(
+        self,
+        fila: Tuple[str, str, str, str],
+        excluir: Iterable[int] = (),
+        fragmentos: Optional[Iterable[int]] = None
+    ) -> Tuple[bool, str]:
+        por_fragmento = {self._fragmento_de_id(contacto_id): contacto_id for contacto_id in excluir}
+        futuros = [
+            self._gestores[i].enviar("_existe_duplicado", *fila, excluir_id=por_fragmento.get(i))
+            for i in (range(self.fragmentos) if fragmentos is None else fragmentos)
+        ]
+        motivos = [motivo for dup, motivo in (f.result() for f in futuros) if dup]
+        if not motivos:
+            return False, ""
+        # El mismo motivo que daria una sola BBDD.
+        return True, min(motivos, key=MOTIVOS_DUPLICADO.index)
+
+    # |||| Escrituras ||||
+
+    @_sincronizado
+    def agregar_contacto(self, contacto: Contacto) -> int:
+        fila = self._validar(contacto)
+        dup, motivo = self._existe_duplicado(fila)
+        if dup:
+            raise ValueError(motivo)
+        return self._guardar([fila])[0]
+
+    # Igual que GestorDeContactos.agregar_contactos; cada lote se controla contra todos los fragmentos
+    # y despues cada fragmento inserta su parte en paralelo. Si falla un fragmento, lo que ya
+    # confirmaron los otros queda.
+    @_sincronizado
+    def agregar_contactos(
+        self,
+        contactos: Iterable[Contacto],
+        tamano_lote: int = TAMANO_LOTE
+    ) -> List[Tuple[int, bool, str]]:
+        resultados: List[Tuple[int, bool, str]] = []
+        vistos = (set(), set(), set())
+        lote: List[Tuple[int, Contacto]] = []
+        for indice, contacto in enumerate(contactos):
+            lote.append((indice, contacto))
+            if len(lote) >= tamano_lote:
+                self._insertar_lote(lote, vistos, resultados)
+                lote = []
+        if lote:
+            self._insertar_lote(lote, vistos, resultados)
+        resultados.sort()
+        return resultados
+
+    def importar_archivo(self, ruta: str, tamano_lote: int = TAMANO_LOTE) -> List[Tuple[int, bool, str]]:
+        return self.agregar_contactos(leer_contactos_archivo(ruta), tamano_lote)
+
+    def _insertar_lote(
+        self,
+        lote: List[Tuple[int, Contacto]],
+        vistos: Tuple[Set[Tuple[str, str, str, str]], Set[str], Set[str]],
+        resultados: List[Tuple[int, bool, str]]
+    ):
+        validas = validar_lote(lote, self._estricto, resultados)
+        existentes = (set(), set(), set())
+        for encontrados in self._en_todos("_existentes_del_lote", [fila for _, fila in validas]):
+            for todos, parte in zip(existentes, encontrados):
+                todos.update(parte)
+        nuevas = separar_nuevas(validas, existentes, vistos, resultados)
+        # Ya estan controladas, los fragmentos las insertan sin volver a controlar.
+        # Los IDs siguen el orden de la carga.
+        if nuevas:
+            self._guardar([fila for _, fila in nuevas])
+
+    @_sincronizado
+    def eliminar_contacto(self, contacto_id: int) -> bool:
+        return self._en(self._fragmento_de_id(contacto_id), "eliminar_contacto", contacto_id)
+
+    # El contacto queda en su fragmento aunque cambie el email.
+    @_sincronizado
+    def actualizar_contacto(self, contacto_id: int, contacto: Contacto) -> bool:
+        fila = self._validar(contacto)
+        dup, motivo = self._existe_duplicado(fila, (contacto_id,))
+        if dup:
+            raise ValueError(motivo)
+        return self._en(self._fragmento_de_id(contacto_id), "actualizar_contacto", contacto_id, Contacto(*fila))
+
+    # Igual que GestorDeContactos.fusionar_contactos. Si los dos estan en el mismo fragmento lo
+    # hace ese fragmento; si no se borra id_eliminar y despues se actualiza id_conservar.
+    @_sincronizado
+    def fusionar_contactos(self, id_conservar: int, id_eliminar: int) -> Optional[Tuple]:
+        if id_conservar == id_eliminar:
+            raise ValueError("No se puede fusionar un contacto consigo mismo.")
+        frag_conservar = self._fragmento_de_id(id_conservar)
+        frag_eliminar = self._fragmento_de_id(id_eliminar)
+        conservar = self._en(frag_conservar, "obtener_por_id", id_conservar)
+        eliminar = self._en(frag_eliminar, "obtener_por_id", id_eliminar)
+        if conservar is None or eliminar is None:
+            return None
+        fila = duplicados.combinar(conservar[1:], eliminar[1:])
+        if frag_conservar == frag_eliminar:
+            # El fragmento propio se controla al fusionar; aca solo los demas.
+            otros = [i for i in range(self.fragmentos) if i != frag_conservar]
+            dup, motivo = self._existe_duplicado(fila, fragmentos=otros)
+            if dup:
+                raise ValueError(motivo)
+            return self._en(frag_conservar, "fusionar_contactos", id_conservar, id_eliminar)
+
+        dup, motivo = self._existe_duplicado(fila, (id_conservar, id_eliminar))
+        if dup:
+            raise ValueError(motivo)
+        # Primero se borra, asi el email o teléfono que se hereda queda libre.
+        self._en(frag_eliminar, "eliminar_contacto", id_eliminar)
+        self._en(frag_conservar, "actualizar_contacto", id_conservar, Contacto(*fila))
+        return (id_conservar,) + fila
+
+    # |||| Lecturas ||||
+
+    def obtener_por_id(self, contacto_id: int, como_contactos: bool = False) -> Optional[Tuple]:
+        return self._en(self._fragmento_de_id(contacto_id), "obtener_por_id", contacto_id, como_contactos)
+
+    # Como en una sola BBDD, si hubiera varios devuelve el de menor ID.
+    def _primero_de_todos(self, metodo: str, valor: str, como_contactos: bool) -> Optional[Tuple]:
+        filas = [fila for fila in self._en_todos(metodo, valor) if fila is not None]
+        if not filas:
+            return None
+        fila = min(filas, key=itemgetter(0))
+        return fila_a_contacto(None, fila) if como_contactos else fila
+
+    def obtener_por_email(self, email: str, como_contactos: bool = False) -> Optional[Tuple]:
+        return self._primero_de_todos("obtener_por_email", email, como_contactos)
+
+    def obtener_por_telefono(self, telefono: str, como_contactos: bool = False) -> Optional[Tuple]:
+        return self._primero_de_todos("obtener_por_telefono", telefono, como_contactos)
+
+    def obtener_todos_los_contactos(self, como_contactos: bool = False) -> List[Tuple]:
+        partes = self._en_todos("obtener_todos_los_contactos")
+        return self._salida(list(heapq.merge(*partes, key=itemgetter(0), reverse=True)), como_contactos)
+
+    def obtener_pagina(
+        self,
+        antes_de_id: Optional[int] = None,
+        limite: int = 100,
+        como_contactos: bool = False,
+        despues_de_id: Optional[int] = None
+    ) -> List[Tuple]:
+        partes = self._en_todos("obtener_pagina", antes_de_id, limite, despues_de_id=despues_de_id)
+        filas = heapq.merge(*partes, key=itemgetter(0), reverse=True)
+        if despues_de_id is not None:
+            # Las mas cercanas a despues_de_id son las ultimas de la mezcla.
+            return self._salida(list(filas)[-limite:] if limite else [], como_contactos)
+        return self._salida(list(islice(filas, limite)), como_contactos)
+
+    # Sin OFFSET entre fragmentos hay que mezclar los IDs de todas las filas anteriores. Se parte de la
+    # posicion recorrida mas cercana antes de desde (por ID, como obtener_pagina), asi bajar de a
+    # pantallas solo mezcla los IDs nuevos; si algun fragmento cambio se vuelve a partir del principio.
+    # Despues se leen solo las filas que tocan.
+    def obtener_rango(self, desde: int, limite: int, como_contactos: bool = False) -> List[Tuple]:
+        version = self.version_cambios()
+        with self._bloqueo_anclas:
+            if version != self._version_anclas:
+                self._anclas = {}
+                self._version_anclas = version
+            posicion = max((p for p in self._anclas if p < desde), default=-1)
+            antes_de_id = self._anclas.get(posicion)
+        saltar = desde - posicion - 1
+        ids = heapq.merge(*self._en_todos("_ids_desc", saltar + limite, antes_de_id), reverse=True)
+        elegidos: List[int] = []
+        anclas: Dict[int, int] = {}
+        for actual, contacto_id in enumerate(islice(ids, saltar + limite), posicion + 1):
+            if actual % PASO_ANCLAS == 0:
+                anclas[actual] = contacto_id
+            if actual >= desde:
+                elegidos.append(contacto_id)
+        if elegidos:
+            anclas[desde + len(elegidos) - 1] = elegidos[-1]
+        with self._bloqueo_anclas:
+            if version == self._version_anclas:
+                if len(self._anclas) + len(anclas) > MAX_ANCLAS:
+                    self._anclas = {}
+                self._anclas.update(anclas)
+        por_fragmento: List[List[int]] = [[] for _ in self._gestores]
+        for contacto_id in elegidos:
+            por_fragmento[self._fragmento_de_id(contacto_id)].append(contacto_id)
+        futuros = [self._gestores[i].enviar("_filas_por_ids", ids) for i, ids in enumerate(por_fragmento) if ids]
+        filas = [fila for f in futuros for fila in f.result()]
+        filas.sort(key=itemgetter(0), reverse=True)
+        return self._salida(filas, como_contactos)
+
+    def iterar_contactos(self, tamano_bloque: int = TAMANO_LOTE, como_contactos: bool = False) -> Iterator[Tuple]:
+        filas = self._iterar_mezclado("obtener_pagina", (), tamano_bloque)
+        return (fila_a_contacto(None, f) for f in filas) if como_contactos else filas
+
+    def obtener_columnas(
+        self,
+        columnas: Tuple[str, ...] = COLUMNAS,
+        tamano_bloque: int = TAMANO_LOTE
+    ) -> dict:
+        invalidas = [c for c in columnas if c not in COLUMNAS]
+        if invalidas:
+            raise ValueError(f"Columnas desconocidas: {', '.join(invalidas)}.")
+        resultado = {c: (array("q") if c == "id" else []) for c in columnas}
+        posiciones = [(resultado[c], COLUMNAS.index(c)) for c in columnas]
+        for fila in self.iterar_contactos(tamano_bloque):
+            for destino, posicion in posiciones:
+                destino.append(fila[posicion])
+        return resultado
+
+    # El rank de FTS5 depende de las estadisticas de cada BBDD, asi que el orden mezclado es aproximado.
+    def buscar(self, texto: str, limite: int = 100, como_contactos: bool = False) -> List[Tuple]:
+        partes = self._en_todos("_buscar_con_rango", texto, limite)
+        filas = [f[1:] for f in islice(heapq.merge(*partes, key=itemgetter(0)), limite)]
+        return self._salida(filas, como_contactos)
+
+    def iterar_busqueda(self, texto: str, tamano_bloque: int = TAMANO_LOTE) -> Iterator[Tuple]:
+        if not armar_consulta_fts(texto):
+            return iter(())
+        return self._iterar_mezclado("_pagina_busqueda", (texto,), tamano_bloque)
+
+    def exportar(self, destino: str, **opciones) -> int:
+        from exportar import exportar
+        return exportar(self, destino, **opciones)
+
+    def contar_contactos(self) -> int:
+        return sum(self._en_todos("contar_contactos"))
+
+    # |||| Registro de cambios ||||
+
+    # Las versiones son una tupla con la version de cada fragmento.
+    def version_cambios(self) -> Tuple[int, ...]:
+        return tuple(self._en_todos("version_cambios"))
+
+    def contar_contactos_y_version(self) -> Tuple[int, Tuple[int, ...]]:
+        pares = self._en_todos("contar_contactos_y_version")
+        return sum(total for total, _ in pares), tuple(version for _, version in pares)
+
+    # Igual que GestorDeContactos.cambios_desde con versiones por fragmento (0 = desde el principio).
+    # Los cambios se mezclan por momento; el primer valor de cada uno es la version en su fragmento.
+    def cambios_desde(
+        self,
+        version,
+        limite: int = LIMITE_CAMBIOS,
+        con_filas: bool = False
+    ) -> Tuple[Optional[List[Tuple]], Tuple[int, ...]]:
+        versiones = (version,) * self.fragmentos if isinstance(version, int) else tuple(version)
+        if len(versiones) != self.fragmentos:
+            raise ValueError(f"Se esperaban {self.fragmentos} versiones.")
+        futuros = [g.enviar("cambios_desde", v, limite, con_filas=con_filas) for g, v in zip(self._gestores, versiones)]
+        respuestas = [f.result() for f in futuros]
+        if any(cambios is None for cambios, _ in respuestas):
+            return None, self.version_cambios()
+        mezclados = heapq.merge(*(
+            [(c[3], i, c) for c in cambios] for i, (cambios, _) in enumerate(respuestas)
+        ))
+        # Si son mas que el limite, cada fragmento sigue desde el ultimo cambio que entro.
+        nuevas = list(versiones)
+        resultado = []
+        for _momento, i, cambio in islice(mezclados, limite):
+            nuevas[i] = cambio[0]
+            resultado.append(cambio)
+        return resultado, tuple(nuevas)
+
+    # Cada fragmento conserva los ultimos `conservar` cambios.
+    @_sincronizado
+    def depurar_cambios(self, conservar: int = CAMBIOS_A_CONSERVAR) -> int:
+        return sum(self._en_todos("depurar_cambios", conservar))
+
+    # |||| Duplicados probables ||||
+
+    # Los bloques se arman mezclando las claves de todos los fragmentos, asi se encuentran
+    # tambien los duplicados que quedaron en fragmentos distintos.
+    def buscar_duplicados_probables(
+        self,
+        umbral: float = duplicados.UMBRAL_SIMILITUD,
+        max_bloque: int = duplicados.MAX_BLOQUE
+    ) -> List[Tuple[int, int, float, str]]:
+        def bloques():
+            for columna in COLUMNAS_BLOQUE:
+                partes = self._en_todos("_filas_de_clave", columna)
+                yield from duplicados.agrupar_bloques(columna, heapq.merge(*partes, key=itemgetter(0)))
+        return duplicados.pares_probables(bloques(), umbral, max_bloque)
+
+    # Los IDs son unicos entre fragmentos, el propio contacto se excluye en todos igual.
+    def buscar_similares(
+        self,
+        contacto: Contacto,
+        umbral: float = duplicados.UMBRAL_SIMILITUD,
+        limite: int = 20
+    ) -> List[Tuple[Tuple, float]]:
+        similares = [s for parte in self._en_todos("buscar_similares", contacto, umbral, limite) for s in parte]
+        similares.sort(key=lambda s: -s[1])
+        return similares[:limite]
+
+    # |||| Mantenimiento ||||
+
+    # Cada fragmento se copia a su propio archivo: destino.0.db, destino.1.db, ...
+    def respaldar(self, destino: str, **opciones) -> dict:
+        futuros = [
+            g.enviar("respaldar", ruta_fragmento(destino, i), **opciones) for i, g in enumerate(self._gestores)
+        ]
+        return dict(_sumar_informes([f.result() for f in futuros]), destino=destino)
+
+    def optimizar(self, analizar: bool = False) -> dict:
+        return _sumar_informes(self._en_todos("optimizar", analizar))
+
+    def compactar(self, paginas: Optional[int] = None, completo: bool = False) -> dict:
+        return _sumar_informes(self._en_todos("compactar", paginas, completo))
+
+    def verificar_integridad(self, rapido: bool = False, max_errores: int = 100) -> dict:
+        return _sumar_informes(self._en_todos("verificar_integridad", rapido, max_errores))
+
+    def mantenimiento(self, conservar: int = CAMBIOS_A_CONSERVAR) -> List[dict]:
+        return [_sumar_informes(list(partes)) for partes in zip(*self._en_todos("mantenimiento", conservar))]
+
+    # |||| Commit, cache y cierre ||||
+
+    def configurar_commit_agrupado(self, cada_ops: Optional[int] = None, cada_ms: Optional[float] = None):
+        self._en_todos("configurar_commit_agrupado", cada_ops, cada_ms)
+
+    def confirmar_pendientes(self):
+        self._en_todos("confirmar_pendientes")
+
+    def recargar_indice(self):
+        self._en_todos("recargar_indice")
+
+    # Estadisticas sumadas de los caches de todos los fragmentos, o None si no estan activos.
+    def estadisticas_cache(self) -> Optional[dict]:
+        partes = [e for e in self._en_todos("estadisticas_cache") if e is not None]
+        if not partes:
+            return None
+        datos = {clave: sum(e[clave] for e in partes) for clave in partes[0] if clave != "tasa_aciertos"}
+        consultas = datos["aciertos"] + datos["fallos"]
+        datos["tasa_aciertos"] = datos["aciertos"] / consultas if consultas else 0.0
+        return datos
+
+    def limpiar_cache(self):
+        self._en_todos("limpiar_cache")
+
+    # Cierra todos los fragmentos aunque alguno falle.
+    def cerrar_conexion(self):
+        for gestor in self._gestores:
+            try:
+                gestor.cerrar_conexion()
+            except Exception:
+                pass
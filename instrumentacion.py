@@ -0,0 +1,195 @@
+# Mide cada sentencia SQL y cada accion de la interfaz cuando esta activada.
+# Se activa con la variable de entorno CONTACTOS_INSTRUMENTACION=1 o llamando a activar().
+# CONTACTOS_SQL_LENTO_MS define desde cuantos milisegundos una consulta se registra como lenta.
+import functools
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Nombre del logger donde se avisan las consultas lentas.
+LOGGER = "contactos.sql"
+
+# Limites superiores (en ms) de cada casillero del histograma de latencias, el ultimo es infinito.
+BORDES_MS = (0.1, 0.5, 1.0, 5.0, 10.0, 50.0, 100.0, 500.0, 1000.0, float("inf"))
+
+# Umbral por defecto para considerar lenta una consulta.
+UMBRAL_LENTO_MS = 100.0
+
+# Une espacios repetidos para que la misma consulta quede con una sola clave.
+_ESPACIOS = re.compile(r"\s+")
+
+# |||| Estadisticas ||||
+
+# Acumula contadores, filas y latencias por sentencia y por accion.
+class Instrumentacion:
+    def __init__(self, umbral_lento_ms: float = UMBRAL_LENTO_MS):
+        self.umbral_lento_ms = umbral_lento_ms
+        self._bloqueo = threading.Lock()
+        self._sentencias: Dict[str, dict] = {}
+        self._acciones: Dict[str, dict] = {}
+
+    @staticmethod
+    def _nuevo_registro() -> dict:
+        return {"llamadas": 0, "filas": 0, "total_ms": 0.0, "max_ms": 0.0, "histograma": [0] * len(BORDES_MS)}
+
+    @staticmethod
+    def _sumar(registro: dict, ms: float, filas: int, llamada: bool):
+        if llamada:
+            registro["llamadas"] += 1
+            # Ubica la latencia en su casillero.
+            for i, borde in enumerate(BORDES_MS):
+                if ms <= borde:
+                    registro["histograma"][i] += 1
+                    break
+        registro["filas"] += filas
+        registro["total_ms"] += ms
+        registro["max_ms"] = max(registro["max_ms"], ms)
+
+    # Registra una ejecucion (llamada=True) o el tiempo y filas de un fetch posterior.
+    def registrar_sentencia(self, sql: str, ms: float, filas: int = 0, llamada: bool = True):
+        clave = _ESPACIOS.sub(" ", sql).strip()
+        with self._bloqueo:
+            registro = self._sentencias.get(clave)
+            if registro is None:
+                registro = self._sentencias[clave] = self._nuevo_registro()
+            self._sumar(registro, ms, filas, llamada)
+        if llamada and ms >= self.umbral_lento_ms:
+            # logging se importa recien aca para no sumar tiempo de arranque.
+            import logging
+            logging.getLogger(LOGGER).warning("Consulta lenta (%.1f ms): %s", ms, clave)
+
+    # Registra cuanto tardo una accion de la interfaz.
+    def registrar_accion(self, nombre: str, ms: float):
+        with self._bloqueo:
+            registro = self._acciones.get(nombre)
+            if registro is None:
+                registro = self._acciones[nombre] = self._nuevo_registro()
+            self._sumar(registro, ms, 0, True)
+
+    # Copia de las estadisticas, ordenadas por tiempo total (lo mas costoso primero).
+    def instantanea(self) -> dict:
+        def copiar(origen: Dict[str, dict]) -> Dict[str, dict]:
+            ordenadas = sorted(origen.items(), key=lambda kv: kv[1]["total_ms"], reverse=True)
+            resultado = {}
+            for clave, r in ordenadas:
+                copia = dict(r, histograma=list(r["histograma"]))
+                copia["promedio_ms"] = r["total_ms"] / r["llamadas"] if r["llamadas"] else 0.0
+                resultado[clave] = copia
+            return resultado
+
+        with self._bloqueo:
+            return {
+                "bordes_ms": list(BORDES_MS),
+                "sentencias": copiar(self._sentencias),
+                "acciones": copiar(self._acciones),
+            }
+
+    # Borra todo lo acumulado.
+    def reiniciar(self):
+        with self._bloqueo:
+            self._sentencias.clear()
+            self._acciones.clear()
+
+# Instancia global usada por el modulo.
+instrumentacion = Instrumentacion(float(os.environ.get("CONTACTOS_SQL_LENTO_MS", UMBRAL_LENTO_MS)))
+
+# Indica si las conexiones nuevas se abren instrumentadas.
+_activa = os.environ.get("CONTACTOS_INSTRUMENTACION", "").lower() in ("1", "true", "si", "sí", "on")
+
+def activa() -> bool:
+    return _activa
+
+# Activa la medicion para las conexiones que se abran desde ahora.
+def activar(umbral_lento_ms: Optional[float] = None):
+    global _activa
+    _activa = True
+    if umbral_lento_ms is not None:
+        instrumentacion.umbral_lento_ms = umbral_lento_ms
+
+def desactivar():
+    global _activa
+    _activa = False
+
+# Atajo para leer las estadisticas globales.
+def instantanea() -> dict:
+    return instrumentacion.instantanea()
+
+# |||| Cursor y conexión instrumentados ||||
+
+# Cursor que mide execute/executemany y cuenta las filas que se leen.
+class CursorInstrumentado(sqlite3.Cursor):
+    _sql_actual = ""
+
+    def execute(self, sql, parametros=()):
+        self._sql_actual = sql
+        t0 = time.perf_counter()
+        try:
+            return super().execute(sql, parametros)
+        finally:
+            instrumentacion.registrar_sentencia(sql, (time.perf_counter() - t0) * 1000)
+
+    def executemany(self, sql, secuencia):
+        self._sql_actual = sql
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(sql, secuencia)
+        finally:
+            instrumentacion.registrar_sentencia(sql, (time.perf_counter() - t0) * 1000, max(self.rowcount, 0))
+
+    # Los fetch suman su tiempo y sus filas a la ultima sentencia ejecutada.
+    def _medir_fetch(self, leer: Callable, *args):
+        t0 = time.perf_counter()
+        filas = leer(*args)
+        cantidad = len(filas) if isinstance(filas, list) else (0 if filas is None else 1)
+        instrumentacion.registrar_sentencia(
+            self._sql_actual, (time.perf_counter() - t0) * 1000, cantidad, llamada=False
+        )
+        return filas
+
+    def fetchone(self):
+        return self._medir_fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        if size is None:
+            return self._medir_fetch(super().fetchmany)
+        return self._medir_fetch(super().fetchmany, size)
+
+    def fetchall(self):
+        return self._medir_fetch(super().fetchall)
+
+    # Iterar el cursor fila por fila tambien cuenta.
+    def __next__(self):
+        fila = super().__next__()
+        instrumentacion.registrar_sentencia(self._sql_actual, 0.0, 1, llamada=False)
+        return fila
+
+# Conexión cuyos cursores (incluidos los de conn.execute) son instrumentados.
+class ConexionInstrumentada(sqlite3.Connection):
+    def cursor(self, factory=CursorInstrumentado):
+        return super().cursor(factory)
+
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, secuencia):
+        return self.cursor().executemany(sql, secuencia)
+
+# |||| Acciones de la interfaz ||||
+
+# Decorador que mide cuanto tarda una funcion (por ejemplo un handler de Tk) si la medicion esta activa.
+def medir_accion(nombre: str):
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not _activa:
+                return funcion(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                instrumentacion.registrar_accion(nombre, (time.perf_counter() - t0) * 1000)
+        return envoltura
+    return decorador
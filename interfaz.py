@@ -1,25 +1,64 @@
 # Importa Tkinter.
 import tkinter as tk
 # Importa complementos de Tkinter.
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
+# Resultado de las tareas que corren en segundo plano.
+from concurrent.futures import Future
+# Para medir cuanto tarda cada accion.
+import time
+import instrumentacion
+from instrumentacion import medir_accion
+# Las mismas reglas que usa GestorDeContactos.
+import validacion
 
 # |||| Validacion de campos en la interfaz ||||
 
 # Límite maximo de caracteres para nombre.
-NAME_MAX = 50
+NAME_MAX = validacion.REGLAS["nombre"].maximo
 # Límite maximo de caracteres para apellido.
-LASTNAME_MAX = 50
+LASTNAME_MAX = validacion.REGLAS["apellido"].maximo
 # Límite maximo de caracteres para teléfono.
-PHONE_MAX = 15
+PHONE_MAX = validacion.REGLAS["telefono"].maximo
 # Límite maximo de caracteres para email.
-EMAIL_MAX = 100
+EMAIL_MAX = validacion.REGLAS["email"].maximo
+
+# |||| Grilla virtual ||||
+
+# Filas extra que se piden arriba y abajo de las visibles.
+BUFFER_FILAS = 30
+# Alto de fila por defecto del Treeview, si el tema no lo informa.
+ALTO_FILA = 20
+
+# |||| Busqueda ||||
+
+# Cantidad maxima de resultados que se muestran al buscar.
+LIMITE_BUSQUEDA = 200
+# Milisegundos que se espera sin teclear antes de buscar.
+ESPERA_BUSQUEDA_MS = 300
+
+# |||| Segundo plano ||||
+
+# Cada cuantos milisegundos se revisa si termino una consulta.
+INTERVALO_SONDEO_MS = 50
+
+# |||| Cambios ||||
+
+# Cada cuantos milisegundos se buscan cambios en la BBDD (de esta ventana o de otros procesos).
+INTERVALO_CAMBIOS_MS = 1000
+# Con tantos cambios pendientes sale mas barato releer la grilla que aplicarlos de a uno.
+LIMITE_CAMBIOS_GRILLA = 500
+
+# |||| Mantenimiento ||||
+
+# Cada cuantos milisegundos se depura el registro de cambios, se liberan paginas y se actualizan estadisticas.
+INTERVALO_MANTENIMIENTO_MS = 60 * 60 * 1000
 
 # Aca crea la interfaz.
 def crear_interfaz(root: tk.Tk, gestor):
     # Título de la ventana.
     root.title("Gestor de Contactos")
     # Dimensiones.
-    root.geometry("840x580")
+    root.geometry("840x620")
     # Campo “Nombre”.
     var_nombre = tk.StringVar()
     # Campo “Apellido”.
@@ -47,32 +86,22 @@ def crear_interfaz(root: tk.Tk, gestor):
             if len(proposed) > maxlen:
                 root.after(0, lambda: var.set(var.get()[:maxlen]))
                 return False
-            # Acepta solo dígitos.
-            if proposed == "" or proposed.isdigit():
-                return True
-            # Rechaza si contiene datos no numericos.
-            return False
+            # Acepta solo dígitos (rechaza si contiene datos no numericos).
+            return validacion.texto_parcial_valido("telefono", proposed)
         return _inner
 
+    # Errores del formulario segun las reglas de validacion.py, como (campo, mensaje).
+    def errores_del_form():
+        return validacion.validar(
+            var_nombre.get().strip(),
+            var_apellido.get().strip(),
+            var_telefono.get().strip(),
+            var_email.get().strip(),
+        )
+
     # Valida el formulario.
     def form_es_valido() -> bool:
-        # Lee nombre, telefono y email.
-        nombre = var_nombre.get().strip()
-        telefono = var_telefono.get().strip()
-        email = var_email.get().strip()
-
-        # Valida que no este vacío.
-        if not nombre:
-            return False
-        # Email opcional, pero si existed debe tener @.
-        if email and ("@" not in email):
-            return False
-        # Valida longitudes.
-        if len(nombre) > NAME_MAX or len(var_apellido.get()) > LASTNAME_MAX:
-            return False
-        if len(telefono) > PHONE_MAX or len(email) > EMAIL_MAX:
-            return False
-        return True
+        return not errores_del_form()
 
     # Si el formulario es valido habilita el boton Agregar.
     def refrescar_estado_boton_agregar():
@@ -146,9 +175,31 @@ def crear_interfaz(root: tk.Tk, gestor):
     # Ubica el botón Actualizar.
     btn_actualizar.grid(row=0, column=3, padx=6, pady=6)
 
+    # Crea el botón “Importar”.
+    btn_importar = tk.Button(frm_buttons, text="Importar")
+    # Ubica el botón Importar.
+    btn_importar.grid(row=0, column=4, padx=6, pady=6)
+
+    # Crea el botón “Exportar”.
+    btn_exportar = tk.Button(frm_buttons, text="Exportar")
+    # Ubica el botón Exportar.
+    btn_exportar.grid(row=0, column=5, padx=6, pady=6)
+
     # El boton “Agregar” su estado inicial es deshabilitado.
     btn_agregar.configure(state="disabled")
 
+    # |||| Busqueda ||||
+
+    # Contenedor del cuadro de busqueda.
+    frm_busqueda = tk.Frame(root)
+    frm_busqueda.pack(padx=10, fill="x")
+    # Etiqueta “Buscar”.
+    tk.Label(frm_busqueda, text="Buscar:").pack(side="left", padx=6)
+    # Texto a buscar.
+    var_busqueda = tk.StringVar()
+    e_busqueda = tk.Entry(frm_busqueda, textvariable=var_busqueda)
+    e_busqueda.pack(side="left", fill="x", expand=True, padx=6)
+
     # |||| Grilla ||||
 
     # Contenedor de la grilla y un scroll.
@@ -165,11 +216,389 @@ def crear_interfaz(root: tk.Tk, gestor):
         tree.column(c, width=150 if c != "id" else 60, anchor="center")
     tree.pack(side="left", fill="both", expand=True)
 
-    # Crea una barra de scroll
-    sb = ttk.Scrollbar(frm_list, orient="vertical", command=tree.yview)
-    tree.configure(yscroll=sb.set)
+    # |||| Indicador de trabajo ||||
+
+    # Barra y texto que se muestran mientras hay consultas en curso.
+    frm_estado = tk.Frame(root)
+    frm_estado.pack(padx=10, pady=(0, 8), fill="x", side="bottom")
+    barra = ttk.Progressbar(frm_estado, mode="indeterminate", length=160)
+    barra.pack(side="right")
+    lbl_estado = tk.Label(frm_estado, text="")
+    lbl_estado.pack(side="right", padx=6)
+
+    # Crea una barra de scroll, manejada a mano porque la grilla es virtual.
+    sb = ttk.Scrollbar(frm_list, orient="vertical")
     sb.pack(side="right", fill="y")
 
+    # Estado de la grilla: solo se guardan en memoria las filas visibles y un margen.
+    grilla = {"total": 0, "inicio": 0, "visibles": 14, "cache_desde": 0, "cache": [], "seleccionado": None,
+              "resultados": None, "busqueda_pendiente": None, "busqueda_num": 0,
+              "pidiendo": False, "generacion": 0, "version": None, "sincronizando": False}
+
+    # |||| Tareas en segundo plano ||||
+
+    # Llama a un metodo del gestor y siempre devuelve un Future (sirve con el gestor comun o el asincrono).
+    def llamar(metodo: str, *args, **kwargs) -> Future:
+        try:
+            resultado = getattr(gestor, metodo)(*args, **kwargs)
+        except Exception as e:
+            resultado = Future()
+            resultado.set_exception(e)
+            return resultado
+        if not isinstance(resultado, Future):
+            futuro = Future()
+            futuro.set_result(resultado)
+            return futuro
+        # Con la medicion activa registra cuanto tardo la llamada desde que se pidio.
+        if instrumentacion.activa():
+            t0 = time.perf_counter()
+            resultado.add_done_callback(
+                lambda _f: instrumentacion.instrumentacion.registrar_accion(
+                    f"bd:{metodo}", (time.perf_counter() - t0) * 1000
+                )
+            )
+        return resultado
+
+    # Cantidad de tareas en curso, para mostrar el indicador de trabajo.
+    ocupado = {"tareas": 0}
+
+    # Muestra u oculta la barra de progreso segun haya tareas pendientes.
+    def actualizar_indicador(cambio: int):
+        ocupado["tareas"] += cambio
+        if ocupado["tareas"] > 0:
+            lbl_estado.configure(text="Trabajando...")
+            barra.start(10)
+        else:
+            lbl_estado.configure(text="")
+            barra.stop()
+
+    # Espera el Future revisando con root.after y llama al callback en el hilo de Tk.
+    # texto_estado, si se pasa, devuelve el texto de avance que se muestra mientras espera.
+    # Con silencioso=True no muestra el indicador de trabajo (para tareas periodicas).
+    def en_segundo_plano(futuro: Future, al_terminar, al_fallar, texto_estado=None, silencioso=False):
+        if not silencioso:
+            actualizar_indicador(+1)
+
+        def revisar():
+            if not futuro.done():
+                if texto_estado is not None:
+                    lbl_estado.configure(text=texto_estado())
+                root.after(INTERVALO_SONDEO_MS, revisar)
+                return
+            if not silencioso:
+                actualizar_indicador(-1)
+            try:
+                resultado = futuro.result()
+            except Exception as e:
+                al_fallar(e)
+                return
+            al_terminar(resultado)
+
+        revisar()
+
+    # Muestra un error como lo hacian los botones.
+    def mostrar_error(texto: str):
+        def _inner(e: Exception):
+            if isinstance(e, ValueError):
+                messagebox.showwarning("Validación", str(e))
+            else:
+                messagebox.showerror("Error", f"{texto}\n{e}")
+        return _inner
+
+    # |||| Grilla virtual ||||
+
+    # Calcula cuantas filas entran en la grilla segun su alto actual.
+    def calcular_visibles():
+        alto_fila = ttk.Style().lookup("Treeview", "rowheight") or ALTO_FILA
+        # Resta el alto aproximado del encabezado.
+        alto = tree.winfo_height() - int(alto_fila)
+        grilla["visibles"] = max(1, alto // int(alto_fila)) if alto > 0 else 14
+
+    # Indica si las filas desde inicio ya estan en memoria.
+    def cache_cubre(inicio: int, cantidad: int) -> bool:
+        desde = grilla["cache_desde"]
+        # Cerca del final no hay mas filas que pedir.
+        fin = min(inicio + cantidad, grilla["total"])
+        return desde <= inicio and fin <= desde + len(grilla["cache"])
+
+    # Pide al repositorio la ventana visible con un margen arriba y abajo.
+    # Si la ventana nueva se toca con lo que hay en memoria (se bajo o se subio) pide solo lo que falta
+    # por ID desde la fila del borde; OFFSET, que recorre todas las filas anteriores, queda para los saltos.
+    def pedir_rango(inicio: int, cantidad: int):
+        # Si ya hay un pedido en curso, al terminar se vuelve a revisar la posicion.
+        if grilla["pidiendo"]:
+            return
+        grilla["pidiendo"] = True
+        generacion = grilla["generacion"]
+        desde = max(0, inicio - BUFFER_FILAS)
+        limite = cantidad + 2 * BUFFER_FILAS
+        cache, cache_desde = grilla["cache"], grilla["cache_desde"]
+        cache_hasta = cache_desde + len(cache)
+        # Filas de memoria que quedan arriba y abajo de las que se piden.
+        arriba, abajo = [], []
+        if cache and cache_desde < desde <= cache_hasta:
+            # Bajando: se conserva lo de memoria desde `desde` y se piden las filas que siguen a la ultima.
+            arriba = cache[desde - cache_desde:]
+            futuro = llamar("obtener_pagina", cache[-1][0], max(0, limite - len(arriba)))
+        elif cache and desde < cache_desde <= desde + limite:
+            # Subiendo: se piden las filas anteriores a la primera y se conserva el resto.
+            abajo = cache[:desde + limite - cache_desde]
+            futuro = llamar("obtener_pagina", None, cache_desde - desde, despues_de_id=cache[0][0])
+        else:
+            futuro = llamar("obtener_rango", desde, limite)
+
+        def listo(filas):
+            grilla["pidiendo"] = False
+            # Si se recargo la grilla mientras tanto, estas filas ya no sirven.
+            if generacion == grilla["generacion"]:
+                grilla["cache"] = arriba + filas + abajo
+                grilla["cache_desde"] = desde
+            mostrar_desde(grilla["inicio"])
+
+        def fallo(e):
+            grilla["pidiendo"] = False
+            messagebox.showerror("Error", f"No se pudo listar.\n{e}")
+
+        en_segundo_plano(futuro, listo, fallo)
+
+    # Dibuja en la grilla solo las filas visibles a partir de la posicion inicio.
+    def mostrar_desde(inicio: int):
+        visibles = grilla["visibles"]
+        # No deja pasar del principio ni del final.
+        inicio = max(0, min(inicio, grilla["total"] - visibles))
+        grilla["inicio"] = inicio
+        if not cache_cubre(inicio, visibles):
+            pedir_rango(inicio, visibles)
+        # Dibuja lo que ya este en memoria, el resto llega cuando termine el pedido.
+        offset = inicio - grilla["cache_desde"]
+        filas = grilla["cache"][max(0, offset):max(0, offset + visibles)]
+        # Recuerda la seleccion para mantenerla si sigue visible.
+        seleccion = tree.selection()
+        tree.delete(*tree.get_children())
+        for fila in filas:
+            tree.insert("", "end", iid=str(fila[0]), values=fila)
+        visibles_ids = [i for i in seleccion if tree.exists(i)]
+        if visibles_ids:
+            tree.selection_set(visibles_ids)
+        actualizar_barra()
+
+    # La barra representa la posicion sobre el total de filas.
+    def actualizar_barra():
+        total = grilla["total"]
+        if total:
+            sb.set(grilla["inicio"] / total, min(1.0, (grilla["inicio"] + grilla["visibles"]) / total))
+        else:
+            sb.set(0.0, 1.0)
+
+    # Vuelve a leer el total y descarta lo que habia en memoria.
+    def recargar_grilla():
+        grilla["generacion"] += 1
+        grilla["cache_desde"] = 0
+        if grilla["resultados"] is not None:
+            # Con una busqueda activa la grilla muestra solo los resultados.
+            grilla["total"] = len(grilla["resultados"])
+            grilla["cache"] = grilla["resultados"]
+            mostrar_desde(grilla["inicio"])
+            return
+        grilla["cache"] = []
+        # Hasta tener el total nuevo no se aplican cambios.
+        grilla["version"] = None
+        generacion = grilla["generacion"]
+
+        def listo(total_y_version):
+            if generacion != grilla["generacion"]:
+                return
+            grilla["total"], grilla["version"] = total_y_version
+            mostrar_desde(grilla["inicio"])
+
+        en_segundo_plano(llamar("contar_contactos_y_version"), listo, mostrar_error("No se pudo listar."))
+
+    # |||| Cambios incrementales ||||
+
+    # Posicion dentro de lo que se ve de la fila pos de la cache, o None si no esta a la vista.
+    def posicion_visible(pos: int):
+        posicion = grilla["cache_desde"] + pos - grilla["inicio"]
+        return posicion if 0 <= posicion < grilla["visibles"] else None
+
+    # Aplica a la grilla solo lo que cambio: actualiza, agrega o saca filas puntuales.
+    # cambios son (version, op, id, momento, fila actual o None) como los devuelve cambios_desde.
+    def aplicar_cambios(cambios):
+        cache = grilla["cache"]
+        en_busqueda = grilla["resultados"] is not None
+        redibujar = False
+        for _version, op, contacto_id, _momento, fila in cambios:
+            iid = str(contacto_id)
+            # Lugar del contacto en memoria, si esta.
+            pos = next((i for i, f in enumerate(cache) if f[0] == contacto_id), None)
+            if op == "U" or (op == "I" and pos is not None):
+                # Solo se toca la fila si esta en memoria.
+                if pos is not None and fila is not None:
+                    cache[pos] = fila
+                    if tree.exists(iid):
+                        tree.item(iid, values=fila)
+            elif op == "D":
+                if pos is not None:
+                    visible = posicion_visible(pos)
+                    del cache[pos]
+                    grilla["total"] -= 1
+                    if grilla["cache_desde"] + pos < grilla["inicio"]:
+                        # Estaba arriba de lo visible: se corre la ventana y se sigue viendo lo mismo.
+                        grilla["inicio"] -= 1
+                    elif visible is not None:
+                        if tree.exists(iid):
+                            tree.delete(iid)
+                        # Completa abajo con la fila siguiente, si esta en memoria.
+                        abajo = grilla["inicio"] - grilla["cache_desde"] + grilla["visibles"] - 1
+                        if 0 <= abajo < len(cache) and not tree.exists(str(cache[abajo][0])):
+                            tree.insert("", "end", iid=str(cache[abajo][0]), values=cache[abajo])
+                        elif abajo >= len(cache):
+                            redibujar = True
+                elif not en_busqueda:
+                    grilla["total"] -= 1
+                    # Estaba arriba de lo que hay en memoria: todo se corre una posicion.
+                    if cache and contacto_id > cache[0][0]:
+                        grilla["cache_desde"] -= 1
+                        grilla["inicio"] -= 1
+            elif op == "I" and not en_busqueda:
+                grilla["total"] += 1
+                # Si ya se borro queda un lugar vacio que saca el "D" que viene despues.
+                fila = fila or (contacto_id, "", "", "", "")
+                llega_al_final = grilla["cache_desde"] + len(cache) >= grilla["total"] - 1
+                if cache and contacto_id < cache[-1][0] and not llega_al_final:
+                    # Queda abajo de lo que hay en memoria, no cambia nada de lo visible.
+                    continue
+                if cache and contacto_id > cache[0][0] and grilla["cache_desde"] > 0:
+                    # Queda arriba de lo que hay en memoria: todo se corre una posicion.
+                    grilla["cache_desde"] += 1
+                    grilla["inicio"] += 1
+                    continue
+                # La grilla va de mayor a menor ID.
+                pos = next((i for i, f in enumerate(cache) if f[0] < contacto_id), len(cache))
+                cache.insert(pos, fila)
+                if grilla["cache_desde"] + pos < grilla["inicio"]:
+                    grilla["inicio"] += 1
+                    continue
+                visible = posicion_visible(pos)
+                if visible is not None:
+                    tree.insert("", visible, iid=iid, values=fila)
+                    hijos = tree.get_children()
+                    # La ultima fila queda fuera de la vista.
+                    if len(hijos) > grilla["visibles"]:
+                        tree.delete(hijos[-1])
+        # Cerca del final, al sacar filas hay que mostrar las de arriba.
+        if grilla["inicio"] < 0 or grilla["inicio"] > max(0, grilla["total"] - grilla["visibles"]):
+            redibujar = True
+        if redibujar:
+            mostrar_desde(grilla["inicio"])
+        else:
+            actualizar_barra()
+
+    # Pide los cambios nuevos y los aplica; si son demasiados relee la grilla.
+    def sincronizar_cambios():
+        # Sin grilla cargada, o con un pedido en curso, espera a la proxima vuelta.
+        if grilla["version"] is None or grilla["sincronizando"] or grilla["pidiendo"]:
+            return
+        grilla["sincronizando"] = True
+        generacion = grilla["generacion"]
+
+        def listo(respuesta):
+            grilla["sincronizando"] = False
+            cambios, version = respuesta
+            # Si se recargo la grilla mientras tanto, ya tiene estos cambios.
+            if generacion != grilla["generacion"] or grilla["version"] is None:
+                return
+            # Los cambios ya se depuraron o son muchos: sale mas barato releer.
+            if cambios is None or len(cambios) >= LIMITE_CAMBIOS_GRILLA:
+                recargar_grilla()
+                return
+            grilla["version"] = version
+            if cambios:
+                aplicar_cambios(cambios)
+
+        def fallo(_e):
+            grilla["sincronizando"] = False
+
+        en_segundo_plano(
+            llamar("cambios_desde", grilla["version"], LIMITE_CAMBIOS_GRILLA, con_filas=True),
+            listo, fallo, silencioso=True,
+        )
+
+    # Revisa cambios cada INTERVALO_CAMBIOS_MS, asi se ven tambien los de otros procesos.
+    def sondear_cambios():
+        sincronizar_cambios()
+        root.after(INTERVALO_CAMBIOS_MS, sondear_cambios)
+
+    # Corre el mantenimiento de la BBDD en segundo plano; si falla se intenta en la proxima vuelta.
+    def mantener_bbdd():
+        en_segundo_plano(llamar("mantenimiento"), lambda _informes: None, lambda _e: None, silencioso=True)
+        root.after(INTERVALO_MANTENIMIENTO_MS, mantener_bbdd)
+
+    # Ejecuta la busqueda con el texto actual.
+    def buscar_contactos_gui():
+        grilla["busqueda_pendiente"] = None
+        texto = var_busqueda.get().strip()
+        # Numera la busqueda para descartar respuestas viejas.
+        grilla["busqueda_num"] += 1
+        numero = grilla["busqueda_num"]
+
+        def listo(resultados):
+            if numero != grilla["busqueda_num"]:
+                return
+            grilla["resultados"] = resultados
+            grilla["inicio"] = 0
+            recargar_grilla()
+            # Si la grilla nunca se cargo, toma la version actual para seguir los cambios de los resultados.
+            if resultados is not None and grilla["version"] is None:
+                def tomar_version(version):
+                    if grilla["version"] is None:
+                        grilla["version"] = version
+                en_segundo_plano(llamar("version_cambios"), tomar_version, lambda _e: None, silencioso=True)
+
+        # Sin texto vuelve a mostrar toda la tabla.
+        if not texto:
+            listo(None)
+            return
+        en_segundo_plano(llamar("buscar", texto, LIMITE_BUSQUEDA), listo, mostrar_error("No se pudo buscar."))
+
+    # Cada tecla reinicia la espera, asi no se consulta la BBDD por cada una.
+    def programar_busqueda(*_):
+        if grilla["busqueda_pendiente"] is not None:
+            root.after_cancel(grilla["busqueda_pendiente"])
+        grilla["busqueda_pendiente"] = root.after(ESPERA_BUSQUEDA_MS, medir_accion("ui:buscar")(buscar_contactos_gui))
+
+    var_busqueda.trace_add("write", programar_busqueda)
+
+    # Maneja los comandos de la barra de scroll.
+    def on_scroll(accion, cantidad, unidad=None):
+        if accion == "moveto":
+            mostrar_desde(int(float(cantidad) * grilla["total"]))
+        elif accion == "scroll":
+            paso = grilla["visibles"] if unidad == "pages" else 1
+            mostrar_desde(grilla["inicio"] + int(cantidad) * paso)
+
+    # Desplaza con la rueda del mouse (Windows/Mac usan delta, Linux usa Button-4/5).
+    def on_rueda(evt):
+        if getattr(evt, "num", None) == 4 or getattr(evt, "delta", 0) > 0:
+            mostrar_desde(grilla["inicio"] - 3)
+        else:
+            mostrar_desde(grilla["inicio"] + 3)
+        return "break"
+
+    # Al cambiar el tamaño de la ventana recalcula las filas visibles.
+    def on_redimensionar(_evt):
+        anteriores = grilla["visibles"]
+        calcular_visibles()
+        if grilla["visibles"] != anteriores:
+            mostrar_desde(grilla["inicio"])
+
+    sb.configure(command=medir_accion("ui:scroll")(on_scroll))
+    tree.bind("<MouseWheel>", on_rueda)
+    tree.bind("<Button-4>", on_rueda)
+    tree.bind("<Button-5>", on_rueda)
+    tree.bind("<Prior>", lambda _e: on_scroll("scroll", -1, "pages"))
+    tree.bind("<Next>", lambda _e: on_scroll("scroll", 1, "pages"))
+    tree.bind("<Configure>", on_redimensionar)
+
     # |||| Funciones de los Botones ||||
 
     # Limpia los campos y valida el boton Agregar.
@@ -178,45 +607,45 @@ def crear_interfaz(root: tk.Tk, gestor):
         var_apellido.set("")
         var_telefono.set("")
         var_email.set("")
+        grilla["seleccionado"] = None
         refrescar_estado_boton_agregar()
 
     # Actualiza la grilla desde la BD cuando se presiona Listar.
     def listar_contactos_gui():
-        try:
-            # Pide todos los contactos.
-            registros = gestor.obtener_todos_los_contactos()
-            # Limpia todas las filas.
-            for r in tree.get_children():
-                tree.delete(r)
-            # Inserta cada fila.
-            for fila in registros:
-                tree.insert("", "end", values=fila)
-            # Limpia los campos del formulario después de listar.
-            limpiar_inputs()
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo listar.\n{e}")
+        # Sale de la busqueda sin esperar la consulta programada.
+        var_busqueda.set("")
+        if grilla["busqueda_pendiente"] is not None:
+            root.after_cancel(grilla["busqueda_pendiente"])
+            grilla["busqueda_pendiente"] = None
+        grilla["busqueda_num"] += 1
+        grilla["resultados"] = None
+        # Vuelve al principio y trae solo las filas visibles.
+        grilla["inicio"] = 0
+        recargar_grilla()
+        # Limpia los campos del formulario después de listar.
+        limpiar_inputs()
 
     # Agrega un nuevo contacto cuando se presiona Agregar.
     def agregar_contacto_gui():
-        try:
-            from main import Contacto
-            # Construye el Contacto con los datos de los campos.
-            c = Contacto(
-                nombre=var_nombre.get().strip(),
-                apellido=var_apellido.get().strip(),
-                telefono=var_telefono.get().strip(),
-                email=var_email.get().strip(),
-            )
-            # Llama al repositorio para insertar y obtiene el ID del nuevo contacto.
-            nuevo_id = gestor.agregar_contacto(c)
+        from main import Contacto
+        # Construye el Contacto con los datos de los campos.
+        c = Contacto(
+            nombre=var_nombre.get().strip(),
+            apellido=var_apellido.get().strip(),
+            telefono=var_telefono.get().strip(),
+            email=var_email.get().strip(),
+        )
+
+        def listo(nuevo_id):
             # Notifica que se agregó correctamente.
             messagebox.showinfo("OK", f"Contacto agregado (ID {nuevo_id}).")
             # Limpia los campos.
             limpiar_inputs()
-        except ValueError as ve:
-            messagebox.showwarning("Validación", str(ve))
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo agregar el contacto.\n{e}")
+            # Muestra el alta sin esperar al proximo sondeo.
+            sincronizar_cambios()
+
+        # Llama al repositorio para insertar y obtiene el ID del nuevo contacto.
+        en_segundo_plano(llamar("agregar_contacto", c), listo, mostrar_error("No se pudo agregar el contacto."))
 
     # Elimina el contacto seleccionado cuando se presiona Eliminar.
     def eliminar_contacto_gui():
@@ -229,18 +658,19 @@ def crear_interfaz(root: tk.Tk, gestor):
         # Obtiene el ítem seleccionado y el ID.
         item = tree.item(sel[0])
         contacto_id = int(item["values"][0])
-        try:
-            # Llama al repositorio.
-            ok = gestor.eliminar_contacto(contacto_id)
+
+        def listo(ok):
             if ok:
                 # Si borró lo notifica.
                 messagebox.showinfo("OK", "Contacto eliminado.")
                 # Limpia los campos.
                 limpiar_inputs()
+                sincronizar_cambios()
             else:
                 messagebox.showwarning("Atención", "No se encontró el contacto para eliminar.")
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo eliminar.\n{e}")
+
+        # Llama al repositorio.
+        en_segundo_plano(llamar("eliminar_contacto", contacto_id), listo, mostrar_error("No se pudo eliminar."))
 
     # Actualiza el contacto seleccionado cuando se presiona Actualizar.
     def actualizar_contacto_gui():
@@ -250,44 +680,98 @@ def crear_interfaz(root: tk.Tk, gestor):
             messagebox.showinfo("Atención", "Seleccione un contacto en la tabla.")
             return
 
-        # Verifica que el formulario sea valido.
-        if not form_es_valido():
-            messagebox.showwarning("Validación", "Complete campos válidos antes de actualizar.")
+        # Verifica que el formulario sea valido y muestra que campo falla.
+        errores = errores_del_form()
+        if errores:
+            detalle = "\n".join(mensaje for _, mensaje in errores)
+            messagebox.showwarning("Validación", f"Complete campos válidos antes de actualizar.\n{detalle}")
             return
 
         # Obtiene el ID de la fila seleccionada.
         item = tree.item(sel[0])
         contacto_id = int(item["values"][0])
 
-        try:
-            from main import Contacto
-            c = Contacto(
-                nombre=var_nombre.get().strip(),
-                apellido=var_apellido.get().strip(),
-                telefono=var_telefono.get().strip(),
-                email=var_email.get().strip(),
-            )
-            # Llama al repositorio para actualizar.
-            ok = gestor.actualizar_contacto(contacto_id, c)
+        from main import Contacto
+        c = Contacto(
+            nombre=var_nombre.get().strip(),
+            apellido=var_apellido.get().strip(),
+            telefono=var_telefono.get().strip(),
+            email=var_email.get().strip(),
+        )
+
+        def listo(ok):
             if ok:
                 messagebox.showinfo("OK", "Contacto actualizado.")
                 # Limpia los campos.
                 limpiar_inputs()
+                sincronizar_cambios()
             else:
                 messagebox.showwarning("Atención", "No se encontró el contacto para actualizar.")
-        except ValueError as ve:
-            messagebox.showwarning("Validación", str(ve))
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo actualizar.\n{e}")
+
+        # Llama al repositorio para actualizar.
+        en_segundo_plano(
+            llamar("actualizar_contacto", contacto_id, c), listo, mostrar_error("No se pudo actualizar.")
+        )
+
+    # Importa un archivo CSV o JSON Lines cuando se presiona Importar.
+    def importar_contactos_gui():
+        ruta = filedialog.askopenfilename(
+            title="Importar contactos",
+            filetypes=[("CSV o JSON Lines", "*.csv *.jsonl *.ndjson"), ("Todos", "*.*")],
+        )
+        # Si se cancela el dialogo no hace nada.
+        if not ruta:
+            return
+
+        def listo(resultados):
+            aceptados = sum(1 for _, ok, _ in resultados if ok)
+            messagebox.showinfo(
+                "OK", f"Importados: {aceptados}.\nRechazados: {len(resultados) - aceptados}."
+            )
+            listar_contactos_gui()
+
+        en_segundo_plano(llamar("importar_archivo", ruta), listo, mostrar_error("No se pudo importar."))
+
+    # Exporta todos los contactos (o los de la busqueda actual) cuando se presiona Exportar.
+    def exportar_contactos_gui():
+        ruta = filedialog.asksaveasfilename(
+            title="Exportar contactos",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("vCard", "*.vcf"),
+                       ("Comprimido", "*.gz"), ("Todos", "*.*")],
+        )
+        # Si se cancela el dialogo no hace nada.
+        if not ruta:
+            return
+        texto = var_busqueda.get().strip()
+        # El callback corre en el hilo de la BBDD, solo guarda el numero para mostrarlo.
+        avance = {"filas": 0}
+
+        def progreso(filas: int):
+            avance["filas"] = filas
+
+        def listo(cantidad):
+            messagebox.showinfo("OK", f"Se exportaron {cantidad} contactos.")
+
+        en_segundo_plano(
+            llamar("exportar", ruta, busqueda=texto or None, progreso=progreso),
+            listo,
+            mostrar_error("No se pudo exportar."),
+            texto_estado=lambda: f"Exportando... {avance['filas']} contactos",
+        )
 
     # Asocia el botón “Agregar” con su función.
-    btn_agregar.configure(command=agregar_contacto_gui)
+    btn_agregar.configure(command=medir_accion("ui:agregar")(agregar_contacto_gui))
     # Asocia el botón “Listar” con su función.
-    btn_listar.configure(command=listar_contactos_gui)
+    btn_listar.configure(command=medir_accion("ui:listar")(listar_contactos_gui))
     # Asocia el botón “Eliminar” con su función.
-    btn_eliminar.configure(command=eliminar_contacto_gui)
+    btn_eliminar.configure(command=medir_accion("ui:eliminar")(eliminar_contacto_gui))
     # Asocia el botón “Actualizar” con su función.
-    btn_actualizar.configure(command=actualizar_contacto_gui)
+    btn_actualizar.configure(command=medir_accion("ui:actualizar")(actualizar_contacto_gui))
+    # Asocia el botón “Importar” con su función.
+    btn_importar.configure(command=medir_accion("ui:importar")(importar_contactos_gui))
+    # Asocia el botón “Exportar” con su función.
+    btn_exportar.configure(command=medir_accion("ui:exportar")(exportar_contactos_gui))
 
     # Esto permite que cuando seleccionamos un registro carge sus datos en los campos, para que si deseamos actualizar sea mas facil.
     def on_select_row(_evt):
@@ -299,6 +783,10 @@ def crear_interfaz(root: tk.Tk, gestor):
         # Obtiene el contenido del item seleccionado.
         item = tree.item(sel[0])
         _id, nombre, apellido, telefono, email = item["values"]
+        # Si es la misma fila (por ejemplo al volver a dibujar la grilla) no pisa lo que se edito.
+        if grilla["seleccionado"] == _id:
+            return
+        grilla["seleccionado"] = _id
         # Pasa los valores a los campos.
         var_nombre.set(nombre)
         var_apellido.set(apellido)
@@ -306,7 +794,11 @@ def crear_interfaz(root: tk.Tk, gestor):
         var_email.set(email)
         refrescar_estado_boton_agregar()
 
-    tree.bind("<<TreeviewSelect>>", on_select_row)
+    tree.bind("<<TreeviewSelect>>", medir_accion("ui:seleccionar")(on_select_row))
 
     # Al iniciar se evalua el boton Agregar.
     refrescar_estado_boton_agregar()
+    # Empieza a seguir los cambios de la BBDD.
+    root.after(INTERVALO_CAMBIOS_MS, sondear_cambios)
+    # El primer mantenimiento espera un intervalo, asi no compite con la carga inicial.
+    root.after(INTERVALO_MANTENIMIENTO_MS, mantener_bbdd)
@@ -1,20 +1,346 @@
 # Aca importamos la libreria para usar SQLite.
 import sqlite3
+# Para leer la configuración desde variables de entorno.
+import os
+# Para abrir la BBDD en solo lectura con una URI.
+from pathlib import Path
+# Librerias para leer archivos de carga masiva.
+import csv
+import json
+# Para separar en palabras el texto de busqueda.
+import re
+# Para medir la ventana del commit agrupado.
+import time
+# Para armar el context manager de transacciones.
+from contextlib import contextmanager
+# Para el modo con varios hilos (pool de lectura y bloqueo del escritor).
+import functools
+import queue
+import threading
+# Para el indice de duplicados en memoria.
+import math
+from collections import Counter, OrderedDict
+# Columna de IDs compacta para el modo por columnas.
+from array import array
+# Acceso por posicion a los campos de Contacto.
+from operator import itemgetter
+# Medicion opcional de consultas (CONTACTOS_INSTRUMENTACION=1).
+import instrumentacion
+# Reglas de validación compartidas con la interfaz.
+import validacion
+# Claves normalizadas para encontrar duplicados probables.
+import duplicados
 # Importamos diferentes tipos de anotaciones.
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Iterable, Iterator, Set
 
 # |||| Configuración de la base de datos ||||
 
 # Instanciamos la BBDD.
 DB_NAME = "contactos.db"
 
+# Cantidad de filas que se validan e insertan juntas en la carga masiva.
+TAMANO_LOTE = 500
+# Cambios que se devuelven como maximo por llamada a cambios_desde.
+LIMITE_CAMBIOS = 1000
+# Cambios que deja depurar_cambios en el registro.
+CAMBIOS_A_CONSERVAR = 10_000
+# Entradas del cache de busquedas por id, email y teléfono (ver CacheLRU).
+CACHE_CAPACIDAD = 4096
+# Segundos que vive una entrada del cache.
+CACHE_TTL_S = 300.0
+# Cada cuanto el cache revisa si otro proceso cambio la BBDD; entre revision y revision los aciertos
+# no consultan SQLite y los cambios de otro proceso pueden tardar hasta este tiempo en verse.
+CACHE_VERIFICAR_MS = 250.0
+# Paginas que copia cada paso de respaldar; entre paso y paso los demas pueden escribir.
+PAGINAS_POR_PASO = 1024
+# Pausa entre pasos del respaldo.
+PAUSA_RESPALDO_MS = 5.0
+# Veces que el respaldo puede volver a empezar por escrituras de otra conexión antes de copiar todo de una.
+REINICIOS_RESPALDO = 3
+# Filas por indice que lee ANALYZE (PRAGMA analysis_limit), asi tarda poco aunque la tabla sea grande.
+LIMITE_ANALISIS = 400
+# Cada cuanto el servicio llama a mantenimiento().
+INTERVALO_MANTENIMIENTO_S = 3600.0
+
+# Columnas de la tabla contactos en el orden en que se devuelven.
+COLUMNAS = ("id", "nombre", "apellido", "telefono", "email")
+
+# |||| Perfiles de conexión ||||
+
+# PRAGMAs que se aplican a cada conexión segun el perfil elegido.
+PERFILES = {
+    # Durable: WAL para que lectores y escritor no se bloqueen, fsync completo en cada commit.
+    "safe": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -8000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+    },
+    # Rapido: fsync solo en checkpoints, cache de 64 MB y lecturas por mmap.
+    "fast": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+    # Solo lectura: la BBDD se abre con mode=ro y no acepta escrituras.
+    "readonly": {
+        "busy_timeout": 5000,
+        "query_only": "ON",
+        "cache_size": -64000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+}
+
+# Perfil que se usa si no se indica otro, se puede elegir con CONTACTOS_PERFIL.
+# None deja los valores por defecto de SQLite.
+PERFIL_POR_DEFECTO = os.environ.get("CONTACTOS_PERFIL") or None
+
+# Devuelve el nombre del perfil a usar, validando que exista.
+def _resolver_perfil(perfil: Optional[str]) -> Optional[str]:
+    nombre = perfil if perfil is not None else PERFIL_POR_DEFECTO
+    if nombre is not None and nombre not in PERFILES:
+        raise ValueError(f"Perfil de conexión desconocido: {nombre}.")
+    return nombre
+
+# Abre una conexión aplicando el perfil, todas las conexiones del modulo pasan por aca.
+def conectar(db_path: Optional[str] = None, perfil: Optional[str] = None, **kwargs) -> sqlite3.Connection:
+    db_path = db_path or DB_NAME
+    nombre = _resolver_perfil(perfil)
+    # Con la medicion activa cada consulta de la conexión queda registrada.
+    if instrumentacion.activa():
+        kwargs.setdefault("factory", instrumentacion.ConexionInstrumentada)
+    if nombre == "readonly":
+        # Con una URI se puede pedir que SQLite abra el archivo sin permiso de escritura.
+        conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True, **kwargs)
+    else:
+        conn = sqlite3.connect(db_path, **kwargs)
+    if nombre is not None:
+        for pragma, valor in PERFILES[nombre].items():
+            conn.execute(f"PRAGMA {pragma} = {valor}")
+    return conn
+
+# Consultas que usa el control de duplicados.
+SQL_DUP_EXACTO = (
+    "SELECT id FROM contactos "
+    "WHERE nombre = ? AND apellido = ? AND telefono = ? AND email = ?"
+)
+SQL_DUP_EMAIL = "SELECT id FROM contactos WHERE email = ?"
+SQL_DUP_TELEFONO = "SELECT id FROM contactos WHERE telefono = ?"
+
+# Filas de una clave normalizada ordenadas por su valor, para armar los bloques de duplicados probables.
+SQL_FILAS_DE_CLAVE = (
+    "SELECT {columna}, id, " + ", ".join(duplicados.COLUMNAS_CLAVE) + " FROM contactos "
+    "WHERE {columna} <> '' ORDER BY {columna}"
+)
+# Claves por las que se arman los bloques.
+COLUMNAS_BLOQUE = ("telefono_clave", "email_clave", "fonetica")
+
+# Escrituras que tambien guardan las claves normalizadas (ver duplicados.py).
+SQL_INSERTAR = (
+    "INSERT INTO contactos(nombre, apellido, telefono, email, "
+    "nombre_clave, telefono_clave, email_clave, fonetica) VALUES(?, ?, ?, ?, ?, ?, ?, ?)"
+)
+# Igual pero con el ID elegido afuera (lo usa GestorFragmentado, ver fragmentos.py).
+SQL_INSERTAR_CON_ID = (
+    "INSERT INTO contactos(id, nombre, apellido, telefono, email, "
+    "nombre_clave, telefono_clave, email_clave, fonetica) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+SQL_ACTUALIZAR = (
+    "UPDATE contactos SET nombre = ?, apellido = ?, telefono = ?, email = ?, "
+    "nombre_clave = ?, telefono_clave = ?, email_clave = ?, fonetica = ? WHERE id = ?"
+)
+SQL_ACTUALIZAR_CLAVES = (
+    "UPDATE contactos SET nombre_clave = ?, telefono_clave = ?, email_clave = ?, fonetica = ? WHERE id = ?"
+)
+
+# Ultima version del registro de cambios; sqlite_sequence la recuerda aunque se depuren los cambios.
+SQL_VERSION_CAMBIOS = (
+    "SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'contactos_cambios'), 0)"
+)
+
+# |||| Migraciones del esquema ||||
+
+# Version 1: indices para buscar duplicados por email y por telefono.
+def _migracion_indices_duplicados(cur: sqlite3.Cursor):
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_contactos_email ON contactos(email);")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_contactos_telefono ON contactos(telefono);")
+
+# Version 2: indice de texto completo (FTS5) sincronizado con triggers.
+def _migracion_busqueda_texto(cur: sqlite3.Cursor):
+    # Tabla virtual que indexa el contenido de contactos sin duplicar los datos.
+    cur.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS contactos_fts USING fts5(
+            nombre, apellido, telefono, email,
+            content='contactos', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        );
+    """)
+    # Mantiene el indice al insertar.
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS contactos_fts_ai AFTER INSERT ON contactos BEGIN
+            INSERT INTO contactos_fts(rowid, nombre, apellido, telefono, email)
+            VALUES (new.id, new.nombre, new.apellido, new.telefono, new.email);
+        END;
+    """)
+    # Mantiene el indice al borrar.
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS contactos_fts_ad AFTER DELETE ON contactos BEGIN
+            INSERT INTO contactos_fts(contactos_fts, rowid, nombre, apellido, telefono, email)
+            VALUES ('delete', old.id, old.nombre, old.apellido, old.telefono, old.email);
+        END;
+    """)
+    # Mantiene el indice al actualizar.
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS contactos_fts_au AFTER UPDATE ON contactos BEGIN
+            INSERT INTO contactos_fts(contactos_fts, rowid, nombre, apellido, telefono, email)
+            VALUES ('delete', old.id, old.nombre, old.apellido, old.telefono, old.email);
+            INSERT INTO contactos_fts(rowid, nombre, apellido, telefono, email)
+            VALUES (new.id, new.nombre, new.apellido, new.telefono, new.email);
+        END;
+    """)
+    # Indexa los contactos que ya existian.
+    cur.execute("INSERT INTO contactos_fts(contactos_fts) VALUES ('rebuild');")
+
+# Version 3: claves normalizadas para detectar duplicados probables, con sus indices.
+def _migracion_claves_normalizadas(cur: sqlite3.Cursor):
+    existentes = {fila[1] for fila in cur.execute("PRAGMA table_info(contactos)")}
+    for columna in duplicados.COLUMNAS_CLAVE:
+        if columna not in existentes:
+            cur.execute(f"ALTER TABLE contactos ADD COLUMN {columna} TEXT NOT NULL DEFAULT ''")
+        cur.execute(f"CREATE INDEX IF NOT EXISTS idx_contactos_{columna} ON contactos({columna})")
+    # Calcula las claves de los contactos que ya existian, de a bloques por ID.
+    ultimo_id = 0
+    while True:
+        filas = cur.execute(
+            "SELECT id, nombre, apellido, telefono, email FROM contactos WHERE id > ? ORDER BY id LIMIT ?",
+            (ultimo_id, TAMANO_LOTE)
+        ).fetchall()
+        if not filas:
+            break
+        ultimo_id = filas[-1][0]
+        cur.executemany(
+            SQL_ACTUALIZAR_CLAVES,
+            [duplicados.claves(n, a or "", t or "", e or "") + (i,) for i, n, a, t, e in filas]
+        )
+
+# Version 4: registro de cambios (alta, modificacion y baja) que llenan los triggers.
+# La version de cada cambio es creciente y nunca se reutiliza; momento son segundos desde 1970.
+def _migracion_registro_cambios(cur: sqlite3.Cursor):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS contactos_cambios (
+            version INTEGER PRIMARY KEY AUTOINCREMENT,
+            op TEXT NOT NULL CHECK (op IN ('I', 'U', 'D')),
+            contacto_id INTEGER NOT NULL,
+            momento REAL NOT NULL DEFAULT ((julianday('now') - 2440587.5) * 86400.0)
+        );
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS contactos_cambios_ai AFTER INSERT ON contactos BEGIN
+            INSERT INTO contactos_cambios(op, contacto_id) VALUES ('I', new.id);
+        END;
+    """)
+    # Solo cuentan los campos del contacto, no las claves normalizadas.
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS contactos_cambios_au
+        AFTER UPDATE OF nombre, apellido, telefono, email ON contactos BEGIN
+            INSERT INTO contactos_cambios(op, contacto_id) VALUES ('U', new.id);
+        END;
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS contactos_cambios_ad AFTER DELETE ON contactos BEGIN
+            INSERT INTO contactos_cambios(op, contacto_id) VALUES ('D', old.id);
+        END;
+    """)
+
+# Version 5: vuelve a calcular el codigo fonetico de los nombres con "gue" o "gui", que antes
+# quedaban con "j" ("Guerra" igual que "Jerra"). Solo esos nombres cambian.
+def _migracion_fonetica_gu(cur: sqlite3.Cursor):
+    filas = cur.execute(
+        "SELECT id, nombre, apellido FROM contactos WHERE nombre_clave LIKE '%gu%'"
+    ).fetchall()
+    cur.executemany(
+        "UPDATE contactos SET fonetica = ? WHERE id = ?",
+        [(duplicados.codigo_fonetico(n, a or ""), i) for i, n, a in filas]
+    )
+
+# Lista de migraciones en orden, la posicion + 1 es la version del esquema.
+MIGRACIONES = [
+    _migracion_indices_duplicados,
+    _migracion_busqueda_texto,
+    _migracion_claves_normalizadas,
+    _migracion_registro_cambios,
+    _migracion_fonetica_gu,
+]
+
+# Aplica las migraciones que falten segun PRAGMA user_version.
+def _migrar_esquema(cur: sqlite3.Cursor):
+    version = cur.execute("PRAGMA user_version").fetchone()[0]
+    for numero, migracion in enumerate(MIGRACIONES[version:], start=version + 1):
+        migracion(cur)
+        # Guarda la version alcanzada.
+        cur.execute(f"PRAGMA user_version = {numero}")
+
+# Crea indices unicos parciales para email y telefono (los vacios no cuentan).
+def _crear_indices_unicos(cur: sqlite3.Cursor):
+    try:
+        cur.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_contactos_email_unico
+            ON contactos(email) WHERE email <> '';
+        """)
+        cur.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_contactos_telefono_unico
+            ON contactos(telefono) WHERE telefono <> '';
+        """)
+    except sqlite3.IntegrityError:
+        raise ValueError("Hay emails o teléfonos repetidos, no se pueden crear índices únicos.")
+
+# Devuelve las consultas de duplicados que recorren toda la tabla (deberia estar vacia).
+def consultas_sin_indice(conn: sqlite3.Connection) -> List[Tuple[str, str]]:
+    consultas = [
+        (SQL_DUP_EXACTO, ("", "", "", "")),
+        (SQL_DUP_EXACTO + " AND id <> ?", ("", "", "", "", 0)),
+        (SQL_DUP_EMAIL, ("",)),
+        (SQL_DUP_EMAIL + " AND id <> ?", ("", 0)),
+        (SQL_DUP_TELEFONO, ("",)),
+        (SQL_DUP_TELEFONO + " AND id <> ?", ("", 0)),
+    ]
+    malas = []
+    for sql, params in consultas:
+        for fila in conn.execute("EXPLAIN QUERY PLAN " + sql, params):
+            # La ultima columna es el detalle, ej. "SCAN contactos".
+            if fila[-1].startswith("SCAN"):
+                malas.append((sql, fila[-1]))
+    return malas
+
+# Arma la consulta FTS5: cada palabra se busca como prefijo y todas deben estar.
+def armar_consulta_fts(texto: str) -> str:
+    palabras = re.findall(r"\w+", texto)
+    return " ".join(f'"{p}"*' for p in palabras)
+
 # Crear la tabla de contactos.
-def crear_tabla_contactos():
+# Con unicos=True tambien impide emails o telefonos repetidos desde la BBDD.
+def crear_tabla_contactos(db_path: Optional[str] = None, unicos: bool = False, perfil: Optional[str] = None):
+    # Con el perfil de solo lectura no se puede tocar el esquema.
+    if _resolver_perfil(perfil) == "readonly":
+        return
     # Inicia la conexión a la BBDD.
-    conn = sqlite3.connect(DB_NAME)
+    conn = conectar(db_path, perfil)
     # Crea un cursor para ejecutar sentencias SQL.
     cur = conn.cursor()
 
+    # En una BBDD nueva activa auto_vacuum incremental (ver compactar); con tablas ya creadas solo se
+    # puede cambiar con un VACUUM, y el journal WAL del perfil ya escribio el encabezado.
+    if cur.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == 0:
+        cur.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        cur.execute("VACUUM")
+
     # Ejecuta SQL para crear la tabla contactos si no existe.
     cur.execute("""
         CREATE TABLE IF NOT EXISTS contactos (
@@ -36,69 +362,737 @@ def crear_tabla_contactos():
         # Esto sirve en el caso si llega a fallar, no se rompa la app.
         pass
 
-    # Confirma todos los cambios en la BBDD.
-    conn.commit()
-    # Cierra la conexión con la BBDD.
-    conn.close()
+    try:
+        # Lleva el esquema a la ultima version, sirve para BBDD nuevas y viejas.
+        _migrar_esquema(cur)
+        # Indices unicos opcionales.
+        if unicos:
+            _crear_indices_unicos(cur)
+        # Confirma todos los cambios en la BBDD.
+        conn.commit()
+    finally:
+        # Cierra la conexión con la BBDD.
+        conn.close()
+
+# |||| Pool de conexiones de lectura ||||
+
+# Cantidad de segundos que se espera una conexión libre antes de fallar.
+ESPERA_POOL = 30.0
+
+# Conjunto fijo de conexiones de solo lectura que se prestan a los hilos.
+# Necesita la BBDD en modo WAL para que los lectores no bloqueen al escritor.
+class PoolDeLectura:
+    def __init__(self, db_path: str, tamano: int, perfil: str = "readonly"):
+        if tamano < 1:
+            raise ValueError("El pool necesita al menos una conexión.")
+        # Cola de conexiones libres, la ultima devuelta es la primera en salir (cache caliente).
+        self._libres: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._todas: List[sqlite3.Connection] = []
+        for _ in range(tamano):
+            # Cada conexión puede usarse desde cualquier hilo, pero de a uno por vez.
+            conn = conectar(db_path, perfil, check_same_thread=False)
+            self._todas.append(conn)
+            self._libres.put(conn)
+
+    # Presta una conexión y la devuelve al salir del with.
+    @contextmanager
+    def conexion(self, espera: Optional[float] = ESPERA_POOL) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._libres.get(timeout=espera)
+        except queue.Empty:
+            raise TimeoutError("No hay conexiones de lectura libres.")
+        try:
+            yield conn
+        finally:
+            self._libres.put(conn)
+
+    # Cierra todas las conexiones del pool.
+    def cerrar(self):
+        for conn in self._todas:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._todas = []
+
+# |||| Indice de duplicados en memoria ||||
+
+# Filtro de Bloom: dice "seguro que no esta" o "quizas esta", usando pocos bits por clave.
+class FiltroBloom:
+    def __init__(self, capacidad: int, tasa_error: float = 0.01):
+        self.capacidad = max(1, capacidad)
+        # Cantidad de bits y de funciones hash segun la formula clasica.
+        self._bits_total = max(8, int(-self.capacidad * math.log(tasa_error) / (math.log(2) ** 2)))
+        self._hashes = max(1, round(self._bits_total / self.capacidad * math.log(2)))
+        self._bits = bytearray((self._bits_total + 7) // 8)
+        self._tasa_error = tasa_error
+        # Se importa aca porque solo hace falta si se usa el filtro.
+        import hashlib
+        self._blake2b = hashlib.blake2b
+
+    # Calcula las posiciones de una clave con doble hashing sobre un solo blake2b.
+    def _posiciones(self, clave: str) -> Iterator[int]:
+        digest = self._blake2b(clave.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self._hashes):
+            yield (h1 + i * h2) % self._bits_total
+
+    def agregar(self, clave: str):
+        for pos in self._posiciones(clave):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, clave: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._posiciones(clave))
+
+# Conjuntos en memoria con las claves que usa _existe_duplicado (tupla completa, email y telefono).
+# Guarda cuantas veces aparece cada clave, asi al borrar un contacto no se pierden las repetidas.
+class IndiceDuplicados:
+    def __init__(self, usar_bloom: bool = False, tasa_error: float = 0.01):
+        self._tuplas: Counter = Counter()
+        self._emails: Counter = Counter()
+        self._telefonos: Counter = Counter()
+        self._usar_bloom = usar_bloom
+        self._tasa_error = tasa_error
+        self._bloom: Optional[FiltroBloom] = None
+
+    # Carga el indice desde la tabla (se hace una vez al iniciar o despues de un rollback).
+    def cargar(self, conn: sqlite3.Connection):
+        self._tuplas.clear()
+        self._emails.clear()
+        self._telefonos.clear()
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT nombre, apellido, telefono, email FROM contactos")
+            while True:
+                bloque = cur.fetchmany(TAMANO_LOTE)
+                if not bloque:
+                    break
+                for fila in bloque:
+                    self._sumar(fila, 1)
+        finally:
+            cur.close()
+        self._reconstruir_bloom()
+
+    # El Bloom no permite borrar, por eso se rearma con el doble de lugar cuando se llena.
+    def _reconstruir_bloom(self):
+        if not self._usar_bloom:
+            return
+        claves = len(self._tuplas) + len(self._emails) + len(self._telefonos)
+        self._bloom = FiltroBloom(max(1024, claves * 2), self._tasa_error)
+        for t in self._tuplas:
+            self._bloom.agregar(self._clave_tupla(t))
+        for e in self._emails:
+            self._bloom.agregar("e:" + e)
+        for t in self._telefonos:
+            self._bloom.agregar("t:" + t)
+
+    @staticmethod
+    def _clave_tupla(fila: Tuple) -> str:
+        return "f:" + "\x1f".join("" if v is None else v for v in fila)
+
+    # Suma o resta una fila (nombre, apellido, telefono, email) en los contadores.
+    def _sumar(self, fila: Tuple, cantidad: int):
+        _nombre, _apellido, telefono, email = fila
+        for contador, clave in ((self._tuplas, tuple(fila)), (self._emails, email), (self._telefonos, telefono)):
+            # Los vacios no cuentan para email y telefono, igual que en _existe_duplicado.
+            if clave is None or clave == "":
+                continue
+            contador[clave] += cantidad
+            if contador[clave] <= 0:
+                del contador[clave]
+
+    def agregar(self, fila: Tuple):
+        self._sumar(fila, 1)
+        if self._bloom is not None:
+            nombre, apellido, telefono, email = fila
+            self._bloom.agregar(self._clave_tupla(fila))
+            if email:
+                self._bloom.agregar("e:" + email)
+            if telefono:
+                self._bloom.agregar("t:" + telefono)
+            # Si se paso de la capacidad aumenta la tasa de falsos positivos, se rearma.
+            if len(self._tuplas) + len(self._emails) + len(self._telefonos) > self._bloom.capacidad:
+                self._reconstruir_bloom()
+
+    def quitar(self, fila: Tuple):
+        self._sumar(fila, -1)
+
+    # Cuantas veces esta la clave sin contar la fila excluida.
+    @staticmethod
+    def _cuenta(contador: Counter, clave, clave_excluida) -> int:
+        return contador.get(clave, 0) - (1 if clave_excluida == clave else 0)
+
+    # False si seguro no hay duplicado, True si hay que confirmarlo contra la BBDD.
+    def puede_haber_duplicado(
+        self,
+        nombre: str,
+        apellido: str,
+        telefono: str,
+        email: str,
+        fila_excluida: Optional[Tuple] = None
+    ) -> bool:
+        tupla = (nombre, apellido, telefono, email)
+        hay_email = bool(email.strip())
+        hay_telefono = bool(telefono.strip())
+        # Primero el Bloom, que no necesita buscar en los conjuntos.
+        if self._bloom is not None:
+            posibles = (
+                self._clave_tupla(tupla) in self._bloom
+                or (hay_email and "e:" + email in self._bloom)
+                or (hay_telefono and "t:" + telefono in self._bloom)
+            )
+            if not posibles:
+                return False
+        excluida = fila_excluida or (None, None, None, None)
+        if self._cuenta(self._tuplas, tupla, tuple(excluida) if fila_excluida else None) > 0:
+            return True
+        if hay_email and self._cuenta(self._emails, email, excluida[3]) > 0:
+            return True
+        if hay_telefono and self._cuenta(self._telefonos, telefono, excluida[2]) > 0:
+            return True
+        return False
+
+# |||| Cache de busquedas ||||
+
+# Marca de "no esta en el cache" (None es un valor valido: el contacto no existe).
+_FALTA = object()
+
+# Cache LRU con vencimiento para las busquedas por id, email y teléfono.
+# Las claves son ("id", 7), ("email", "a@x.com") o ("telefono", "351..."), el valor la fila o None.
+# Recuerda que claves apuntan a cada contacto para poder invalidarlo sin recorrer todo.
+class CacheLRU:
+    def __init__(self, capacidad: int = CACHE_CAPACIDAD, ttl_s: float = CACHE_TTL_S):
+        if capacidad < 1:
+            raise ValueError("La capacidad del cache debe ser mayor a 0.")
+        self.capacidad = capacidad
+        self.ttl_s = ttl_s
+        self._bloqueo = threading.Lock()
+        # clave -> (fila, vence)
+        self._entradas: OrderedDict = OrderedDict()
+        # id del contacto -> claves que lo devuelven
+        self._por_id: dict = {}
+        # Crece con cada invalidacion, sirve para no guardar lo que se leyo antes de un cambio.
+        self.generacion = 0
+        self._estadisticas = Counter()
+
+    # Devuelve la fila guardada (o None si se sabe que no existe) o _FALTA.
+    def obtener(self, clave):
+        with self._bloqueo:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self._estadisticas["fallos"] += 1
+                return _FALTA
+            if entrada[1] < time.monotonic():
+                self._quitar(clave)
+                self._estadisticas["vencidos"] += 1
+                self._estadisticas["fallos"] += 1
+                return _FALTA
+            self._entradas.move_to_end(clave)
+            self._estadisticas["aciertos"] += 1
+            return entrada[0]
+
+    # Guarda una lectura; si hubo invalidaciones desde `generacion` la descarta porque puede ser vieja.
+    def guardar(self, clave, fila, generacion: int):
+        with self._bloqueo:
+            if generacion != self.generacion:
+                return
+            if clave in self._entradas:
+                self._quitar(clave)
+            self._entradas[clave] = (fila, time.monotonic() + self.ttl_s)
+            if fila is not None:
+                self._por_id.setdefault(fila[0], set()).add(clave)
+            # Saca las menos usadas.
+            while len(self._entradas) > self.capacidad:
+                self._quitar(next(iter(self._entradas)))
+                self._estadisticas["desalojos"] += 1
+
+    def _quitar(self, clave):
+        fila, _vence = self._entradas.pop(clave)
+        if fila is not None:
+            claves = self._por_id.get(fila[0])
+            if claves is not None:
+                claves.discard(clave)
+                if not claves:
+                    del self._por_id[fila[0]]
+
+    # Invalida todo lo que devuelve al contacto y las claves de sus datos nuevos
+    # (fila es (nombre, apellido, telefono, email) despues del cambio, None si se borro).
+    def invalidar_contacto(self, contacto_id: int, fila: Optional[Tuple] = None):
+        with self._bloqueo:
+            self.generacion += 1
+            claves = set(self._por_id.get(contacto_id, ()))
+            claves.add(("id", contacto_id))
+            if fila is not None:
+                _nombre, _apellido, telefono, email = fila
+                claves.add(("email", email))
+                claves.add(("telefono", telefono))
+            for clave in claves:
+                if clave in self._entradas:
+                    self._quitar(clave)
+                    self._estadisticas["invalidaciones"] += 1
+
+    # Saca las entradas de "no existe", por ejemplo despues de una carga masiva.
+    def quitar_ausentes(self):
+        with self._bloqueo:
+            self.generacion += 1
+            for clave in [c for c, (fila, _v) in self._entradas.items() if fila is None]:
+                self._quitar(clave)
+                self._estadisticas["invalidaciones"] += 1
+
+    def limpiar(self):
+        with self._bloqueo:
+            self.generacion += 1
+            self._entradas.clear()
+            self._por_id.clear()
+            self._estadisticas["limpiezas"] += 1
+
+    # Aciertos, fallos, tasa de aciertos y tamaño actual.
+    def estadisticas(self) -> dict:
+        with self._bloqueo:
+            datos = {n: self._estadisticas[n] for n in
+                     ("aciertos", "fallos", "vencidos", "desalojos", "invalidaciones", "limpiezas")}
+            consultas = datos["aciertos"] + datos["fallos"]
+            datos["tasa_aciertos"] = datos["aciertos"] / consultas if consultas else 0.0
+            datos["entradas"] = len(self._entradas)
+            datos["capacidad"] = self.capacidad
+            return datos
+
+# Hace que un metodo del gestor se ejecute con el bloqueo del escritor tomado.
+def _sincronizado(metodo):
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with self._bloqueo:
+            return metodo(self, *args, **kwargs)
+    return envoltura
 
 # |||| POO ||||
 
 # Definimos la clase contacto.
-class Contacto:
+# Es una tupla (id, nombre, apellido, telefono, email) con nombres de campo:
+# inmutable, sin __dict__ por instancia y con la misma forma que las filas de la BBDD.
+class Contacto(tuple):
+    __slots__ = ()
+
     # Las validaciones lo hace en la interfaz.
-    def __init__(self, nombre: str, apellido: str = "", telefono: str = "", email: str = ""):
-        # Asignamos el nombre.
-        self.nombre = nombre
-        # Asignamos el apellido.
-        self.apellido = apellido
-        # Asignamos el telefono.
-        self.telefono = telefono
-        # Asignamos el mail.
-        self.email = email
+    # id queda en None hasta que el contacto se guarda en la BBDD.
+    def __new__(
+        cls,
+        nombre: str,
+        apellido: str = "",
+        telefono: str = "",
+        email: str = "",
+        id: Optional[int] = None
+    ):
+        return tuple.__new__(cls, (id, nombre, apellido, telefono, email))
+
+    # Campo ID.
+    id = property(itemgetter(0))
+    # Campo nombre.
+    nombre = property(itemgetter(1))
+    # Campo apellido.
+    apellido = property(itemgetter(2))
+    # Campo telefono.
+    telefono = property(itemgetter(3))
+    # Campo email.
+    email = property(itemgetter(4))
+
+    # Crea el contacto desde una fila (id, nombre, apellido, telefono, email) sin copiar campo por campo.
+    @classmethod
+    def desde_fila(cls, fila: Tuple) -> "Contacto":
+        return tuple.__new__(cls, fila)
+
+    # Devuelve la fila (id, nombre, apellido, telefono, email), como la usa la grilla.
+    def como_fila(self) -> Tuple:
+        return tuple(self)
+
+    # Como no se puede modificar, devuelve una copia con los campos cambiados.
+    def reemplazar(self, **cambios) -> "Contacto":
+        valores = dict(zip(COLUMNAS, self))
+        valores.update(cambios)
+        return Contacto(**valores)
+
+    # Para que pickle y copy lo armen con el orden de argumentos de __new__.
+    def __getnewargs__(self):
+        return (self[1], self[2], self[3], self[4], self[0])
+
+    def __repr__(self):
+        return (f"Contacto(nombre={self[1]!r}, apellido={self[2]!r}, "
+                f"telefono={self[3]!r}, email={self[4]!r}, id={self[0]!r})")
 
     def __str__(self):
         # Devuelve un string que muestra nombre, apellido, teléfono y email.
         return f"{self.nombre} {self.apellido} | Tel: {self.telefono} | Email: {self.email}"
 
+# row_factory de sqlite3: convierte la fila del cursor en Contacto sin pasar por otra estructura.
+# La consulta tiene que traer las columnas id, nombre, apellido, telefono, email en ese orden.
+def fila_a_contacto(_cursor: sqlite3.Cursor, fila: Tuple) -> Contacto:
+    return tuple.__new__(Contacto, fila)
+
+# Fila del gestor como dict con los nombres de COLUMNAS, para mandarla como JSON.
+def fila_a_dict(fila) -> dict:
+    return dict(zip(COLUMNAS, fila))
+
+# |||| Lectura de archivos para carga masiva ||||
+
+# Linea de un archivo que no se pudo leer. El lector la devuelve en lugar del contacto
+# y la carga masiva la rechaza con este motivo, sin cortar la carga.
+class LineaInvalida(ValueError):
+    pass
+
+# Lee un CSV con encabezados nombre, apellido, telefono, email.
+# utf-8-sig saltea el BOM que agrega Excel, si no el primer encabezado no coincide.
+def leer_contactos_csv(ruta: str) -> Iterator[Contacto]:
+    with open(ruta, newline="", encoding="utf-8-sig") as f:
+        for fila in csv.DictReader(f):
+            # Las columnas faltantes se toman como vacias.
+            yield Contacto(
+                nombre=fila.get("nombre") or "",
+                apellido=fila.get("apellido") or "",
+                telefono=fila.get("telefono") or "",
+                email=fila.get("email") or "",
+            )
+
+# Lee un archivo JSON Lines, un objeto por linea.
+# Las lineas que no son un objeto JSON salen como LineaInvalida.
+def leer_contactos_jsonl(ruta: str) -> Iterator[Contacto]:
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            # Saltea lineas en blanco.
+            if not linea.strip():
+                continue
+            try:
+                datos = json.loads(linea)
+            except ValueError:
+                yield LineaInvalida("JSON invalido.")
+                continue
+            if not isinstance(datos, dict):
+                yield LineaInvalida("Se esperaba un objeto JSON.")
+                continue
+            yield dict_a_contacto(datos)
+
+# Arma un Contacto desde un objeto JSON; los campos faltantes se toman como vacios.
+def dict_a_contacto(datos: dict) -> Contacto:
+    return Contacto(
+        nombre=str(datos.get("nombre") or ""),
+        apellido=str(datos.get("apellido") or ""),
+        telefono=str(datos.get("telefono") or ""),
+        email=str(datos.get("email") or ""),
+    )
+
+# Elige el lector segun la extension del archivo.
+def leer_contactos_archivo(ruta: str) -> Iterator[Contacto]:
+    if ruta.lower().endswith(".csv"):
+        return leer_contactos_csv(ruta)
+    if ruta.lower().endswith((".jsonl", ".ndjson")):
+        return leer_contactos_jsonl(ruta)
+    raise ValueError("Formato no soportado, use .csv, .jsonl o .ndjson.")
+
+# |||| Carga masiva ||||
+
+# Valida un lote por columnas; los rechazados van a resultados y devuelve (indice, fila normalizada) de los demas.
+def validar_lote(
+    lote: List[Tuple[int, Contacto]],
+    estricto: bool,
+    resultados: List[Tuple[int, bool, str]]
+) -> List[Tuple[int, Tuple[str, str, str, str]]]:
+    # Las lineas que el lector no pudo leer se rechazan con su motivo.
+    for indice, contacto in lote:
+        if isinstance(contacto, LineaInvalida):
+            resultados.append((indice, False, str(contacto)))
+    lote = [(indice, c) for indice, c in lote if not isinstance(c, LineaInvalida)]
+    campos = [(c.nombre, c.apellido, c.telefono, c.email) for _, c in lote]
+    errores = validacion.validar_lote(campos, estricto=estricto)
+    validas = []
+    for (indice, _), valores, errores_fila in zip(lote, campos, errores):
+        if errores_fila:
+            resultados.append((indice, False, errores_fila[0][1]))
+            continue
+        validas.append((indice, validacion.normalizar(*valores, estricto=estricto)))
+    return validas
+
+# Separa las filas validas que se pueden insertar de las duplicadas, con los mismos controles y
+# mensajes que agregar_contacto. existentes es lo que ya hay en la BBDD (ver _existentes_del_lote)
+# y vistos lo aceptado antes en la misma carga, que se actualiza.
+def separar_nuevas(
+    validas: List[Tuple[int, Tuple[str, str, str, str]]],
+    existentes: Tuple[Set[Tuple], Set[str], Set[str]],
+    vistos: Tuple[Set[Tuple[str, str, str, str]], Set[str], Set[str]],
+    resultados: List[Tuple[int, bool, str]]
+) -> List[Tuple[int, Tuple[str, str, str, str]]]:
+    existentes_tupla, existentes_email, existentes_tel = existentes
+    vistos_tupla, vistos_email, vistos_tel = vistos
+    nuevas = []
+    for indice, fila in validas:
+        nombre, apellido, telefono, email = fila
+        # Mismo orden de controles que agregar_contacto.
+        if fila in existentes_tupla or fila in vistos_tupla:
+            resultados.append((indice, False, "Existe un contacto con exactamente los mismos datos."))
+        elif email and (email in existentes_email or email in vistos_email):
+            resultados.append((indice, False, "Ya existe un contacto con el mismo email."))
+        elif telefono and (telefono in existentes_tel or telefono in vistos_tel):
+            resultados.append((indice, False, "Ya existe un contacto con el mismo teléfono."))
+        else:
+            # Se acepta y se recuerda para el resto de la carga.
+            vistos_tupla.add(fila)
+            if email:
+                vistos_email.add(email)
+            if telefono:
+                vistos_tel.add(telefono)
+            nuevas.append((indice, fila))
+            resultados.append((indice, True, ""))
+    return nuevas
+
+# |||| Mantenimiento ||||
+
+# Valores de PRAGMA auto_vacuum.
+MODOS_AUTO_VACUUM = ("none", "full", "incremental")
+
+# Lo usa respaldar para cortar una copia que vuelve a empezar demasiadas veces.
+class _RespaldoReiniciado(Exception):
+    pass
+
+# Informe de una tarea de mantenimiento: {"operacion": ..., "ms": ..., datos propios de la tarea}.
+def _informe(operacion: str, inicio: float, **datos) -> dict:
+    return dict(operacion=operacion, ms=round((time.perf_counter() - inicio) * 1000, 1), **datos)
+
+# (paginas totales, paginas libres, tamaño de pagina) de una BBDD.
+def _estado_paginas(conn: sqlite3.Connection) -> Tuple[int, int, int]:
+    return tuple(
+        conn.execute(f"PRAGMA {pragma}").fetchone()[0] for pragma in ("page_count", "freelist_count", "page_size")
+    )
+
 # |||| Repositorio, CRUD y Validaciones ||||
 
 # Instanciamos la clase que habla con la BBDD.
 class GestorDeContactos:
     # Definimos la ruta de la BBDD.
-    def __init__(self, db_path: str = DB_NAME):
-        # Abre la conexión.
-        self.conn = sqlite3.connect(db_path)
+    # commit_cada_ops y commit_cada_ms activan el commit agrupado (por defecto cada cambio se confirma).
+    # perfil elige los PRAGMAs de la conexión ("safe", "fast" o "readonly").
+    # Con lectores > 0 se usa un escritor compartido entre hilos mas un pool de lectura.
+    # validacion_estricta normaliza teléfono y email y exige formatos mas estrictos (ver validacion.py).
+    # cache_capacidad > 0 guarda las busquedas por id, email y teléfono en un CacheLRU; cache_verificar_ms
+    # es cada cuanto se revisa si otro proceso cambio la BBDD. Con 0 el control es estricto: se revisa en
+    # cada busqueda (una consulta a SQLite por acierto) y nunca devuelve datos viejos.
+    # Los cambios del propio gestor invalidan el cache enseguida con cualquier valor.
+    def __init__(
+        self,
+        db_path: str = DB_NAME,
+        commit_cada_ops: Optional[int] = None,
+        commit_cada_ms: Optional[float] = None,
+        perfil: Optional[str] = None,
+        lectores: int = 0,
+        indice_en_memoria: bool = False,
+        bloom: bool = False,
+        validacion_estricta: bool = False,
+        cache_capacidad: int = 0,
+        cache_ttl_s: float = CACHE_TTL_S,
+        cache_verificar_ms: float = CACHE_VERIFICAR_MS
+    ):
+        # Bloqueo del escritor, las escrituras de distintos hilos van de a una.
+        self._bloqueo = threading.RLock()
+        self.db_path = db_path
+        self._perfil = _resolver_perfil(perfil)
+        self._pool: Optional[PoolDeLectura] = None
+        if lectores:
+            # El pool necesita WAL, si no se eligio perfil se usa el seguro.
+            self._perfil = self._perfil or "safe"
+            self.conn = conectar(db_path, self._perfil, check_same_thread=False)
+            self._pool = PoolDeLectura(db_path, lectores)
+        else:
+            # Abre la conexión. El temporizador del commit agrupado confirma desde otro hilo,
+            # el bloqueo del escritor hace que no se use a la vez.
+            self.conn = conectar(db_path, perfil, check_same_thread=False)
         # Crea el cursor para ejecutar SQL.
         self.cur = self.conn.cursor()
+        # Cuantas transacciones abiertas hay con transaccion() (se pueden anidar).
+        self._nivel_transaccion = 0
+        # Cambios hechos y todavia no confirmados en modo agrupado.
+        self._pendientes = 0
+        # Momento del primer cambio pendiente.
+        self._primer_pendiente = 0.0
+        # Temporizador que confirma lo pendiente a los commit_cada_ms aunque no lleguen mas escrituras.
+        self._temporizador: Optional[threading.Timer] = None
+        self.configurar_commit_agrupado(commit_cada_ops, commit_cada_ms)
+        # Indice opcional en memoria para contestar sin SQL cuando no hay duplicado.
+        self._indice: Optional[IndiceDuplicados] = None
+        if indice_en_memoria or bloom:
+            self._indice = IndiceDuplicados(usar_bloom=bloom)
+            self._indice.cargar(self.conn)
+        # Modo de validación.
+        self._estricto = validacion_estricta
+        # Cache opcional de busquedas.
+        self._cache: Optional[CacheLRU] = CacheLRU(cache_capacidad, cache_ttl_s) if cache_capacidad else None
+        self._cache_verificar_s = cache_verificar_ms / 1000
+        self._cache_verificado = 0.0
+        # Ultimo PRAGMA data_version visto y version del registro de cambios hasta la que el cache esta al dia.
+        self._data_version: Optional[int] = None
+        self._version_cache = 0
+        # Contactos escritos y sin confirmar; con pool se invalidan de nuevo al confirmar.
+        self._sin_confirmar: List[Tuple[Optional[int], Optional[Tuple]]] = []
 
-    # Valida el limite de caracteres de los campos.
-    @staticmethod
-    def _validar_longitudes(nombre: str, apellido: str, telefono: str, email: str):
-        # Si el nombre supera 50 caracteres, error.
-        if len(nombre) > 50:
-            raise ValueError("El nombre supera el máximo de 50 caracteres.")
-        # Si el apellido supera 50 caracteres, error.
-        if len(apellido) > 50:
-            raise ValueError("El apellido supera el máximo de 50 caracteres.")
-        # Si el teléfono supera 15 caracteres, error.
-        if len(telefono) > 15:
-            raise ValueError("El teléfono supera el máximo de 15 caracteres.")
-        # Si el email supera 100 caracteres, error.
-        if len(email) > 100:
-            raise ValueError("El email supera el máximo de 100 caracteres.")
-
-    # Valida campos obligatorios y formats.
-    @staticmethod
-    def _validar_campos_obligatorios_y_formato(nombre: str, telefono: str, email: str):
-        # Verifica que el nombre no este vacio.
-        if not nombre.strip():
-            raise ValueError("El nombre es obligatorio.")
-        # Campo teléfono solo usa numeros.
-        if telefono and not telefono.isdigit():
-            raise ValueError("El teléfono debe contener solo números.")
-        # Campo mail debe tener el @.
-        if email and "@" not in email:
-            raise ValueError("El email debe contener '@'.")
+    # |||| Transacciones y commit agrupado ||||
+
+    # Confirma cada N operaciones o cuando el primer cambio pendiente tiene T milisegundos
+    # (un temporizador confirma a los T milisegundos aunque no haya otra escritura).
+    # Con los dos en None vuelve a confirmar cada cambio apenas se hace.
+    @_sincronizado
+    def configurar_commit_agrupado(self, cada_ops: Optional[int] = None, cada_ms: Optional[float] = None):
+        if cada_ops is not None and cada_ops < 1:
+            raise ValueError("commit_cada_ops debe ser mayor a 0.")
+        if cada_ms is not None and cada_ms < 0:
+            raise ValueError("commit_cada_ms no puede ser negativo.")
+        self._commit_cada_ops = cada_ops
+        self._commit_cada_ms = cada_ms
+        # Al cambiar de modo no deja nada colgado.
+        self.confirmar_pendientes()
+
+    # Se llama despues de cada escritura, decide si hay que hacer commit ahora.
+    def _confirmar(self):
+        # Dentro de transaccion() el commit lo hace el with al salir.
+        if self._nivel_transaccion:
+            return
+        # Modo por defecto: commit inmediato.
+        if self._commit_cada_ops is None and self._commit_cada_ms is None:
+            self._commit()
+            return
+        self._pendientes += 1
+        if self._pendientes == 1:
+            self._primer_pendiente = time.monotonic()
+            if self._commit_cada_ms is not None:
+                self._armar_temporizador()
+        por_cantidad = self._commit_cada_ops is not None and self._pendientes >= self._commit_cada_ops
+        por_tiempo = (
+            self._commit_cada_ms is not None
+            and (time.monotonic() - self._primer_pendiente) * 1000 >= self._commit_cada_ms
+        )
+        if por_cantidad or por_tiempo:
+            self.confirmar_pendientes()
+
+    # Programa la confirmacion de lo pendiente para dentro de commit_cada_ms.
+    def _armar_temporizador(self):
+        self._cancelar_temporizador()
+        self._temporizador = threading.Timer(self._commit_cada_ms / 1000, self._confirmar_por_tiempo)
+        # No frena la salida del programa; cerrar_conexion confirma lo que quede.
+        self._temporizador.daemon = True
+        self._temporizador.start()
+
+    def _cancelar_temporizador(self):
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+
+    # Corre en el hilo del temporizador.
+    def _confirmar_por_tiempo(self):
+        with self._bloqueo:
+            # Si mientras esperaba el bloqueo ya se confirmo (o se armo otro), no hace nada.
+            if self._temporizador is not threading.current_thread():
+                return
+            self._temporizador = None
+            try:
+                self.confirmar_pendientes()
+            except sqlite3.Error:
+                # Por ejemplo la BBDD ocupada por otro proceso: se reintenta en el proximo intervalo.
+                if self._pendientes and self._commit_cada_ms is not None:
+                    self._armar_temporizador()
+
+    # Confirma los cambios pendientes del commit agrupado.
+    @_sincronizado
+    def confirmar_pendientes(self):
+        if self._nivel_transaccion:
+            return
+        if self.conn.in_transaction:
+            self._commit()
+        self._pendientes = 0
+
+    # Agrupa varias operaciones en una sola transacción:
+    #     with gestor.transaccion():
+    #         gestor.agregar_contacto(...)
+    # Si algo falla se deshace todo, si no se confirma una sola vez al salir.
+    # En modo con varios hilos, los demas escritores esperan a que termine el with.
+    @contextmanager
+    def transaccion(self):
+        with self._bloqueo:
+            self._nivel_transaccion += 1
+            try:
+                yield self
+            except BaseException:
+                self._nivel_transaccion -= 1
+                # Solo la transaccion de afuera deshace los cambios.
+                if not self._nivel_transaccion:
+                    self.conn.rollback()
+                    self._pendientes = 0
+                    self._despues_de_rollback()
+                raise
+            self._nivel_transaccion -= 1
+            if not self._nivel_transaccion:
+                self._commit()
+                self._pendientes = 0
+
+    def _commit(self):
+        self.conn.commit()
+        # Ya no queda nada pendiente que confirmar por tiempo.
+        self._cancelar_temporizador()
+        # Los lectores del pool recien ahora ven lo escrito: lo que guardaron antes puede ser viejo.
+        if self._sin_confirmar:
+            for contacto_id, fila in self._sin_confirmar:
+                self._invalidar_en_cache(contacto_id, fila)
+            self._sin_confirmar = []
+
+    # Lo que se guarda en memoria deja de coincidir con la BBDD despues de un rollback.
+    def _despues_de_rollback(self):
+        self._cancelar_temporizador()
+        if self._indice is not None:
+            self._indice.cargar(self.conn)
+        if self._cache is not None:
+            self._cache.limpiar()
+            self._sin_confirmar = []
+
+    # Vuelve a leer el indice en memoria, por ejemplo si otro proceso escribio en la BBDD.
+    @_sincronizado
+    def recargar_indice(self):
+        if self._indice is not None:
+            self._indice.cargar(self.conn)
+
+    # Lee (nombre, apellido, telefono, email) de un contacto desde la conexión del escritor.
+    def _fila_por_id(self, contacto_id: int) -> Optional[Tuple]:
+        return self.cur.execute(
+            "SELECT nombre, apellido, telefono, email FROM contactos WHERE id = ?", (contacto_id,)
+        ).fetchone()
+
+    # Da un cursor para leer: del pool si hay, si no el de la conexión principal.
+    # Con propio=True crea un cursor aparte para no pisar el compartido.
+    # Con como_contactos=True el cursor devuelve objetos Contacto en lugar de tuplas.
+    @contextmanager
+    def _lectura(self, propio: bool = False, como_contactos: bool = False) -> Iterator[sqlite3.Cursor]:
+        if self._pool is None:
+            if not propio and not como_contactos:
+                yield self.cur
+                return
+            cur = self.conn.cursor()
+        else:
+            with self._pool.conexion() as conn:
+                cur = conn.cursor()
+                if como_contactos:
+                    cur.row_factory = fila_a_contacto
+                try:
+                    yield cur
+                finally:
+                    cur.close()
+            return
+        if como_contactos:
+            cur.row_factory = fila_a_contacto
+        try:
+            yield cur
+        finally:
+            cur.close()
+
+    # Valida el contacto con las reglas de validacion.py y devuelve la fila como se guarda.
+    # Lanza ValueError con el primer error encontrado.
+    def _validar(self, contacto: Contacto) -> Tuple[str, str, str, str]:
+        campos = (contacto.nombre, contacto.apellido, contacto.telefono, contacto.email)
+        validacion.exigir_valido(*campos, estricto=self._estricto)
+        return validacion.normalizar(*campos, estricto=self._estricto)
 
     # Valida que no se dupliquen los datos.
     def _existe_duplicado(
@@ -107,15 +1101,21 @@ class GestorDeContactos:
         apellido: str,
         telefono: str,
         email: str,
-        excluir_id: Optional[int] = None
+        excluir_id: Optional[int] = None,
+        fila_excluida: Optional[Tuple] = None
     ) -> Tuple[bool, str]:
+        # Con el indice en memoria el caso comun (no es duplicado) no consulta SQLite.
+        # fila_excluida son los datos actuales de excluir_id, si ya se leyeron.
+        if self._indice is not None:
+            if excluir_id is not None and fila_excluida is None:
+                fila_excluida = self._fila_por_id(excluir_id)
+            if not self._indice.puede_haber_duplicado(nombre, apellido, telefono, email, fila_excluida):
+                return False, ""
+
         # Estos son los parametros a consultar.
         params = [nombre, apellido, telefono, email]
         # Con SQL buscamos si hay coincidencias.
-        sql = (
-            "SELECT id FROM contactos "
-            "WHERE nombre = ? AND apellido = ? AND telefono = ? AND email = ?"
-        )
+        sql = SQL_DUP_EXACTO
         # Esto es para que cuando actualicemos no tenga en cuenta el ID ya que se mantiene.
         if excluir_id is not None:
             sql += " AND id <> ?"
@@ -129,7 +1129,7 @@ class GestorDeContactos:
         # Verifica que el mail no este duplicado.
         if email.strip():
             params_email = [email]
-            sql_email = "SELECT id FROM contactos WHERE email = ?"
+            sql_email = SQL_DUP_EMAIL
             if excluir_id is not None:
                 sql_email += " AND id <> ?"
                 params_email.append(excluir_id)
@@ -140,7 +1140,7 @@ class GestorDeContactos:
         # Verifica que el telefono no este duplicado.
         if telefono.strip():
             params_tel = [telefono]
-            sql_tel = "SELECT id FROM contactos WHERE telefono = ?"
+            sql_tel = SQL_DUP_TELEFONO
             if excluir_id is not None:
                 sql_tel += " AND id <> ?"
                 params_tel.append(excluir_id)
@@ -150,83 +1150,817 @@ class GestorDeContactos:
         return False, ""
 
     # Agrega un contaco y nos devuelve un ID.
+    @_sincronizado
     def agregar_contacto(self, contacto: Contacto) -> int:
-        # Valida longitudes.
-        self._validar_longitudes(contacto.nombre, contacto.apellido, contacto.telefono, contacto.email)
-        # Valida campos.
-        self._validar_campos_obligatorios_y_formato(contacto.nombre, contacto.telefono, contacto.email)
+        # Valida longitudes, campos obligatorios y formatos.
+        fila = self._validar(contacto)
 
         # Verifica que no sea duplicado.
-        dup, motivo = self._existe_duplicado(contacto.nombre, contacto.apellido, contacto.telefono, contacto.email)
+        dup, motivo = self._existe_duplicado(*fila)
         if dup:
             raise ValueError(motivo)
-        self.cur.execute(
-            "INSERT INTO contactos(nombre, apellido, telefono, email) VALUES(?, ?, ?, ?)",
-            (contacto.nombre.strip(), contacto.apellido.strip(), contacto.telefono.strip(), contacto.email.strip())
-        )
-        self.conn.commit()
+        self.cur.execute(SQL_INSERTAR, fila + duplicados.claves(*fila))
+        nuevo_id = self.cur.lastrowid
+        if self._indice is not None:
+            self._indice.agregar(fila)
+        self._invalidar_cache(nuevo_id, fila)
+        self._confirmar()
         # Devuelve el ID.
-        return self.cur.lastrowid
+        return nuevo_id
+
+    # Agrega muchos contactos en una sola transacción.
+    # Devuelve por cada fila (indice, aceptado, motivo del rechazo).
+    @_sincronizado
+    def agregar_contactos(
+        self,
+        contactos: Iterable[Contacto],
+        tamano_lote: int = TAMANO_LOTE
+    ) -> List[Tuple[int, bool, str]]:
+        resultados: List[Tuple[int, bool, str]] = []
+        # Claves ya aceptadas en esta carga, para detectar duplicados dentro del archivo.
+        vistos = (set(), set(), set())
+        lote: List[Tuple[int, Contacto]] = []
+        # Confirma antes lo pendiente, asi un error en la carga no lo deshace.
+        self.confirmar_pendientes()
+        try:
+            for indice, contacto in enumerate(contactos):
+                lote.append((indice, contacto))
+                # Cuando se llena el lote lo procesa.
+                if len(lote) >= tamano_lote:
+                    self._insertar_lote(lote, vistos, resultados)
+                    lote = []
+            # Procesa lo que quedo.
+            if lote:
+                self._insertar_lote(lote, vistos, resultados)
+            # Un solo commit para toda la carga (o al salir de transaccion()).
+            self._confirmar()
+            # Deja los resultados en el mismo orden que la entrada.
+            resultados.sort()
+        except Exception:
+            # Si algo falla no queda una carga a medias (dentro de transaccion() lo deshace el with).
+            if not self._nivel_transaccion:
+                self.conn.rollback()
+                self._despues_de_rollback()
+            raise
+        return resultados
+
+    # Carga un archivo CSV o JSON Lines usando la carga masiva.
+    def importar_archivo(self, ruta: str, tamano_lote: int = TAMANO_LOTE) -> List[Tuple[int, bool, str]]:
+        return self.agregar_contactos(leer_contactos_archivo(ruta), tamano_lote)
+
+    # Valida un lote, busca duplicados en una sola pasada e inserta con executemany.
+    def _insertar_lote(
+        self,
+        lote: List[Tuple[int, Contacto]],
+        vistos: Tuple[Set[Tuple[str, str, str, str]], Set[str], Set[str]],
+        resultados: List[Tuple[int, bool, str]]
+    ):
+        validas = validar_lote(lote, self._estricto, resultados)
+        nuevas = separar_nuevas(validas, self._existentes_del_lote([fila for _, fila in validas]), vistos, resultados)
+        self._insertar_filas([fila for _, fila in nuevas])
+
+    # Inserta juntas filas ya validadas y sin duplicados.
+    # Con ids cada fila se guarda con el ID indicado en lugar del que asigna SQLite.
+    def _insertar_filas(self, filas: List[Tuple[str, str, str, str]], ids: Optional[List[int]] = None):
+        if not filas:
+            return
+        if ids is None:
+            self.cur.executemany(SQL_INSERTAR, [fila + duplicados.claves(*fila) for fila in filas])
+        else:
+            self.cur.executemany(
+                SQL_INSERTAR_CON_ID,
+                [(contacto_id,) + fila + duplicados.claves(*fila) for contacto_id, fila in zip(ids, filas)]
+            )
+        # Los IDs nuevos no se conocen uno por uno, se sacan todas las entradas de "no existe".
+        self._invalidar_cache(None)
+        if self._indice is not None:
+            for fila in filas:
+                self._indice.agregar(fila)
+
+    # Como agregar_contactos pero con filas que ya se validaron y controlaron afuera
+    # (lo usa GestorFragmentado, que controla los duplicados contra todos los fragmentos y elige los IDs).
+    @_sincronizado
+    def _agregar_filas(self, filas: List[Tuple[str, str, str, str]], ids: Optional[List[int]] = None):
+        self.confirmar_pendientes()
+        try:
+            self._insertar_filas(filas, ids)
+            self._confirmar()
+        except Exception:
+            if not self._nivel_transaccion:
+                self.conn.rollback()
+                self._despues_de_rollback()
+            raise
+
+    # Busca en la tabla todas las coincidencias de un lote de filas de una vez.
+    # Devuelve (filas iguales, emails, telefonos) que ya existen.
+    def _existentes_del_lote(self, filas: List[Tuple[str, str, str, str]]) -> Tuple[Set[Tuple], Set[str], Set[str]]:
+        # Las filas del lote se cruzan con la tabla por la clave completa usando idx_contacto_unico,
+        # asi cada lote lee solo sus coincidencias (CROSS JOIN fija el orden: primero el lote).
+        existentes_tupla = self._buscar_existentes(
+            "WITH lote(nombre, apellido, telefono, email) AS (VALUES {}) "
+            "SELECT c.nombre, c.apellido, c.telefono, c.email FROM lote CROSS JOIN contactos c "
+            "ON c.nombre = lote.nombre AND c.apellido = lote.apellido "
+            "AND c.telefono = lote.telefono AND c.email = lote.email",
+            set(filas), ancho=4
+        )
+        existentes_email = {r[0] for r in self._buscar_existentes(
+            "SELECT email FROM contactos WHERE email IN ({})",
+            {fila[3] for fila in filas if fila[3]}
+        )}
+        existentes_tel = {r[0] for r in self._buscar_existentes(
+            "SELECT telefono FROM contactos WHERE telefono IN ({})",
+            {fila[2] for fila in filas if fila[2]}
+        )}
+        return existentes_tupla, existentes_email, existentes_tel
+
+    # Ejecuta una consulta con IN (...) y devuelve las filas como un set.
+    # Con ancho > 1 cada valor es una tupla y la consulta recibe filas "(?, ?, ...)" para un VALUES.
+    def _buscar_existentes(self, sql: str, valores: Set, ancho: int = 1) -> Set[Tuple]:
+        encontrados: Set[Tuple] = set()
+        valores = list(valores)
+        marca = "?" if ancho == 1 else f"({', '.join('?' * ancho)})"
+        # Parte la lista para no pasar el limite de parametros de SQLite.
+        por_consulta = 900 // ancho
+        for i in range(0, len(valores), por_consulta):
+            parte = valores[i:i + por_consulta]
+            parametros = parte if ancho == 1 else [v for fila in parte for v in fila]
+            marcas = ", ".join([marca] * len(parte))
+            encontrados.update(self.cur.execute(sql.format(marcas), parametros).fetchall())
+        return encontrados
 
     # Obtiene todos los contactos, ordenados por ID del mas nuevo al mas viejo.
-    def obtener_todos_los_contactos(self) -> List[Tuple]:
-        return self.cur.execute(
-            "SELECT id, nombre, apellido, telefono, email FROM contactos ORDER BY id DESC"
-        ).fetchall()
+    def obtener_todos_los_contactos(self, como_contactos: bool = False) -> List[Tuple]:
+        with self._lectura(como_contactos=como_contactos) as cur:
+            return cur.execute(
+                "SELECT id, nombre, apellido, telefono, email FROM contactos ORDER BY id DESC"
+            ).fetchall()
+
+    # Devuelve una pagina de contactos con ID menor a antes_de_id (None empieza por el mas nuevo).
+    # Para pedir la siguiente pagina se pasa el ID de la ultima fila recibida.
+    # Con despues_de_id devuelve la pagina anterior: los contactos inmediatamente mas nuevos que ese ID,
+    # tambien del mas nuevo al mas viejo (la grilla la usa para subir sin OFFSET).
+    def obtener_pagina(
+        self,
+        antes_de_id: Optional[int] = None,
+        limite: int = 100,
+        como_contactos: bool = False,
+        despues_de_id: Optional[int] = None
+    ) -> List[Tuple]:
+        with self._lectura(como_contactos=como_contactos) as cur:
+            if despues_de_id is not None:
+                filas = cur.execute(
+                    "SELECT id, nombre, apellido, telefono, email FROM contactos "
+                    "WHERE id > ? ORDER BY id LIMIT ?",
+                    (despues_de_id, limite)
+                ).fetchall()
+                filas.reverse()
+                return filas
+            if antes_de_id is None:
+                return cur.execute(
+                    "SELECT id, nombre, apellido, telefono, email FROM contactos ORDER BY id DESC LIMIT ?",
+                    (limite,)
+                ).fetchall()
+            return cur.execute(
+                "SELECT id, nombre, apellido, telefono, email FROM contactos "
+                "WHERE id < ? ORDER BY id DESC LIMIT ?",
+                (antes_de_id, limite)
+            ).fetchall()
+
+    # Busca contactos por nombre, apellido, teléfono o email, los mas relevantes primero.
+    def buscar(self, texto: str, limite: int = 100, como_contactos: bool = False) -> List[Tuple]:
+        consulta = armar_consulta_fts(texto)
+        # Sin palabras no hay nada que buscar.
+        if not consulta:
+            return []
+        with self._lectura(como_contactos=como_contactos) as cur:
+            return cur.execute(
+                "SELECT c.id, c.nombre, c.apellido, c.telefono, c.email "
+                "FROM contactos_fts JOIN contactos c ON c.id = contactos_fts.rowid "
+                "WHERE contactos_fts MATCH ? ORDER BY rank LIMIT ?",
+                (consulta, limite)
+            ).fetchall()
+
+    # Igual que buscar pero sin limite, devolviendo las filas de a bloques.
+    def iterar_busqueda(self, texto: str, tamano_bloque: int = TAMANO_LOTE) -> Iterator[Tuple]:
+        consulta = armar_consulta_fts(texto)
+        if not consulta:
+            return
+        with self._lectura(propio=True) as cur:
+            cur.execute(
+                "SELECT c.id, c.nombre, c.apellido, c.telefono, c.email "
+                "FROM contactos_fts JOIN contactos c ON c.id = contactos_fts.rowid "
+                "WHERE contactos_fts MATCH ? ORDER BY c.id DESC",
+                (consulta,)
+            )
+            while True:
+                bloque = cur.fetchmany(tamano_bloque)
+                if not bloque:
+                    break
+                yield from bloque
+
+    # Exporta los contactos a un archivo (ver exportar.exportar para las opciones).
+    def exportar(self, destino: str, **opciones) -> int:
+        # Se importa aca para no cargarlo si nunca se exporta.
+        from exportar import exportar
+        return exportar(self, destino, **opciones)
+
+    # Devuelve la fila (id, nombre, apellido, telefono, email) de un contacto o None si no existe.
+    def obtener_por_id(self, contacto_id: int, como_contactos: bool = False) -> Optional[Tuple]:
+        return self._buscar_uno(
+            ("id", contacto_id),
+            "SELECT id, nombre, apellido, telefono, email FROM contactos WHERE id = ?",
+            como_contactos
+        )
+
+    # Igual que obtener_por_id pero por email exacto (sin espacios alrededor).
+    def obtener_por_email(self, email: str, como_contactos: bool = False) -> Optional[Tuple]:
+        email = email.strip()
+        if not email:
+            return None
+        return self._buscar_uno(
+            ("email", email),
+            "SELECT id, nombre, apellido, telefono, email FROM contactos WHERE email = ? ORDER BY id LIMIT 1",
+            como_contactos
+        )
+
+    # Igual que obtener_por_id pero por teléfono exacto (sin espacios alrededor).
+    def obtener_por_telefono(self, telefono: str, como_contactos: bool = False) -> Optional[Tuple]:
+        telefono = telefono.strip()
+        if not telefono:
+            return None
+        return self._buscar_uno(
+            ("telefono", telefono),
+            "SELECT id, nombre, apellido, telefono, email FROM contactos WHERE telefono = ? ORDER BY id LIMIT 1",
+            como_contactos
+        )
+
+    # Busca una fila pasando por el cache si esta activo. clave es (tipo, valor) y valor el parametro del SQL.
+    def _buscar_uno(self, clave: Tuple, sql: str, como_contactos: bool) -> Optional[Tuple]:
+        if self._cache is None:
+            with self._lectura() as cur:
+                fila = cur.execute(sql, (clave[1],)).fetchone()
+        else:
+            self._verificar_cache()
+            fila = self._cache.obtener(clave)
+            if fila is _FALTA:
+                # Si algo se invalida mientras se lee, la lectura no se guarda.
+                generacion = self._cache.generacion
+                with self._lectura() as cur:
+                    fila = cur.execute(sql, (clave[1],)).fetchone()
+                self._cache.guardar(clave, fila, generacion)
+        if como_contactos and fila is not None:
+            return fila_a_contacto(None, fila)
+        return fila
+
+    # |||| Cache de busquedas ||||
+
+    # Invalida lo que el cache sabe de un contacto recien escrito (None = carga masiva).
+    def _invalidar_cache(self, contacto_id: Optional[int], fila: Optional[Tuple] = None):
+        if self._cache is None:
+            return
+        self._invalidar_en_cache(contacto_id, fila)
+        # Con pool los lectores no ven lo que no se confirmo, se vuelve a invalidar al confirmar.
+        if self._pool is not None and self.conn.in_transaction:
+            self._sin_confirmar.append((contacto_id, fila))
+
+    def _invalidar_en_cache(self, contacto_id: Optional[int], fila: Optional[Tuple]):
+        if contacto_id is None:
+            self._cache.quitar_ausentes()
+        else:
+            self._cache.invalidar_contacto(contacto_id, fila)
+
+    # Si otro proceso confirmo cambios (PRAGMA data_version cambia), invalida solo los contactos
+    # que toco segun el registro de cambios; si son demasiados vacia el cache.
+    def _verificar_cache(self):
+        ahora = time.monotonic()
+        if self._cache_verificar_s and ahora - self._cache_verificado < self._cache_verificar_s:
+            return
+        with self._bloqueo:
+            self._cache_verificado = ahora
+            data_version = self.cur.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return
+            if self._data_version is None:
+                # Primera vez: el cache esta vacio, solo se toma la version de partida.
+                self._data_version = data_version
+                self._version_cache = self.version_cambios()
+                return
+            self._data_version = data_version
+            cambios, version = self.cambios_desde(self._version_cache, con_filas=True)
+            if cambios is None or len(cambios) >= LIMITE_CAMBIOS:
+                self._cache.limpiar()
+            else:
+                for _numero, _op, contacto_id, _momento, fila in cambios:
+                    self._cache.invalidar_contacto(contacto_id, fila[1:] if fila is not None else None)
+            self._version_cache = version
+
+    # Estadisticas del cache (aciertos, fallos, tasa de aciertos...) o None si no esta activo.
+    def estadisticas_cache(self) -> Optional[dict]:
+        return self._cache.estadisticas() if self._cache is not None else None
+
+    # Vacia el cache, por ejemplo despues de tocar la BBDD a mano.
+    def limpiar_cache(self):
+        if self._cache is not None:
+            self._cache.limpiar()
+
+    # Cuenta cuantos contactos hay en la tabla.
+    def contar_contactos(self) -> int:
+        with self._lectura() as cur:
+            return cur.execute("SELECT COUNT(*) FROM contactos").fetchone()[0]
+
+    # |||| Registro de cambios ||||
+
+    # Version del ultimo cambio registrado (0 si todavia no hubo cambios).
+    def version_cambios(self) -> int:
+        with self._lectura() as cur:
+            return cur.execute(SQL_VERSION_CAMBIOS).fetchone()[0]
+
+    # Cantidad de contactos y version de cambios leidas juntas en una sola consulta,
+    # asi los cambios que se pidan despues no se cuentan dos veces.
+    def contar_contactos_y_version(self) -> Tuple[int, int]:
+        with self._lectura() as cur:
+            return cur.execute(f"SELECT (SELECT COUNT(*) FROM contactos), ({SQL_VERSION_CAMBIOS})").fetchone()
+
+    # Cambios posteriores a `version` como (version, op, id, momento), op es "I", "U" o "D".
+    # Con con_filas=True cada cambio trae ademas la fila actual del contacto (None si ya no existe).
+    # Devuelve (cambios, nueva_version); si hay mas de `limite` cambios se pide de nuevo desde nueva_version.
+    # Si los cambios pedidos ya se depuraron devuelve (None, version actual) y hay que releer todo.
+    def cambios_desde(
+        self,
+        version: int,
+        limite: int = LIMITE_CAMBIOS,
+        con_filas: bool = False
+    ) -> Tuple[Optional[List[Tuple]], int]:
+        with self._lectura() as cur:
+            primera, ultima = cur.execute(
+                f"SELECT (SELECT MIN(version) FROM contactos_cambios), ({SQL_VERSION_CAMBIOS})"
+            ).fetchone()
+            if version < ultima and (primera is None or version < primera - 1):
+                return None, ultima
+            if con_filas:
+                filas = cur.execute(
+                    "SELECT k.version, k.op, k.contacto_id, k.momento, "
+                    "c.id, c.nombre, c.apellido, c.telefono, c.email "
+                    "FROM contactos_cambios k LEFT JOIN contactos c ON c.id = k.contacto_id "
+                    "WHERE k.version > ? ORDER BY k.version LIMIT ?",
+                    (version, limite)
+                ).fetchall()
+                cambios = [f[:4] + ((f[4:] if f[4] is not None else None),) for f in filas]
+            else:
+                cambios = cur.execute(
+                    "SELECT version, op, contacto_id, momento FROM contactos_cambios "
+                    "WHERE version > ? ORDER BY version LIMIT ?",
+                    (version, limite)
+                ).fetchall()
+        return cambios, (cambios[-1][0] if cambios else version)
+
+    # Borra del registro los cambios viejos y deja los ultimos `conservar`. Devuelve cuantos borro.
+    @_sincronizado
+    def depurar_cambios(self, conservar: int = CAMBIOS_A_CONSERVAR) -> int:
+        self.cur.execute(
+            f"DELETE FROM contactos_cambios WHERE version <= ({SQL_VERSION_CAMBIOS}) - ?", (conservar,)
+        )
+        borrados = self.cur.rowcount
+        self._confirmar()
+        return borrados
+
+    # Devuelve las filas desde la posicion indicada (0 es el mas nuevo). Con OFFSET SQLite recorre todas
+    # las filas anteriores, por eso la grilla virtual lo usa solo para saltos y al bajar o subir pide
+    # obtener_pagina desde la fila del borde.
+    def obtener_rango(self, desde: int, limite: int, como_contactos: bool = False) -> List[Tuple]:
+        with self._lectura(como_contactos=como_contactos) as cur:
+            return cur.execute(
+                "SELECT id, nombre, apellido, telefono, email FROM contactos "
+                "ORDER BY id DESC LIMIT ? OFFSET ?",
+                (limite, desde)
+            ).fetchall()
+
+    # Devuelve los contactos por columnas: {"id": array de enteros, "nombre": [...], ...}.
+    # Pensado para analisis, evita crear un objeto o una tupla por fila.
+    def obtener_columnas(
+        self,
+        columnas: Tuple[str, ...] = COLUMNAS,
+        tamano_bloque: int = TAMANO_LOTE
+    ) -> dict:
+        invalidas = [c for c in columnas if c not in COLUMNAS]
+        if invalidas:
+            raise ValueError(f"Columnas desconocidas: {', '.join(invalidas)}.")
+        # El id se guarda en un array compacto, el resto en listas.
+        resultado = {c: (array("q") if c == "id" else []) for c in columnas}
+        destinos = [resultado[c] for c in columnas]
+        with self._lectura(propio=True) as cur:
+            cur.execute(f"SELECT {', '.join(columnas)} FROM contactos ORDER BY id DESC")
+            while True:
+                bloque = cur.fetchmany(tamano_bloque)
+                if not bloque:
+                    break
+                # zip(*bloque) transpone el bloque de filas a columnas.
+                for destino, valores in zip(destinos, zip(*bloque)):
+                    destino.extend(valores)
+        return resultado
+
+    # Recorre todos los contactos de a bloques sin cargar la tabla entera en memoria.
+    # En modo con pool la conexión de lectura queda tomada hasta terminar de recorrer.
+    def iterar_contactos(self, tamano_bloque: int = TAMANO_LOTE, como_contactos: bool = False) -> Iterator[Tuple]:
+        # Usa un cursor propio para no pisar el compartido mientras se recorre.
+        with self._lectura(propio=True, como_contactos=como_contactos) as cur:
+            cur.execute("SELECT id, nombre, apellido, telefono, email FROM contactos ORDER BY id DESC")
+            while True:
+                bloque = cur.fetchmany(tamano_bloque)
+                if not bloque:
+                    break
+                yield from bloque
 
     # Elimina un contacto por ID.
+    @_sincronizado
     def eliminar_contacto(self, contacto_id: int) -> bool:
+        # Con el indice en memoria hace falta saber que datos se van.
+        anterior = self._fila_por_id(contacto_id) if self._indice is not None else None
         # Ejecuta DELETE para el id seleccionado.
         self.cur.execute("DELETE FROM contactos WHERE id = ?", (contacto_id,))
+        borrados = self.cur.rowcount
+        if borrados and anterior is not None:
+            self._indice.quitar(anterior)
+        if borrados:
+            self._invalidar_cache(contacto_id)
         # Confirma el cambio.
-        self.conn.commit()
+        self._confirmar()
         # Valida con rowcount que se elimino.
-        return self.cur.rowcount > 0
+        return borrados > 0
 
     # Actualiza un contacto por ID.
+    @_sincronizado
     def actualizar_contacto(self, contacto_id: int, contacto: Contacto) -> bool:
-        # Valida longitudes.
-        self._validar_longitudes(contacto.nombre, contacto.apellido, contacto.telefono, contacto.email)
-        # Valida campos.
-        self._validar_campos_obligatorios_y_formato(contacto.nombre, contacto.telefono, contacto.email)
+        # Valida longitudes, campos obligatorios y formatos.
+        fila = self._validar(contacto)
+
+        # Con el indice en memoria hace falta saber los datos que se reemplazan.
+        anterior = self._fila_por_id(contacto_id) if self._indice is not None else None
 
         # Verifica que no sea duplicado sin contar el ID.
-        dup, motivo = self._existe_duplicado(
-            contacto.nombre, contacto.apellido, contacto.telefono, contacto.email,
-            excluir_id=contacto_id
-        )
+        dup, motivo = self._existe_duplicado(*fila, excluir_id=contacto_id, fila_excluida=anterior)
         if dup:
             raise ValueError(motivo)
 
         # Ejecuta el UPDATE.
-        self.cur.execute(
-            "UPDATE contactos SET nombre = ?, apellido = ?, telefono = ?, email = ? WHERE id = ?",
-            (contacto.nombre.strip(), contacto.apellido.strip(), contacto.telefono.strip(), contacto.email.strip(), contacto_id)
-        )
-        self.conn.commit()
+        self.cur.execute(SQL_ACTUALIZAR, fila + duplicados.claves(*fila) + (contacto_id,))
+        actualizados = self.cur.rowcount
+        if actualizados and anterior is not None:
+            self._indice.quitar(anterior)
+            self._indice.agregar(fila)
+        if actualizados:
+            self._invalidar_cache(contacto_id, fila)
+        self._confirmar()
         # Valida con rowcount que se actualizo.
-        return self.cur.rowcount > 0
+        return actualizados > 0
+
+    # |||| Duplicados probables ||||
+
+    # Busca pares de contactos que probablemente sean la misma persona.
+    # Solo compara los que comparten teléfono, email o codigo fonetico del nombre (ver duplicados.py),
+    # recorriendo cada clave en orden por su indice.
+    # Devuelve (id_a, id_b, puntaje, clave que los junto) del mas parecido al menos.
+    def buscar_duplicados_probables(
+        self,
+        umbral: float = duplicados.UMBRAL_SIMILITUD,
+        max_bloque: int = duplicados.MAX_BLOQUE
+    ) -> List[Tuple[int, int, float, str]]:
+        def bloques():
+            for columna in COLUMNAS_BLOQUE:
+                with self._lectura(propio=True) as cur:
+                    cur.execute(SQL_FILAS_DE_CLAVE.format(columna=columna))
+                    yield from duplicados.agrupar_bloques(columna, cur)
+        return duplicados.pares_probables(bloques(), umbral, max_bloque)
+
+    # Contactos parecidos a uno dado (por ejemplo antes de agregarlo), como [(fila, puntaje), ...].
+    def buscar_similares(
+        self,
+        contacto: Contacto,
+        umbral: float = duplicados.UMBRAL_SIMILITUD,
+        limite: int = 20
+    ) -> List[Tuple[Tuple, float]]:
+        propias = duplicados.claves(contacto.nombre, contacto.apellido, contacto.telefono, contacto.email)
+        # Cualquier clave en comun alcanza para ser candidato.
+        condiciones, params = [], []
+        for columna, valor in zip(duplicados.COLUMNAS_CLAVE, propias):
+            if valor:
+                condiciones.append(f"{columna} = ?")
+                params.append(valor)
+        if not condiciones:
+            return []
+        with self._lectura() as cur:
+            filas = cur.execute(
+                f"SELECT id, nombre, apellido, telefono, email, {', '.join(duplicados.COLUMNAS_CLAVE)} "
+                f"FROM contactos WHERE {' OR '.join(condiciones)} LIMIT ?",
+                params + [duplicados.MAX_BLOQUE]
+            ).fetchall()
+        similares = []
+        for fila in filas:
+            if fila[0] == contacto.id:
+                continue
+            puntaje = duplicados.similitud(propias, fila[5:])
+            if puntaje >= umbral:
+                similares.append((fila[:5], round(puntaje, 4)))
+        similares.sort(key=lambda s: -s[1])
+        return similares[:limite]
+
+    # Fusiona dos contactos: conserva id_conservar, completa sus campos vacios con los de id_eliminar
+    # y borra id_eliminar. Devuelve la fila resultante o None si alguno no existe.
+    @_sincronizado
+    def fusionar_contactos(self, id_conservar: int, id_eliminar: int) -> Optional[Tuple]:
+        if id_conservar == id_eliminar:
+            raise ValueError("No se puede fusionar un contacto consigo mismo.")
+        conservar = self._fila_por_id(id_conservar)
+        eliminar = self._fila_por_id(id_eliminar)
+        if conservar is None or eliminar is None:
+            return None
+        fila = duplicados.combinar(conservar, eliminar)
+        # Todo o nada: si el resultado choca con otro contacto no se borra nada.
+        with self.transaccion():
+            # Primero se borra, asi el email o teléfono que se hereda queda libre.
+            self.cur.execute("DELETE FROM contactos WHERE id = ?", (id_eliminar,))
+            if self._indice is not None:
+                self._indice.quitar(eliminar)
+            dup, motivo = self._existe_duplicado(*fila, excluir_id=id_conservar, fila_excluida=conservar)
+            if dup:
+                raise ValueError(motivo)
+            self.cur.execute(SQL_ACTUALIZAR, fila + duplicados.claves(*fila) + (id_conservar,))
+            if self._indice is not None:
+                self._indice.quitar(conservar)
+                self._indice.agregar(fila)
+            self._invalidar_cache(id_eliminar)
+            self._invalidar_cache(id_conservar, fila)
+        return (id_conservar,) + fila
+
+    # |||| Mantenimiento ||||
+
+    # compactar y verificar_integridad no pueden correr dentro de transaccion().
+    def _sin_transaccion(self, accion: str):
+        if self._nivel_transaccion:
+            raise ValueError(f"No se puede {accion} dentro de transaccion().")
+        # Lo pendiente del commit agrupado se confirma antes.
+        self.confirmar_pendientes()
+
+    # Copia la BBDD a `destino` mientras se sigue usando. La copia se hace desde otra conexión de a
+    # `paginas_por_paso` paginas con una pausa entre pasos, asi los escritores no esperan a que termine.
+    # Si otra conexión escribe en el medio SQLite vuelve a empezar; despues de `max_reinicios` se copia
+    # todo en un solo paso (con WAL eso tampoco frena a los escritores, sin WAL los frena mientras dura).
+    # Se escribe en destino.tmp y recien al terminar reemplaza a `destino`.
+    def respaldar(
+        self,
+        destino: str,
+        paginas_por_paso: int = PAGINAS_POR_PASO,
+        pausa_ms: float = PAUSA_RESPALDO_MS,
+        max_reinicios: int = REINICIOS_RESPALDO
+    ) -> dict:
+        inicio = time.perf_counter()
+        self.confirmar_pendientes()
+        avance = {"pasos": 0, "reinicios": 0, "restantes": None}
+
+        def progreso(_estado: int, restantes: int, _total: int):
+            avance["pasos"] += 1
+            # Si quedan mas paginas que en el paso anterior, la copia volvio a empezar.
+            if avance["restantes"] is not None and restantes > avance["restantes"]:
+                avance["reinicios"] += 1
+                if avance["reinicios"] > max_reinicios:
+                    raise _RespaldoReiniciado()
+            avance["restantes"] = restantes
+            if restantes and pausa_ms:
+                time.sleep(pausa_ms / 1000)
+
+        temporal = f"{destino}.tmp"
+        fuente = conectar(self.db_path, "readonly")
+        copia = sqlite3.connect(temporal)
+        try:
+            try:
+                fuente.backup(copia, pages=paginas_por_paso, progress=progreso)
+            except _RespaldoReiniciado:
+                fuente.backup(copia)
+                avance["pasos"] += 1
+            paginas = copia.execute("PRAGMA page_count").fetchone()[0]
+            copia.close()
+            os.replace(temporal, destino)
+        except BaseException:
+            copia.close()
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+        finally:
+            fuente.close()
+        return _informe(
+            "respaldo", inicio, destino=destino, paginas=paginas, bytes=os.path.getsize(destino),
+            pasos=avance["pasos"], reinicios=avance["reinicios"],
+        )
+
+    # Actualiza las estadisticas que usa SQLite para elegir indices. Por defecto con PRAGMA optimize,
+    # que solo analiza las tablas que lo necesitan; con analizar=True corre ANALYZE sobre todo.
+    @_sincronizado
+    def optimizar(self, analizar: bool = False) -> dict:
+        inicio = time.perf_counter()
+        self._sin_transaccion("optimizar")
+        self.cur.execute(f"PRAGMA analysis_limit = {LIMITE_ANALISIS}")
+        self.cur.execute("ANALYZE" if analizar else "PRAGMA optimize")
+        hay_estadisticas = self.cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+        estadisticas = self.cur.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0] if hay_estadisticas else 0
+        return _informe("analyze" if analizar else "optimize", inicio, estadisticas=estadisticas)
+
+    # Devuelve al sistema las paginas que quedaron libres por los borrados.
+    # Con auto_vacuum incremental (las BBDD nuevas) libera `paginas` paginas, o todas con None, sin
+    # reescribir el archivo. Con completo=True hace un VACUUM, que reescribe todo el archivo y frena a
+    # los escritores mientras dura; de paso pasa las BBDD viejas a auto_vacuum incremental.
+    @_sincronizado
+    def compactar(self, paginas: Optional[int] = None, completo: bool = False) -> dict:
+        inicio = time.perf_counter()
+        self._sin_transaccion("compactar")
+        antes, _libres, tamano = _estado_paginas(self.conn)
+        if completo:
+            self.cur.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self.cur.execute("VACUUM")
+        elif self.cur.execute("PRAGMA auto_vacuum").fetchone()[0] == MODOS_AUTO_VACUUM.index("incremental"):
+            # Con execute() SQLite libera una sola pagina, executescript corre el PRAGMA hasta el final.
+            self.conn.executescript(f"PRAGMA incremental_vacuum({int(paginas or 0)})")
+        despues, libres, _tamano = _estado_paginas(self.conn)
+        return _informe(
+            "vacuum" if completo else "vacuum_incremental", inicio,
+            auto_vacuum=MODOS_AUTO_VACUUM[self.cur.execute("PRAGMA auto_vacuum").fetchone()[0]],
+            paginas=despues, paginas_libres=libres,
+            # Al pasar a auto_vacuum el archivo puede crecer una pagina (el mapa de punteros).
+            paginas_liberadas=max(antes - despues, 0), bytes_liberados=max(antes - despues, 0) * tamano,
+        )
+
+    # Revisa que el archivo no este dañado (integrity_check, o quick_check con rapido=True, que no
+    # compara los indices con las tablas) y que el indice de busqueda coincida con la tabla contactos.
+    # Informa tambien las consultas de duplicados que recorren toda la tabla (ver consultas_sin_indice).
+    @_sincronizado
+    def verificar_integridad(self, rapido: bool = False, max_errores: int = 100) -> dict:
+        inicio = time.perf_counter()
+        self._sin_transaccion("verificar la BBDD")
+        pragma = "quick_check" if rapido else "integrity_check"
+        problemas = [f[0] for f in self.cur.execute(f"PRAGMA {pragma}({int(max_errores)})") if f[0] != "ok"]
+        # El control de FTS5 es un INSERT, en solo lectura no se puede.
+        if self._perfil != "readonly":
+            try:
+                # Con rank = 1 compara tambien el indice con la tabla contactos.
+                self.cur.execute("INSERT INTO contactos_fts(contactos_fts, rank) VALUES('integrity-check', 1)")
+            except sqlite3.DatabaseError as e:
+                problemas.append(f"contactos_fts: {e}")
+            finally:
+                # No cambia nada, solo cierra la transacción que abrio el INSERT.
+                self.conn.rollback()
+        return _informe(
+            "integridad", inicio, ok=not problemas, problemas=problemas,
+            consultas_sin_indice=consultas_sin_indice(self.conn),
+        )
+
+    # Tareas periodicas que tardan poco: depura el registro de cambios, libera las paginas libres y
+    # actualiza las estadisticas. La interfaz y el servicio la llaman cada tanto.
+    def mantenimiento(self, conservar: int = CAMBIOS_A_CONSERVAR) -> List[dict]:
+        inicio = time.perf_counter()
+        borrados = self.depurar_cambios(conservar)
+        return [_informe("depurar_cambios", inicio, borrados=borrados), self.compactar(), self.optimizar()]
+
+    # |||| Consultas para GestorFragmentado ||||
+
+    # IDs de los primeros `limite` contactos (anteriores a antes_de_id, si se pasa), del mas nuevo al mas viejo.
+    def _ids_desc(self, limite: int, antes_de_id: Optional[int] = None) -> List[int]:
+        with self._lectura() as cur:
+            if antes_de_id is None:
+                return [r[0] for r in cur.execute("SELECT id FROM contactos ORDER BY id DESC LIMIT ?", (limite,))]
+            return [r[0] for r in cur.execute(
+                "SELECT id FROM contactos WHERE id < ? ORDER BY id DESC LIMIT ?", (antes_de_id, limite)
+            )]
+
+    # Filas de los IDs pedidos, en cualquier orden.
+    def _filas_por_ids(self, ids: List[int]) -> List[Tuple]:
+        filas: List[Tuple] = []
+        with self._lectura() as cur:
+            # Parte la lista para no pasar el limite de parametros de SQLite.
+            for i in range(0, len(ids), 900):
+                parte = ids[i:i + 900]
+                filas.extend(cur.execute(
+                    "SELECT id, nombre, apellido, telefono, email FROM contactos "
+                    f"WHERE id IN ({', '.join('?' * len(parte))})",
+                    parte
+                ).fetchall())
+        return filas
+
+    # Como buscar pero con el puntaje (rank) adelante, para mezclar resultados de varias BBDD.
+    def _buscar_con_rango(self, texto: str, limite: int) -> List[Tuple]:
+        consulta = armar_consulta_fts(texto)
+        if not consulta:
+            return []
+        with self._lectura() as cur:
+            return cur.execute(
+                "SELECT rank, c.id, c.nombre, c.apellido, c.telefono, c.email "
+                "FROM contactos_fts JOIN contactos c ON c.id = contactos_fts.rowid "
+                "WHERE contactos_fts MATCH ? ORDER BY rank LIMIT ?",
+                (consulta, limite)
+            ).fetchall()
+
+    # Una pagina de resultados de busqueda ordenados por ID, igual que obtener_pagina.
+    def _pagina_busqueda(self, texto: str, antes_de_id: Optional[int], limite: int) -> List[Tuple]:
+        consulta = armar_consulta_fts(texto)
+        if not consulta:
+            return []
+        with self._lectura() as cur:
+            return cur.execute(
+                "SELECT c.id, c.nombre, c.apellido, c.telefono, c.email "
+                "FROM contactos_fts JOIN contactos c ON c.id = contactos_fts.rowid "
+                "WHERE contactos_fts MATCH ? AND c.id < ? ORDER BY c.id DESC LIMIT ?",
+                (consulta, antes_de_id if antes_de_id is not None else 2 ** 63 - 1, limite)
+            ).fetchall()
+
+    # Ultimo ID asignado en la tabla; no baja al borrar porque contactos usa AUTOINCREMENT.
+    def _ultimo_id_asignado(self) -> int:
+        with self._lectura() as cur:
+            fila = cur.execute("SELECT seq FROM sqlite_sequence WHERE name = 'contactos'").fetchone()
+        return fila[0] if fila else 0
+
+    # Todas las filas de una clave normalizada (ver SQL_FILAS_DE_CLAVE).
+    def _filas_de_clave(self, columna: str) -> List[Tuple]:
+        with self._lectura() as cur:
+            return cur.execute(SQL_FILAS_DE_CLAVE.format(columna=columna)).fetchall()
 
     # Cierra la conexión a la BBDD.
+    @_sincronizado
     def cerrar_conexion(self):
         try:
+            # Confirma lo que haya quedado del commit agrupado.
+            self.confirmar_pendientes()
+            self._cancelar_temporizador()
+            # SQLite recomienda PRAGMA optimize antes de cerrar; si no hace falta no hace nada.
+            if self._perfil != "readonly":
+                try:
+                    self.cur.execute(f"PRAGMA analysis_limit = {LIMITE_ANALISIS}")
+                    self.cur.execute("PRAGMA optimize")
+                except sqlite3.Error:
+                    pass
             self.conn.close()
         except Exception:
             pass
+        if self._pool is not None:
+            self._pool.cerrar()
+
+# |||| Acceso en segundo plano ||||
+
+# Envuelve un GestorDeContactos que vive en su propio hilo.
+# Cada metodo publico del gestor devuelve un Future en lugar del resultado.
+# Las opciones extra se pasan tal cual a GestorDeContactos (o a la clase indicada, por ejemplo GestorFragmentado).
+class GestorAsincrono:
+    def __init__(self, db_path: str = DB_NAME, clase: type = GestorDeContactos, **opciones):
+        self._clase = clase
+        # Un solo hilo, asi la conexión siempre se usa desde el mismo.
+        # Se importa aca para no sumar tiempo de arranque a quien no lo usa (por ejemplo la CLI).
+        from concurrent.futures import ThreadPoolExecutor
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gestor-bd")
+        self._gestor = None
+        # La conexión se abre dentro del hilo de trabajo.
+        self._executor.submit(self._abrir, db_path, opciones).result()
+
+    def _abrir(self, db_path: str, opciones: dict):
+        self._gestor = self._clase(db_path, **opciones)
+
+    def _ejecutar(self, metodo: str, args: tuple, kwargs: dict):
+        return getattr(self._gestor, metodo)(*args, **kwargs)
+
+    # Encola una llamada a un metodo del gestor.
+    def enviar(self, metodo: str, *args, **kwargs) -> "Future":
+        return self._executor.submit(self._ejecutar, metodo, args, kwargs)
+
+    # Permite usar gestor.agregar_contacto(c) y recibir un Future.
+    # Los generadores (iterar_contactos) no sirven por aca, deben consumirse en el hilo del gestor.
+    def __getattr__(self, nombre: str):
+        if nombre.startswith("_") or not callable(getattr(self._clase, nombre, None)):
+            raise AttributeError(nombre)
+        return lambda *args, **kwargs: self.enviar(nombre, *args, **kwargs)
+
+    # Cierra la conexión en su hilo y termina el hilo.
+    def cerrar_conexion(self):
+        try:
+            self._executor.submit(self._gestor.cerrar_conexion).result()
+        finally:
+            self._executor.shutdown(wait=True)
 
 # |||| Llamado a la interfaz ||||
 
 # Función principal.
 def main():
-    # Se asegura que la tabla exista.
-    crear_tabla_contactos()
+    # Con CONTACTOS_FRAGMENTOS=N los contactos se reparten en N archivos (ver fragmentos.py).
+    from fragmentos import VARIABLE_FRAGMENTOS, GestorFragmentado
+    fragmentos = int(os.environ.get(VARIABLE_FRAGMENTOS) or 0)
+    opciones = {"cache_capacidad": CACHE_CAPACIDAD}
+    if fragmentos > 1:
+        opciones.update(clase=GestorFragmentado, fragmentos=fragmentos)
+    else:
+        # Se asegura que la tabla exista.
+        crear_tabla_contactos()
 
     # Importa lo necesario para la interfaz.
     import tkinter as tk
     from interfaz import crear_interfaz
 
-    # Instancia el repositorio.
-    repo = GestorDeContactos(DB_NAME)
+    # Instancia el repositorio en segundo plano, asi la ventana no se congela.
+    repo = GestorAsincrono(DB_NAME, **opciones)
     root = tk.Tk()
     # Construye la UI.
     crear_interfaz(root, repo)
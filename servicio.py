@@ -0,0 +1,450 @@
+# Servicio HTTP/JSON local para que otras herramientas usen los contactos sin la ventana de Tk.
+# Usa asyncio para las conexiones (HTTP/1.1 con keep-alive) y un pool de hilos acotado para la BBDD.
+# Uso:
+#     python -m servicio --puerto 8765 --hilos 4
+# Rutas:
+#     GET    /contactos?antes_de=ID&limite=N   pagina de contactos, del mas nuevo al mas viejo
+#     GET    /contactos/ID
+#     POST   /contactos                        {"nombre": ..., "apellido": ..., "telefono": ..., "email": ...}
+#     PUT    /contactos/ID                     los campos que no se mandan mantienen su valor
+#     DELETE /contactos/ID
+#     GET    /buscar?q=texto&limite=N
+#     POST   /importar                         NDJSON, un contacto por linea (se lee a medida que llega)
+#     POST   /lote                             [{"metodo": "GET", "ruta": "/contactos/7"}, ...] en un solo viaje
+#     GET    /estado
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from fragmentos import GestorFragmentado
+from main import (
+    CACHE_CAPACIDAD, COLUMNAS, DB_NAME, INTERVALO_MANTENIMIENTO_S, TAMANO_LOTE, Contacto,
+    GestorDeContactos, crear_tabla_contactos, dict_a_contacto, fila_a_dict
+)
+
+# |||| Configuración ||||
+
+HOST = "127.0.0.1"
+PUERTO = 8765
+# Hilos que atienden la BBDD; tambien es la cantidad de conexiones de lectura del pool.
+HILOS = 4
+# Solicitudes que pueden esperar un hilo a la vez; las demas esperan sin encolarse en el pool.
+PENDIENTES_POR_HILO = 8
+# Segundos que una conexión puede quedar abierta sin mandar nada.
+ESPERA_INACTIVA_S = 30.0
+# Tamaño maximo de la cabecera y del cuerpo JSON (la importacion NDJSON no tiene limite).
+MAX_CABECERA = 16 * 1024
+MAX_CUERPO = 1024 * 1024
+# Filas como maximo por pagina, busqueda u operaciones por lote.
+MAX_LIMITE = 1000
+
+# Error que se contesta tal cual al cliente.
+class ErrorHTTP(Exception):
+    def __init__(self, estado: int, mensaje: str):
+        super().__init__(mensaje)
+        self.estado = estado
+
+# Lee un entero de la query string.
+def _entero(consulta: Dict[str, List[str]], nombre: str, defecto: Optional[int] = None) -> Optional[int]:
+    valores = consulta.get(nombre)
+    if not valores:
+        return defecto
+    try:
+        return int(valores[0])
+    except ValueError:
+        raise ErrorHTTP(400, f"{nombre} debe ser un numero entero.")
+
+def _limite(consulta: Dict[str, List[str]]) -> int:
+    return max(1, min(_entero(consulta, "limite", 100), MAX_LIMITE))
+
+# |||| Respuestas ||||
+
+def armar_respuesta(estado: int, objeto, mantener: bool) -> bytes:
+    cuerpo = json.dumps(objeto, ensure_ascii=False).encode("utf-8")
+    cabecera = (
+        f"HTTP/1.1 {estado} {HTTPStatus(estado).phrase}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(cuerpo)}\r\n"
+        f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n"
+    )
+    return cabecera.encode("latin-1") + cuerpo
+
+# |||| Lectura de solicitudes ||||
+
+# Devuelve (metodo, destino, version, cabeceras) o None si el cliente cerro la conexión.
+async def leer_cabecera(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, str, Dict[str, str]]]:
+    try:
+        crudo = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), ESPERA_INACTIVA_S)
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+        return None
+    except asyncio.LimitOverrunError:
+        raise ErrorHTTP(431, "La cabecera es demasiado grande.")
+    lineas = crudo.decode("latin-1").split("\r\n")
+    try:
+        metodo, destino, version = lineas[0].split(" ")
+    except ValueError:
+        raise ErrorHTTP(400, "Linea de solicitud invalida.")
+    cabeceras = {}
+    for linea in lineas[1:]:
+        if linea:
+            nombre, _, valor = linea.partition(":")
+            cabeceras[nombre.strip().lower()] = valor.strip()
+    return metodo.upper(), destino, version, cabeceras
+
+# Recorre el cuerpo a medida que llega, con Content-Length o Transfer-Encoding: chunked.
+async def leer_trozos(reader: asyncio.StreamReader, cabeceras: Dict[str, str]) -> AsyncIterator[bytes]:
+    if "chunked" in cabeceras.get("transfer-encoding", "").lower():
+        while True:
+            linea = await reader.readuntil(b"\r\n")
+            try:
+                tamano = int(linea.split(b";", 1)[0], 16)
+            except ValueError:
+                raise ErrorHTTP(400, "Trozo invalido.")
+            if tamano == 0:
+                # Saltea los trailers hasta la linea vacia.
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                return
+            yield await reader.readexactly(tamano)
+            await reader.readexactly(2)
+    try:
+        restante = int(cabeceras.get("content-length", "0"))
+    except ValueError:
+        raise ErrorHTTP(400, "Content-Length invalido.")
+    while restante > 0:
+        trozo = await reader.read(min(restante, 64 * 1024))
+        if not trozo:
+            raise asyncio.IncompleteReadError(b"", restante)
+        restante -= len(trozo)
+        yield trozo
+
+# Lee el cuerpo entero y lo interpreta como JSON (None si no hay cuerpo).
+async def leer_json(reader: asyncio.StreamReader, cabeceras: Dict[str, str]):
+    partes, tamano = [], 0
+    async for trozo in leer_trozos(reader, cabeceras):
+        tamano += len(trozo)
+        if tamano > MAX_CUERPO:
+            raise ErrorHTTP(413, "El cuerpo es demasiado grande.")
+        partes.append(trozo)
+    if not partes:
+        return None
+    try:
+        return json.loads(b"".join(partes))
+    except ValueError:
+        raise ErrorHTTP(400, "El cuerpo no es JSON valido.")
+
+# |||| Servicio ||||
+
+# Atiende las solicitudes con un gestor compartido por todos los hilos del pool.
+class Servicio:
+    def __init__(
+        self,
+        db_path: str = DB_NAME,
+        hilos: int = HILOS,
+        fragmentos: int = 0,
+        mantenimiento_s: float = INTERVALO_MANTENIMIENTO_S,
+        **opciones
+    ):
+        opciones.setdefault("cache_capacidad", CACHE_CAPACIDAD)
+        if fragmentos > 1:
+            self.gestor = GestorFragmentado(db_path, fragmentos, **opciones)
+        else:
+            crear_tabla_contactos(db_path, perfil=opciones.get("perfil"))
+            # Con lectores el gestor tiene un escritor compartido y un pool de lectura, se puede usar desde varios hilos.
+            self.gestor = GestorDeContactos(db_path, lectores=hilos, **opciones)
+        self._executor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="servicio-bd")
+        # Acota lo que espera en el pool; se crea con el loop andando.
+        self._cupos: Optional[asyncio.Semaphore] = None
+        self._hilos = hilos
+        self._estadisticas = Counter()
+        self._inicio = time.monotonic()
+        self._servidor: Optional[asyncio.AbstractServer] = None
+        # Mantenimiento periodico de la BBDD (0 = nunca); /estado muestra los ultimos informes.
+        self._mantenimiento_s = mantenimiento_s
+        self._mantenedor: Optional[asyncio.Task] = None
+        self._ultimo_mantenimiento: Optional[List[dict]] = None
+
+    # Corre una funcion en el pool sin pasar el limite de pendientes.
+    async def _en_pool(self, funcion, *args):
+        async with self._cupos:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, funcion, *args)
+
+    # |||| Rutas ||||
+
+    # Resuelve una solicitud ya leida; corre en un hilo del pool. Devuelve (estado, objeto JSON).
+    def atender(self, metodo: str, destino: str, cuerpo) -> Tuple[int, object]:
+        try:
+            return self._rutear(metodo, destino, cuerpo)
+        except ErrorHTTP as e:
+            return e.estado, {"ok": False, "error": str(e)}
+        except ValueError as e:
+            # Validaciones y duplicados del gestor.
+            return 400, {"ok": False, "error": str(e)}
+
+    def _rutear(self, metodo: str, destino: str, cuerpo) -> Tuple[int, object]:
+        partes = urlsplit(destino)
+        consulta = parse_qs(partes.query)
+        ruta = [p for p in partes.path.split("/") if p]
+
+        if ruta == ["contactos"]:
+            if metodo == "GET":
+                filas = self.gestor.obtener_pagina(_entero(consulta, "antes_de"), _limite(consulta))
+                return 200, {"ok": True, "contactos": [fila_a_dict(f) for f in filas]}
+            if metodo == "POST":
+                nuevo_id = self.gestor.agregar_contacto(dict_a_contacto(self._objeto(cuerpo)))
+                return 201, {"ok": True, "id": nuevo_id}
+            raise ErrorHTTP(405, "Metodo no permitido.")
+
+        if len(ruta) == 2 and ruta[0] == "contactos":
+            try:
+                contacto_id = int(ruta[1])
+            except ValueError:
+                raise ErrorHTTP(404, "No existe el contacto.")
+            if metodo == "GET":
+                fila = self.gestor.obtener_por_id(contacto_id)
+                if fila is None:
+                    raise ErrorHTTP(404, "No existe el contacto.")
+                return 200, {"ok": True, "contacto": fila_a_dict(fila)}
+            if metodo in ("PUT", "PATCH"):
+                return self._actualizar(contacto_id, self._objeto(cuerpo))
+            if metodo == "DELETE":
+                if not self.gestor.eliminar_contacto(contacto_id):
+                    raise ErrorHTTP(404, "No existe el contacto.")
+                return 200, {"ok": True}
+            raise ErrorHTTP(405, "Metodo no permitido.")
+
+        if ruta == ["buscar"] and metodo == "GET":
+            texto = (consulta.get("q") or [""])[0]
+            filas = self.gestor.buscar(texto, _limite(consulta))
+            return 200, {"ok": True, "contactos": [fila_a_dict(f) for f in filas]}
+
+        if ruta == ["estado"] and metodo == "GET":
+            return 200, {
+                "ok": True,
+                "contactos": self.gestor.contar_contactos(),
+                "segundos": round(time.monotonic() - self._inicio, 1),
+                "solicitudes": dict(self._estadisticas),
+                "cache": self.gestor.estadisticas_cache(),
+                "mantenimiento": self._ultimo_mantenimiento,
+            }
+
+        if ruta == ["lote"] and metodo == "POST":
+            return self._lote(cuerpo)
+
+        raise ErrorHTTP(404, "Ruta desconocida.")
+
+    @staticmethod
+    def _objeto(cuerpo) -> dict:
+        if not isinstance(cuerpo, dict):
+            raise ErrorHTTP(400, "Se esperaba un objeto JSON.")
+        return cuerpo
+
+    # Igual que la CLI: los campos que no se mandan mantienen su valor.
+    def _actualizar(self, contacto_id: int, datos: dict) -> Tuple[int, object]:
+        actual = self.gestor.obtener_por_id(contacto_id)
+        if actual is None:
+            raise ErrorHTTP(404, "No existe el contacto.")
+        campos = {c: str(datos[c]) if datos.get(c) is not None else (v or "") for c, v in zip(COLUMNAS[1:], actual[1:])}
+        if not self.gestor.actualizar_contacto(contacto_id, Contacto(**campos)):
+            raise ErrorHTTP(404, "No existe el contacto.")
+        return 200, {"ok": True, "contacto": fila_a_dict((contacto_id,) + tuple(campos.values()))}
+
+    # Varias solicitudes en un solo viaje y un solo paso por el pool.
+    def _lote(self, cuerpo) -> Tuple[int, object]:
+        if not isinstance(cuerpo, list):
+            raise ErrorHTTP(400, "Se esperaba una lista de solicitudes.")
+        if len(cuerpo) > MAX_LIMITE:
+            raise ErrorHTTP(413, f"El lote no puede tener mas de {MAX_LIMITE} solicitudes.")
+        respuestas = []
+        for solicitud in cuerpo:
+            if not isinstance(solicitud, dict) or not isinstance(solicitud.get("ruta"), str):
+                estado, objeto = 400, {"ok": False, "error": "Cada solicitud necesita una ruta."}
+            else:
+                metodo = str(solicitud.get("metodo", "GET")).upper()
+                if solicitud["ruta"].lstrip("/").startswith(("lote", "importar")):
+                    estado, objeto = 400, {"ok": False, "error": "Esa ruta no se puede usar dentro de un lote."}
+                else:
+                    estado, objeto = self.atender(metodo, solicitud["ruta"], solicitud.get("cuerpo"))
+            respuestas.append({"estado": estado, "cuerpo": objeto})
+        return 200, {"ok": True, "respuestas": respuestas}
+
+    # |||| Importacion NDJSON ||||
+
+    # Lee las lineas a medida que llegan y las inserta de a TAMANO_LOTE con la carga masiva;
+    # mientras un lote se guarda se sigue leyendo el siguiente.
+    async def _importar(self, reader: asyncio.StreamReader, cabeceras: Dict[str, str]) -> Tuple[int, object]:
+        rechazos: List[dict] = []
+        aceptados = 0
+        numero = 0
+        lote: List[Tuple[int, Contacto]] = []
+        guardando: Optional[asyncio.Future] = None
+
+        async def esperar_guardado():
+            nonlocal aceptados
+            if guardando is None:
+                return
+            numeros, resultados = await guardando
+            for indice, aceptado, motivo in resultados:
+                if aceptado:
+                    aceptados += 1
+                else:
+                    rechazos.append({"linea": numeros[indice], "error": motivo})
+
+        async def guardar():
+            nonlocal guardando, lote
+            await esperar_guardado()
+            numeros = [n for n, _ in lote]
+            contactos = [c for _, c in lote]
+            lote = []
+
+            async def tarea():
+                return numeros, await self._en_pool(self.gestor.agregar_contactos, contactos, len(contactos))
+            guardando = asyncio.ensure_future(tarea())
+
+        resto = b""
+        async for trozo in leer_trozos(reader, cabeceras):
+            *lineas, resto = (resto + trozo).split(b"\n")
+            for linea in lineas:
+                numero += 1
+                self._linea_a_lote(numero, linea, lote, rechazos)
+                if len(lote) >= TAMANO_LOTE:
+                    await guardar()
+        if resto.strip():
+            numero += 1
+            self._linea_a_lote(numero, resto, lote, rechazos)
+        if lote:
+            await guardar()
+        await esperar_guardado()
+        rechazos.sort(key=lambda r: r["linea"])
+        return 200, {"ok": not rechazos, "lineas": numero, "aceptados": aceptados, "rechazados": rechazos}
+
+    @staticmethod
+    def _linea_a_lote(numero: int, linea: bytes, lote: List[Tuple[int, Contacto]], rechazos: List[dict]):
+        # Saltea lineas en blanco.
+        if not linea.strip():
+            return
+        try:
+            datos = json.loads(linea)
+        except ValueError:
+            rechazos.append({"linea": numero, "error": "JSON invalido."})
+            return
+        if not isinstance(datos, dict):
+            rechazos.append({"linea": numero, "error": "Se esperaba un objeto JSON."})
+            return
+        lote.append((numero, dict_a_contacto(datos)))
+
+    # |||| Conexiones ||||
+
+    # Atiende una conexión: varias solicitudes seguidas mientras el cliente la mantenga abierta.
+    async def manejar_conexion(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                mantener = False
+                try:
+                    solicitud = await leer_cabecera(reader)
+                    if solicitud is None:
+                        break
+                    metodo, destino, version, cabeceras = solicitud
+                    conexion = cabeceras.get("connection", "").lower()
+                    # HTTP/1.1 mantiene la conexión salvo que pidan cerrarla, HTTP/1.0 al reves.
+                    mantener = conexion == "keep-alive" if version == "HTTP/1.0" else conexion != "close"
+                    if cabeceras.get("expect", "").lower() == "100-continue":
+                        writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                    estado, objeto = await self._responder(metodo, destino, reader, cabeceras)
+                except ErrorHTTP as e:
+                    # El resto de la solicitud puede haber quedado sin leer, se cierra.
+                    estado, objeto, mantener = e.estado, {"ok": False, "error": str(e)}, False
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                except Exception as e:
+                    estado, objeto, mantener = 500, {"ok": False, "error": f"{type(e).__name__}: {e}"}, False
+                self._estadisticas[str(estado)] += 1
+                writer.write(armar_respuesta(estado, objeto, mantener))
+                await writer.drain()
+                if not mantener:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _responder(
+        self,
+        metodo: str,
+        destino: str,
+        reader: asyncio.StreamReader,
+        cabeceras: Dict[str, str]
+    ) -> Tuple[int, object]:
+        if urlsplit(destino).path.rstrip("/") == "/importar":
+            if metodo != "POST":
+                raise ErrorHTTP(405, "Metodo no permitido.")
+            return await self._importar(reader, cabeceras)
+        cuerpo = await leer_json(reader, cabeceras)
+        return await self._en_pool(self.atender, metodo, destino, cuerpo)
+
+    async def iniciar(self, host: str = HOST, puerto: int = PUERTO) -> asyncio.AbstractServer:
+        self._cupos = asyncio.Semaphore(self._hilos * PENDIENTES_POR_HILO)
+        self._servidor = await asyncio.start_server(self.manejar_conexion, host, puerto, limit=MAX_CABECERA)
+        if self._mantenimiento_s:
+            self._mantenedor = asyncio.ensure_future(self._mantener_cada_tanto())
+        return self._servidor
+
+    # Un error (por ejemplo la BBDD ocupada por otro proceso) no corta el ciclo, se reintenta en la proxima vuelta.
+    async def _mantener_cada_tanto(self):
+        while True:
+            await asyncio.sleep(self._mantenimiento_s)
+            try:
+                self._ultimo_mantenimiento = await self._en_pool(self.gestor.mantenimiento)
+            except Exception as e:
+                self._ultimo_mantenimiento = [{"operacion": "mantenimiento", "error": str(e)}]
+
+    def cerrar(self):
+        if self._mantenedor is not None:
+            self._mantenedor.cancel()
+        if self._servidor is not None:
+            self._servidor.close()
+        self._executor.shutdown(wait=True)
+        self.gestor.cerrar_conexion()
+
+async def servir(servicio: Servicio, host: str, puerto: int):
+    servidor = await servicio.iniciar(host, puerto)
+    direccion = servidor.sockets[0].getsockname()
+    print(f"Escuchando en http://{direccion[0]}:{direccion[1]}", file=sys.stderr, flush=True)
+    async with servidor:
+        await servidor.serve_forever()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON de contactos.")
+    parser.add_argument("--db", default=DB_NAME)
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--hilos", type=int, default=HILOS, help="Hilos y conexiones de lectura para la BBDD.")
+    parser.add_argument("--fragmentos", type=int, default=0, help="Reparte los contactos en N archivos.")
+    parser.add_argument("--perfil", default=None, help="Perfil de conexión (safe, fast).")
+    parser.add_argument("--commit-ms", type=float, default=None,
+                        help="Commit agrupado: confirma los cambios cada tantos milisegundos.")
+    parser.add_argument("--mantenimiento-s", type=float, default=INTERVALO_MANTENIMIENTO_S, dest="mantenimiento_s",
+                        help="Cada cuantos segundos se corre el mantenimiento de la BBDD (0 = nunca).")
+    args = parser.parse_args(argv)
+
+    opciones = {"perfil": args.perfil, "mantenimiento_s": args.mantenimiento_s}
+    if args.commit_ms is not None:
+        opciones["commit_cada_ms"] = args.commit_ms
+    servicio = Servicio(args.db, args.hilos, args.fragmentos, **opciones)
+    try:
+        asyncio.run(servir(servicio, args.host, args.puerto))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servicio.cerrar()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# Controla que el cache de busquedas invalide solo lo que cambio: modificaciones, bajas,
+# entradas de "no existe" y cambios hechos por otra conexión.
+# Uso:
+#     python -m unittest test_cache
+import os
+import tempfile
+import time
+import unittest
+
+from main import CACHE_VERIFICAR_MS, Contacto, GestorDeContactos, crear_tabla_contactos
+
+class TestCacheDeBusquedas(unittest.TestCase):
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.carpeta.name, "contactos.db")
+        crear_tabla_contactos(self.db_path)
+        self.gestor = GestorDeContactos(self.db_path, cache_capacidad=100)
+        self.ana = self.gestor.agregar_contacto(Contacto("Ana", "Perez", "3511234567", "ana@ejemplo.com"))
+        self.luis = self.gestor.agregar_contacto(Contacto("Luis", "Gomez", "3517654321", "luis@ejemplo.com"))
+
+    def tearDown(self):
+        self.gestor.cerrar_conexion()
+        self.carpeta.cleanup()
+
+    def aciertos(self) -> int:
+        return self.gestor.estadisticas_cache()["aciertos"]
+
+    # Guarda en el cache las busquedas de los dos contactos.
+    def calentar(self):
+        for contacto_id, email in ((self.ana, "ana@ejemplo.com"), (self.luis, "luis@ejemplo.com")):
+            self.gestor.obtener_por_id(contacto_id)
+            self.gestor.obtener_por_email(email)
+
+    def test_acierto_sin_consultar(self):
+        self.calentar()
+        antes = self.aciertos()
+        self.assertEqual(self.gestor.obtener_por_id(self.ana)[1], "Ana")
+        self.assertEqual(self.aciertos(), antes + 1)
+
+    def test_modificacion(self):
+        self.calentar()
+        self.gestor.actualizar_contacto(self.ana, Contacto("Ana", "Perez", "3511234567", "ana.p@ejemplo.com"))
+        self.assertEqual(self.gestor.obtener_por_id(self.ana)[4], "ana.p@ejemplo.com")
+        self.assertIsNone(self.gestor.obtener_por_email("ana@ejemplo.com"))
+        self.assertEqual(self.gestor.obtener_por_email("ana.p@ejemplo.com")[0], self.ana)
+        # El otro contacto sigue en el cache.
+        antes = self.aciertos()
+        self.gestor.obtener_por_id(self.luis)
+        self.gestor.obtener_por_email("luis@ejemplo.com")
+        self.assertEqual(self.aciertos(), antes + 2)
+
+    def test_baja(self):
+        self.calentar()
+        self.gestor.eliminar_contacto(self.ana)
+        self.assertIsNone(self.gestor.obtener_por_id(self.ana))
+        self.assertIsNone(self.gestor.obtener_por_email("ana@ejemplo.com"))
+        self.assertIsNotNone(self.gestor.obtener_por_id(self.luis))
+
+    def test_entrada_de_no_existe(self):
+        self.assertIsNone(self.gestor.obtener_por_email("eva@ejemplo.com"))
+        self.assertIsNone(self.gestor.obtener_por_telefono("3519999999"))
+        eva = self.gestor.agregar_contacto(Contacto("Eva", "Diaz", "3519999999", "eva@ejemplo.com"))
+        self.assertEqual(self.gestor.obtener_por_email("eva@ejemplo.com")[0], eva)
+        self.assertEqual(self.gestor.obtener_por_telefono("3519999999")[0], eva)
+
+    def test_entrada_de_no_existe_carga_masiva(self):
+        self.assertIsNone(self.gestor.obtener_por_email("eva@ejemplo.com"))
+        self.gestor.agregar_contactos([Contacto("Eva", "Diaz", "3519999999", "eva@ejemplo.com")])
+        self.assertEqual(self.gestor.obtener_por_email("eva@ejemplo.com")[1], "Eva")
+
+    # Otra conexión cambia a Ana: se ve despues del intervalo de verificacion y Luis no se invalida.
+    def test_otro_escritor(self):
+        self.calentar()
+        otro = GestorDeContactos(self.db_path)
+        try:
+            otro.actualizar_contacto(self.ana, Contacto("Ana", "Perez", "3511234567", "ana.p@ejemplo.com"))
+        finally:
+            otro.cerrar_conexion()
+        time.sleep(CACHE_VERIFICAR_MS / 1000 + 0.05)
+        self.assertEqual(self.gestor.obtener_por_id(self.ana)[4], "ana.p@ejemplo.com")
+        self.assertIsNone(self.gestor.obtener_por_email("ana@ejemplo.com"))
+        antes = self.aciertos()
+        self.gestor.obtener_por_id(self.luis)
+        self.assertEqual(self.aciertos(), antes + 1)
+
+    # Con cache_verificar_ms=0 el cambio de otra conexión se ve en la busqueda siguiente.
+    def test_otro_escritor_control_estricto(self):
+        estricto = GestorDeContactos(self.db_path, cache_capacidad=100, cache_verificar_ms=0)
+        otro = GestorDeContactos(self.db_path)
+        try:
+            self.assertIsNotNone(estricto.obtener_por_id(self.luis))
+            otro.eliminar_contacto(self.luis)
+            self.assertIsNone(estricto.obtener_por_id(self.luis))
+        finally:
+            otro.cerrar_conexion()
+            estricto.cerrar_conexion()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+# Controla el reparto en fragmentos: IDs de una sola secuencia, duplicados entre fragmentos,
+# la cantidad de fragmentos anotada y obtener_rango partiendo de posiciones ya recorridas.
+# Uso:
+#     python -m unittest test_fragmentos
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from fragmentos import GestorFragmentado, fragmento_de, ruta_fragmento
+from main import Contacto
+
+FRAGMENTOS = 3
+
+# Contacto i con datos que no se repiten.
+def contacto(i: int) -> Contacto:
+    return Contacto(f"Nombre{i}", "Apellido", f"351{i:07d}", f"c{i}@ejemplo.com")
+
+class TestFragmentos(unittest.TestCase):
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.carpeta.name, "contactos.db")
+        self.gestor = GestorFragmentado(self.db_path, FRAGMENTOS)
+
+    def tearDown(self):
+        self.gestor.cerrar_conexion()
+        self.carpeta.cleanup()
+
+    def ids(self):
+        return [fila[0] for fila in self.gestor.iterar_contactos()]
+
+    # |||| IDs ||||
+
+    # Los IDs crecen en el orden de alta y cada uno esta en el fragmento id % FRAGMENTOS.
+    def test_ids_en_orden_y_en_su_fragmento(self):
+        ids = [self.gestor.agregar_contacto(contacto(i)) for i in range(20)]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+        for contacto_id in ids:
+            ruta = ruta_fragmento(self.db_path, contacto_id % FRAGMENTOS)
+            conn = sqlite3.connect(ruta)
+            try:
+                self.assertIsNotNone(conn.execute("SELECT 1 FROM contactos WHERE id = ?", (contacto_id,)).fetchone())
+            finally:
+                conn.close()
+        # Las paginas salen del mas nuevo al mas viejo.
+        self.assertEqual(self.ids(), ids[::-1])
+
+    def test_carga_masiva_sigue_la_secuencia(self):
+        primero = self.gestor.agregar_contacto(contacto(0))
+        resultados = self.gestor.agregar_contactos([contacto(i) for i in range(1, 50)])
+        self.assertTrue(all(aceptado for _, aceptado, _ in resultados))
+        ids = self.ids()[::-1]
+        self.assertEqual(ids[0], primero)
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual([self.gestor.obtener_por_id(i)[1] for i in ids], [f"Nombre{i}" for i in range(50)])
+
+    # Un ID borrado no se vuelve a usar, tampoco despues de reabrir.
+    def test_ids_no_se_reusan(self):
+        ids = [self.gestor.agregar_contacto(contacto(i)) for i in range(5)]
+        self.gestor.eliminar_contacto(ids[-1])
+        self.gestor.cerrar_conexion()
+        self.gestor = GestorFragmentado(self.db_path, FRAGMENTOS)
+        self.assertGreater(self.gestor.agregar_contacto(contacto(5)), ids[-1])
+
+    # |||| Duplicados entre fragmentos ||||
+
+    # Copias con el mismo teléfono y otro email que se guardarian en otro fragmento que el original.
+    def copias_en_otros_fragmentos(self, original: Contacto):
+        propio = fragmento_de((original.nombre, original.apellido, original.telefono, original.email), FRAGMENTOS)
+        copias = [Contacto(f"Otro{i}", "Apellido", original.telefono, f"otro{i}@ejemplo.com") for i in range(30)]
+        copias = [c for c in copias if fragmento_de((c.nombre, c.apellido, c.telefono, c.email), FRAGMENTOS) != propio]
+        self.assertTrue(copias)
+        return copias
+
+    # Se rechazan aunque el original este en otro fragmento.
+    def test_duplicado_en_otro_fragmento(self):
+        original = contacto(1)
+        self.gestor.agregar_contacto(original)
+        for copia in self.copias_en_otros_fragmentos(original):
+            with self.assertRaisesRegex(ValueError, "mismo teléfono"):
+                self.gestor.agregar_contacto(copia)
+        self.assertEqual(self.gestor.contar_contactos(), 1)
+
+    def test_duplicado_en_otro_fragmento_carga_masiva(self):
+        original = contacto(1)
+        self.gestor.agregar_contacto(original)
+        copias = self.copias_en_otros_fragmentos(original)
+        resultados = self.gestor.agregar_contactos(copias + [contacto(2)])
+        self.assertEqual([aceptado for _, aceptado, _ in resultados], [False] * len(copias) + [True])
+        self.assertEqual(self.gestor.contar_contactos(), 2)
+
+    # Al actualizar el contacto queda en su fragmento, pero se controla contra los demas.
+    def test_actualizar_con_datos_de_otro_fragmento(self):
+        ids = [self.gestor.agregar_contacto(contacto(i)) for i in range(6)]
+        otro = next(i for i in ids[1:] if i % FRAGMENTOS != ids[0] % FRAGMENTOS)
+        datos = self.gestor.obtener_por_id(otro)
+        with self.assertRaisesRegex(ValueError, "mismo email"):
+            self.gestor.actualizar_contacto(ids[0], Contacto("Nombre0", "Apellido", "3519999999", datos[4]))
+
+    # |||| Cantidad de fragmentos ||||
+
+    def test_otra_cantidad_de_fragmentos(self):
+        self.gestor.agregar_contacto(contacto(1))
+        for otra in (FRAGMENTOS - 1, FRAGMENTOS + 1):
+            with self.assertRaisesRegex(ValueError, f"{FRAGMENTOS} fragmentos"):
+                GestorFragmentado(self.db_path, otra)
+        # Con la misma cantidad abre bien.
+        GestorFragmentado(self.db_path, FRAGMENTOS).cerrar_conexion()
+
+    # |||| Rangos ||||
+
+    # Los rangos coinciden con el orden completo bajando, subiendo, saltando y despues de escribir.
+    def test_obtener_rango(self):
+        self.gestor.agregar_contactos([contacto(i) for i in range(500)])
+        ids = self.ids()
+        for desde in (0, 100, 140, 180, 60, 490, 520, 0):
+            self.assertEqual([f[0] for f in self.gestor.obtener_rango(desde, 40)], ids[desde:desde + 40])
+        self.gestor.eliminar_contacto(ids[50])
+        del ids[50]
+        self.assertEqual([f[0] for f in self.gestor.obtener_rango(140, 40)], ids[140:180])
+        ids.insert(0, self.gestor.agregar_contacto(contacto(500)))
+        self.assertEqual([f[0] for f in self.gestor.obtener_rango(180, 40)], ids[180:220])
+
+    # Las paginas por ID hacia abajo y hacia arriba coinciden con el orden completo.
+    def test_obtener_pagina_en_los_dos_sentidos(self):
+        self.gestor.agregar_contactos([contacto(i) for i in range(200)])
+        ids = self.ids()
+        self.assertEqual([f[0] for f in self.gestor.obtener_pagina(ids[99], 30)], ids[100:130])
+        self.assertEqual([f[0] for f in self.gestor.obtener_pagina(None, 30, despues_de_id=ids[100])], ids[70:100])
+        self.assertEqual([f[0] for f in self.gestor.obtener_pagina(None, 30, despues_de_id=ids[10])], ids[:10])
+
+if __name__ == "__main__":
+    unittest.main()
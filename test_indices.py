@@ -0,0 +1,56 @@
+# Controla con EXPLAIN QUERY PLAN que ninguna consulta del control de duplicados recorra toda la tabla.
+# Uso:
+#     python -m unittest test_indices
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from main import consultas_sin_indice, crear_tabla_contactos
+
+class TestConsultasConIndice(unittest.TestCase):
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.carpeta.name, "contactos.db")
+
+    def tearDown(self):
+        self.carpeta.cleanup()
+
+    def revisar(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self.assertEqual(consultas_sin_indice(conn), [])
+        finally:
+            conn.close()
+
+    def test_bbdd_nueva(self):
+        crear_tabla_contactos(self.db_path)
+        self.revisar()
+
+    # Una BBDD con la tabla original (sin migraciones) y datos queda con los indices al abrirla.
+    def test_bbdd_migrada(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE contactos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nombre TEXT NOT NULL,
+                apellido TEXT,
+                telefono TEXT,
+                email TEXT
+            );
+        """)
+        conn.executemany(
+            "INSERT INTO contactos(nombre, apellido, telefono, email) VALUES(?, ?, ?, ?)",
+            [(f"Nombre{i}", "Apellido", f"351{i:07d}", f"c{i}@ejemplo.com") for i in range(100)]
+        )
+        conn.commit()
+        conn.close()
+        crear_tabla_contactos(self.db_path)
+        self.revisar()
+
+    def test_bbdd_con_indices_unicos(self):
+        crear_tabla_contactos(self.db_path, unicos=True)
+        self.revisar()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+# Reglas de validación de contactos, compartidas por GestorDeContactos y la interfaz.
+# Cada regla dice el largo maximo, si es obligatorio y el formato de un campo.
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Pattern, Sequence, Set, Tuple
+
+# Una regla por campo.
+class Regla(NamedTuple):
+    # Nombre que se muestra en los mensajes.
+    etiqueta: str
+    # Cantidad maxima de caracteres.
+    maximo: int
+    # Si no puede quedar vacio.
+    obligatorio: bool = False
+    # Formato que debe cumplir cuando no esta vacio (None = cualquier texto).
+    patron: Optional[Pattern] = None
+    # Mensaje si no cumple el formato.
+    mensaje_formato: str = ""
+    # Formato del modo estricto (None = el mismo que el normal).
+    patron_estricto: Optional[Pattern] = None
+    # Mensaje si no cumple el formato estricto.
+    mensaje_estricto: str = ""
+
+    # Formato y mensaje que corresponden al modo.
+    def formato(self, estricto: bool) -> Tuple[Optional[Pattern], str]:
+        if estricto and self.patron_estricto is not None:
+            return self.patron_estricto, self.mensaje_estricto
+        return self.patron, self.mensaje_formato
+
+# Orden de los campos, es el orden en que se informan los errores.
+CAMPOS = ("nombre", "apellido", "telefono", "email")
+
+# Reglas de cada campo.
+REGLAS: Dict[str, Regla] = {
+    "nombre": Regla("nombre", 50, obligatorio=True),
+    "apellido": Regla("apellido", 50),
+    "telefono": Regla(
+        "teléfono", 15,
+        patron=re.compile(r"\d+"),
+        mensaje_formato="El teléfono debe contener solo números.",
+        patron_estricto=re.compile(r"[0-9]{6,15}"),
+        mensaje_estricto="El teléfono debe tener entre 6 y 15 números.",
+    ),
+    "email": Regla(
+        "email", 100,
+        patron=re.compile(r"[^@]*@.*", re.DOTALL),
+        mensaje_formato="El email debe contener '@'.",
+        patron_estricto=re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+"),
+        mensaje_estricto="El email no tiene un formato válido.",
+    ),
+}
+
+# Separadores que se sacan del teléfono al normalizar ("+54 (351) 555-1234" -> "543515551234").
+_SEPARADORES_TELEFONO = re.compile(r"[\s\-().+/]")
+
+# Un error: (campo, mensaje).
+Error = Tuple[str, str]
+
+# |||| Normalizacion ||||
+
+def normalizar_telefono(telefono: str) -> str:
+    return _SEPARADORES_TELEFONO.sub("", telefono.strip())
+
+def normalizar_email(email: str) -> str:
+    return email.strip().lower()
+
+# Devuelve los valores como se guardan; en modo estricto tambien normaliza teléfono y email.
+def normalizar(nombre: str, apellido: str, telefono: str, email: str, estricto: bool = False) -> Tuple[str, str, str, str]:
+    if estricto:
+        return nombre.strip(), apellido.strip(), normalizar_telefono(telefono), normalizar_email(email)
+    return nombre.strip(), apellido.strip(), telefono.strip(), email.strip()
+
+# |||| Validacion de un contacto ||||
+
+# Mensaje de largo maximo, igual al que usaba el gestor.
+def _mensaje_largo(regla: Regla) -> str:
+    return f"El {regla.etiqueta} supera el máximo de {regla.maximo} caracteres."
+
+# Valida un contacto y devuelve la lista de errores en orden: primero largos y despues formatos.
+# En modo estricto los valores se normalizan antes y se usan los formatos estrictos.
+def validar(nombre: str, apellido: str, telefono: str, email: str, estricto: bool = False) -> List[Error]:
+    valores = (nombre, apellido, telefono, email)
+    if estricto:
+        valores = normalizar(*valores, estricto=True)
+    errores: List[Error] = []
+    for campo, valor in zip(CAMPOS, valores):
+        if len(valor) > REGLAS[campo].maximo:
+            errores.append((campo, _mensaje_largo(REGLAS[campo])))
+    for campo, valor in zip(CAMPOS, valores):
+        regla = REGLAS[campo]
+        if regla.obligatorio and not valor.strip():
+            errores.append((campo, f"El {regla.etiqueta} es obligatorio."))
+            continue
+        patron, mensaje = regla.formato(estricto)
+        if valor and patron is not None and not patron.fullmatch(valor):
+            errores.append((campo, mensaje))
+    return errores
+
+# Los errores agrupados por campo.
+def errores_por_campo(errores: Iterable[Error]) -> Dict[str, List[str]]:
+    agrupados: Dict[str, List[str]] = {}
+    for campo, mensaje in errores:
+        agrupados.setdefault(campo, []).append(mensaje)
+    return agrupados
+
+def es_valido(nombre: str, apellido: str, telefono: str, email: str, estricto: bool = False) -> bool:
+    return not validar(nombre, apellido, telefono, email, estricto)
+
+# Valida y lanza ValueError con el primer error, como hacia el gestor.
+def exigir_valido(nombre: str, apellido: str, telefono: str, email: str, estricto: bool = False):
+    errores = validar(nombre, apellido, telefono, email, estricto)
+    if errores:
+        raise ValueError(errores[0][1])
+
+# Para la interfaz: acepta lo que se esta escribiendo en un campo (vacio o formato correcto, sin pasar el maximo).
+def texto_parcial_valido(campo: str, texto: str) -> bool:
+    regla = REGLAS[campo]
+    if len(texto) > regla.maximo:
+        return False
+    if campo == "telefono":
+        return texto == "" or bool(regla.patron.fullmatch(texto))
+    return True
+
+# |||| Validacion por lotes ||||
+
+# Valida muchos contactos de una vez trabajando por columnas, una pasada por regla.
+# filas son tuplas (nombre, apellido, telefono, email); devuelve la lista de errores de cada fila.
+def validar_lote(filas: Sequence[Tuple[str, str, str, str]], estricto: bool = False) -> List[List[Error]]:
+    if not filas:
+        return []
+    if estricto:
+        filas = [normalizar(*fila, estricto=True) for fila in filas]
+    columnas = list(zip(*filas))
+    errores: List[List[Error]] = [[] for _ in filas]
+
+    # Largos: primero todos los de largo, asi el orden coincide con validar().
+    for campo, columna in zip(CAMPOS, columnas):
+        regla = REGLAS[campo]
+        mensaje = _mensaje_largo(regla)
+        for i in _filas_largas(columna, regla.maximo):
+            errores[i].append((campo, mensaje))
+
+    # Obligatorios y formatos.
+    for campo, columna in zip(CAMPOS, columnas):
+        regla = REGLAS[campo]
+        patron, mensaje_formato = regla.formato(estricto)
+        # Los vacios de un campo obligatorio no se revisan de formato, igual que en validar().
+        vacios: Set[int] = set()
+        if regla.obligatorio:
+            mensaje = f"El {regla.etiqueta} es obligatorio."
+            vacios = {i for i, valor in enumerate(columna) if not valor.strip()}
+            for i in sorted(vacios):
+                errores[i].append((campo, mensaje))
+        if patron is not None:
+            coincide = patron.fullmatch
+            for i, valor in enumerate(columna):
+                if valor and i not in vacios and not coincide(valor):
+                    errores[i].append((campo, mensaje_formato))
+    return errores
+
+# Indices de las filas cuyo valor supera el maximo.
+def _filas_largas(columna: Sequence[str], maximo: int) -> List[int]:
+    return [i for i, largo in enumerate(map(len, columna)) if largo > maximo]